@@ -0,0 +1,260 @@
+import logging
+
+from array import array
+from datetime import date
+from functools import cached_property
+
+from client.run import RunClient
+from client.week import WeekClient
+
+logger = logging.getLogger(name=__name__)
+
+
+class TrainingBlock:
+    """
+    TrainingBlock holds a training block's weeks and days in memory for the edit
+    menu, loaded with one query. The days are kept in flat arrays of 7 slots per
+    week (slot = week index * 7 + day_number - 1), the dates as ordinals, each
+    day with its race (if any), so printing, dates and updates never go back to
+    the database.
+
+    Updates only mark their rows dirty, flush() writes the dirty goals and miles
+    in one batch each (an updated day keeps its logged runs, the difference goes
+    to its adjustment run, see RunClient.set_miles_by_day_ids()). Anything that
+    changes the block's shape (adding or removing weeks, shifting) goes through
+    the clients: flush() then load()
+    """
+
+    def __init__(self, con, cur, athlete_id: str = None, training_block_id: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self.con = con
+        self.cur = cur
+        self.athlete_id = athlete_id
+        self.training_block_id = training_block_id
+        self.week_ids = []
+        self.week_numbers = array('i')
+        self.goals = array('i')
+        self.day_ids = []
+        self.dates = array('i')
+        self.miles = array('d')
+        self.race_names = []
+        self.race_miles = array('d')
+        self.logged = array('d')
+        self.index = {}
+        self.dirty_goals = set()
+        self.dirty_miles = set()
+        # end __init__()
+
+    @cached_property
+    def run(self) -> RunClient:
+        """
+        run() caches a RunClient for use the duration of the process
+
+        :return: a RunClient
+        """
+        return RunClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
+        # end run()
+
+    @cached_property
+    def week(self) -> WeekClient:
+        """
+        week() caches a WeekClient for use the duration of the process
+
+        :return: a WeekClient
+        """
+        return WeekClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
+        # end week()
+
+    def load(self):
+        """
+        load() (re)loads the weeks and days of the training block, pending
+        changes are dropped (flush() first)
+
+        :return: none
+        """
+        rows = self.week.get_weeks_and_days_by_training_block_id(training_block_id=self.training_block_id)
+        self.week_ids = []
+        self.week_numbers = array('i')
+        self.goals = array('i')
+        self.day_ids = []
+        self.dates = array('i')
+        self.miles = array('d')
+        self.race_names = []
+        self.race_miles = array('d')
+        self.logged = array('d')
+        self.index = {}
+        self.dirty_goals = set()
+        self.dirty_miles = set()
+        for week_id, week_number, goal, day_id, day_number, day_date, miles, race_name, race_miles, logged in rows:
+            if week_number not in self.index:
+                self.index[week_number] = len(self.week_ids)
+                self.week_ids.append(week_id)
+                self.week_numbers.append(week_number)
+                self.goals.append(goal or 0)
+                self.day_ids.extend([None] * 7)
+                self.dates.extend([0] * 7)
+                self.miles.extend([0] * 7)
+                self.race_names.extend([None] * 7)
+                self.race_miles.extend([0] * 7)
+                self.logged.extend([0] * 7)
+            # end if
+            if day_id is not None:
+                slot = self.index[week_number] * 7 + day_number - 1
+                self.day_ids[slot] = day_id
+                self.dates[slot] = date.fromisoformat(day_date).toordinal()
+                self.miles[slot] = miles or 0
+                self.race_names[slot] = race_name
+                self.race_miles[slot] = race_miles or 0
+                self.logged[slot] = logged
+            # end if
+        # end for
+        # end load()
+
+    def num_weeks(self) -> int:
+        """
+        num_weeks() retrieves the # of weeks in the training block
+
+        :return: # of weeks
+        """
+        return len(self.week_ids)
+        # end num_weeks()
+
+    def has_week(self, week_number: int = None) -> bool:
+        """
+        has_week() checks if the training block has a week #
+
+        :param week_number: week #
+        :return: bool
+        """
+        return week_number in self.index
+        # end has_week()
+
+    def get_date(self, week_number: int = None, day_number: int = None) -> str:
+        """
+        get_date() retrieves the date of a day
+
+        :param week_number: week #
+        :param day_number: day # (1-7)
+        :return: %Y-%m-%d formatted date, None if the day doesn't exist
+        """
+        slot = self.index[week_number] * 7 + day_number - 1
+        if self.day_ids[slot] is None:
+            return None
+        # end if
+        return date.fromordinal(self.dates[slot]).isoformat()
+        # end get_date()
+
+    def get_logged_miles(self, week_number: int = None, day_number: int = None) -> float:
+        """
+        get_logged_miles() retrieves the miles of the runs logged on a day
+
+        :param week_number: week #
+        :param day_number: day # (1-7)
+        :return: # of miles
+        """
+        return self.logged[self.index[week_number] * 7 + day_number - 1]
+        # end get_logged_miles()
+
+    def get_race(self, week_number: int = None, day_number: int = None) -> (str, float):
+        """
+        get_race() retrieves the race of a day
+
+        :param week_number: week #
+        :param day_number: day # (1-7)
+        :return: (race name, race miles), None if there's no race on the day
+        """
+        slot = self.index[week_number] * 7 + day_number - 1
+        if self.race_names[slot] is None:
+            return None
+        # end if
+        return self.race_names[slot], self.race_miles[slot]
+        # end get_race()
+
+    def get_weeks(self) -> [(int, [float], int, [(int, str, float)])]:
+        """
+        get_weeks() retrieves the grid of the training block
+
+        :return: an [] of (week_number, miles of days 1-7, goal, races), races being
+                 an [] of (day_number, race name, race miles)
+        """
+        return [
+            (
+                week_number,
+                self.miles[x * 7:x * 7 + 7].tolist(),
+                self.goals[x],
+                [
+                    (slot - x * 7 + 1, self.race_names[slot], self.race_miles[slot])
+                    for slot in range(x * 7, x * 7 + 7) if self.race_names[slot] is not None
+                ]
+            )
+            for x, week_number in enumerate(self.week_numbers)
+        ]
+        # end get_weeks()
+
+    def set_goal(self, week_number: int = None, goal: int = 0):
+        """
+        set_goal() updates the goal of a week
+
+        :param week_number: week #
+        :param goal: goal
+        :return: none
+        """
+        x = self.index[week_number]
+        if self.goals[x] != goal:
+            self.goals[x] = goal
+            self.dirty_goals.add(x)
+        # end if
+        # end set_goal()
+
+    def set_miles(self, week_number: int = None, day_number: int = None, miles: float = 0) -> bool:
+        """
+        set_miles() updates the miles of a day, the runs logged on it are kept
+        so the miles can't go below them (see get_logged_miles())
+
+        :param week_number: week #
+        :param day_number: day # (1-7)
+        :param miles: # of miles
+        :return: False if the day doesn't exist or its logged runs are longer
+        """
+        slot = self.index[week_number] * 7 + day_number - 1
+        if self.day_ids[slot] is None or miles < self.logged[slot]:
+            return False
+        # end if
+        if self.miles[slot] != miles:
+            self.miles[slot] = miles
+            self.dirty_miles.add(slot)
+        # end if
+        return True
+        # end set_miles()
+
+    def is_dirty(self) -> bool:
+        """
+        is_dirty() checks if there are changes waiting to be flushed
+
+        :return: bool
+        """
+        return len(self.dirty_goals) > 0 or len(self.dirty_miles) > 0
+        # end is_dirty()
+
+    def flush(self):
+        """
+        flush() writes the changed goals and miles, one batch each
+
+        :return: none
+        """
+        if len(self.dirty_goals) > 0:
+            self.week.update_goals_by_week_ids(goals=[(self.week_ids[x], self.goals[x]) for x in self.dirty_goals])
+            self.dirty_goals = set()
+        # end if
+        if len(self.dirty_miles) > 0:
+            refused = self.run.set_miles_by_day_ids(miles=[(self.day_ids[x], self.miles[x]) for x in self.dirty_miles])
+            if len(refused) > 0:
+                logger.warning(f"{len(refused)} day(s) not set, runs were logged on them since the block was loaded")
+            # end if
+            self.dirty_miles = set()
+        # end if
+        # end flush()
+
+    # end TrainingBlock
+
+# end of file
@@ -1,20 +1,47 @@
 import logging
-import sys
 
 from functools import cached_property
 
+from backup import Backup
+from client.athlete import AthleteClient
+from client.day import DayClient
+from client.journal import JournalClient
+from client.race import RaceClient
+from client.replica import ReplicaClient
+from client.run import RunClient
+from client.training_block import TrainingBlockClient
+from client.week import WeekClient
+from completer import completer
 from printer import Printer
-from menu.race import Menu as RaceMenu
-from menu.training_block import Menu as TrainingBlockMenu
+from profiler import Profiler
+from registry import registry
+from shard import ShardManager
 
-date_format = "%Y-%m-%d"
 logger = logging.getLogger(name="app")
 
 
 class App:
-    def __init__(self, con, cur):
+    def __init__(
+            self,
+            con,
+            cur,
+            profiler: Profiler = None,
+            output: str = "table",
+            athlete: str = "default",
+            shards: ShardManager = None,
+            backup: Backup = None,
+            plugins: [str] = None
+    ):
         self.con = con
         self.cur = cur
+        self.output = output
+        self.athlete = athlete
+        self.athlete_id = None
+        self.shards = shards
+        self.backup = backup
+        self.profiler = profiler if profiler is not None else Profiler()
+        self.registry = registry
+        self.registry.load_plugins(modules=plugins if plugins is not None else [])
         # end __init__()
 
     @cached_property
@@ -24,60 +51,73 @@ class App:
 
         :return: Printer client
         """
-        return Printer(con=self.con, cur=self.cur)
+        return Printer(con=self.con, cur=self.cur, output=self.output, athlete_id=self.athlete_id)
         # end printer()
 
-    @cached_property
-    def race_menu(self) -> RaceMenu:
-        """
-        race_menu() caches a RaceMenu client for use the duration of the process
-
-        :return: RaceMenu client
-        """
-        return RaceMenu(con=self.con, cur=self.cur)
-        # end race_menu()
-
-    @cached_property
-    def tb_menu(self) -> TrainingBlockMenu:
+    def setup(self):
         """
-        tb_menu() caches a TrainingBlockMenu client for use the duration of
-        the process
+        setup() creates any missing tables and brings the existing ones up to
+        date, safe to run on every start. The rows that predate athletes are
+        given to the "default" athlete, then the App's athlete is resolved (and
+        added if it's new)
 
-        :return: TrainingBlockMenu client
+        :return: none
         """
-        return TrainingBlockMenu(con=self.con, cur=self.cur)
-        # end tb_menu()
+        res = self.cur.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        tables = [row[0] for row in res.fetchall()]
+        athlete = AthleteClient(con=self.con, cur=self.cur)
+        journal = JournalClient(con=self.con, cur=self.cur)
+        replica = ReplicaClient(con=self.con, cur=self.cur)
+        clients = {
+            "athlete": athlete,
+            "training_block": TrainingBlockClient(con=self.con, cur=self.cur),
+            "week": WeekClient(con=self.con, cur=self.cur),
+            "day": DayClient(con=self.con, cur=self.cur),
+            "race": RaceClient(con=self.con, cur=self.cur),
+            "run": RunClient(con=self.con, cur=self.cur),
+            "journal": journal,
+            "replica": replica,
+        }
+        for table, client in clients.items():
+            if table not in tables:
+                client.create_table()
+            # end if
+        # end for
+
+        athlete.upgrade_table()
+        default_athlete_id = athlete.get_athlete_id_by_name(name="default")
+        for table, client in clients.items():
+            if table not in ("athlete", "journal", "replica"):
+                client.upgrade_table(default_athlete_id=default_athlete_id)
+            # end if
+        # end for
+        replica.upgrade_table()
+        journal.upgrade_table()
+        self.athlete_id = athlete.get_athlete_id_by_name(name=self.athlete)
+
+        completer.load(names=self.printer.tb.stream_training_block_names())
+        completer.load(names=self.printer.race.stream_race_names())
+        completer.install()
+        self.con.flush()
+        # end setup()
 
     def __exec__(self):
         """
-        __exec__() is the main execution function of the App
+        __exec__() is the main execution function of the App, the commands are
+        dispatched through the registry
 
         :return: none
         """
         self.printer.print_main_menu()
         while True:
-            params = input("~ ").lower().strip().split(' ')
-            cmd = params[0]
-
-            if cmd == "tb" or cmd == "training-blocks":
-                self.tb_menu.main()
-            # end if "tb"
-
-            elif cmd == 'r' or cmd == "race":
-                self.race_menu.main()
-            # end elif 'r'
-
-            elif cmd == 'h' or cmd == "help":
-                self.printer.print_main_menu()
-            # end elif 'h'
-
-            elif cmd == "x" or cmd == "exit":
-                sys.exit("bye :)")
-            # end elif "x"
-
-            else:
-                print("invalid command!")
-            # end else
+            with self.con.idle():
+                line = input("~ ").strip()
+            # end with
+            with self.profiler:
+                if not self.registry.dispatch(app=self, line=line):
+                    print("invalid command!")
+                # end if
+            # end with
         # end while
         # end _exec()
 
@@ -0,0 +1,159 @@
+import logging
+import os
+import re
+import sqlite3 as sl
+import threading
+
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(name=__name__)
+
+snapshot_format = "%Y%m%d-%H%M%S-%f"
+
+
+class Backup:
+    """
+    Backup snapshots the database with the sqlite3 online backup API. The pages
+    are copied `pages` at a time with a `sleep` between the steps, so the
+    interactive session can keep reading and writing while a large database is
+    copied, and every snapshot is still a consistent copy. Snapshots are written
+    under a temporary name then renamed, only the last `keep` are kept. The
+    names are stamped to the microsecond, bumped past an existing snapshot, so
+    a snapshot never replaces another one.
+
+    Every snapshot opens its own connections, so the scheduled snapshots can run
+    on a background thread (every `interval` minutes) next to the session's
+    connection
+    """
+
+    def __init__(
+            self,
+            path: str = None,
+            directory: str = None,
+            keep: int = 5,
+            pages: int = 256,
+            sleep: float = 0.05,
+            interval: float = None,
+            **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.path = path
+        self.directory = directory if directory is not None else os.path.join(os.path.dirname(path), "backups")
+        self.keep = keep
+        self.pages = pages
+        self.sleep = sleep
+        self.interval = interval
+        self.prefix = os.path.splitext(os.path.basename(path))[0] + "-"
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        # end __init__()
+
+    def snapshots(self) -> [str]:
+        """
+        snapshots() retrieves the paths of the snapshots of the database, oldest
+        first
+
+        :return: an [] of paths
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        # end if
+        return sorted(
+            os.path.join(self.directory, file)
+            for file in os.listdir(self.directory)
+            if re.fullmatch(re.escape(self.prefix) + r"\d{8}-\d{6}(-\d{6})?\.db", file)
+        )
+        # end snapshots()
+
+    def snapshot(self) -> str:
+        """
+        snapshot() copies the database to a new snapshot then rotates the old ones
+
+        :return: path of the snapshot
+        """
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = datetime.now()
+            path = os.path.join(self.directory, f"{self.prefix}{stamp.strftime(snapshot_format)}.db")
+            while os.path.exists(path):  # the clock didn't move since the last snapshot
+                stamp += timedelta(microseconds=1)
+                path = os.path.join(self.directory, f"{self.prefix}{stamp.strftime(snapshot_format)}.db")
+            # end while
+            partial = path + ".part"
+            src = sl.connect(self.path)
+            dst = sl.connect(partial)
+            try:
+                src.backup(dst, pages=self.pages, sleep=self.sleep)
+            # end try
+            finally:
+                dst.close()
+                src.close()
+            # end finally
+            os.replace(partial, path)
+            logger.info(f"backed up {self.path} to {path}")
+            self.rotate()
+            return path
+        # end with
+        # end snapshot()
+
+    def rotate(self):
+        """
+        rotate() deletes all but the last `keep` snapshots
+
+        :return: none
+        """
+        snapshots = self.snapshots()
+        for path in snapshots[:max(len(snapshots) - self.keep, 0)]:
+            os.remove(path)
+            logger.info(f"removed backup {path}")
+        # end for
+        # end rotate()
+
+    def run(self):
+        """
+        run() is the body of the background thread, a snapshot every interval
+        until stopped
+
+        :return: none
+        """
+        while not self.stopped.wait(timeout=self.interval * 60):
+            try:
+                self.snapshot()
+            # end try
+            except Exception:
+                logger.exception("scheduled backup failed")
+            # end except
+        # end while
+        # end run()
+
+    def start(self):
+        """
+        start() starts the scheduled snapshots, if an interval is set
+
+        :return: none
+        """
+        if self.interval is None or self.thread is not None:
+            return
+        # end if
+        self.thread = threading.Thread(target=self.run, name="backup", daemon=True)
+        self.thread.start()
+        # end start()
+
+    def stop(self):
+        """
+        stop() stops the scheduled snapshots, waiting on a snapshot in progress
+
+        :return: none
+        """
+        if self.thread is None:
+            return
+        # end if
+        self.stopped.set()
+        self.thread.join()
+        self.thread = None
+        # end stop()
+
+    # end Backup
+
+# end of file
@@ -0,0 +1,96 @@
+import logging
+import uuid
+
+logger = logging.getLogger(name=__name__)
+
+
+class AthleteClient:
+    def __init__(self, con, cur, **kwargs):
+        super().__init__(**kwargs)
+        self.con = con
+        self.cur = cur
+        # end __init__()
+
+    def create_table(self):
+        """
+        create_table() creates the athlete table, only needs to run once
+
+        :return: none
+        """
+        self.cur.execute(
+            "CREATE TABLE athlete "
+            "(athlete_id VARCHAR(36), "
+            "name VARCHAR(64), "
+            "PRIMARY KEY (athlete_id));"
+        )
+        self.con.commit()
+        # end create_table()
+
+    def upgrade_table(self):
+        """
+        upgrade_table() brings an existing athlete table up to date, safe to run
+        on every start
+
+        :return: none
+        """
+        self.cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS athlete_name_idx ON athlete (name)")
+        self.con.commit()
+        # end upgrade_table()
+
+    def add_athlete(self, name: str = None) -> str:
+        """
+        add_athlete() adds a new athlete
+
+        :param name: name of the new athlete
+        :return: athlete_id
+        """
+        athlete_id = str(uuid.uuid4())
+        self.cur.execute(
+            "INSERT INTO athlete (athlete_id, name) VALUES(?, ?)",
+            (athlete_id, name)
+        )
+        self.con.commit()
+        return athlete_id
+        # end add_athlete()
+
+    def get_athlete_by_name(self, name: str = None):
+        """
+        get_athlete_by_name() retrieves an athlete given the athlete's name
+
+        :param name: name of the athlete
+        :return: an athlete
+        """
+        res = self.cur.execute("SELECT * FROM athlete WHERE name = ?", (name,))
+        self.con.commit()
+        return res.fetchone()
+        # end get_athlete_by_name()
+
+    def get_athlete_id_by_name(self, name: str = None) -> str:
+        """
+        get_athlete_id_by_name() retrieves the athlete_id of an athlete given the
+        athlete's name, the athlete is added if it doesn't exist yet
+
+        :param name: name of the athlete
+        :return: athlete_id
+        """
+        athlete = self.get_athlete_by_name(name=name)
+        if athlete is None:
+            return self.add_athlete(name=name)
+        # end if
+        return athlete[0]
+        # end get_athlete_id_by_name()
+
+    def get_all_athlete_names(self) -> [str]:
+        """
+        get_all_athlete_names() retrieves a list of the athlete names in the DB
+
+        :return: an [] of athlete names
+        """
+        res = self.cur.execute("SELECT name FROM athlete ORDER BY name")
+        self.con.commit()
+        return [row[0] for row in res.fetchall()]
+        # end get_all_athlete_names()
+
+    # end AthleteClient
+
+# end of file
@@ -2,18 +2,34 @@ import logging
 import uuid
 
 from datetime import datetime
+from functools import cached_property
+
+from client.race import day_race_sql
+from client.run import RunClient
+from client.stream import stream
 
 date_format = "%Y-%m-%d"
 logger = logging.getLogger(name=__name__)
 
 
 class DayClient:
-    def __init__(self, con, cur, **kwargs):
+    def __init__(self, con, cur, athlete_id: str = None, **kwargs):
         super().__init__(**kwargs)
         self.con = con
         self.cur = cur
+        self.athlete_id = athlete_id
         # end __init__()
 
+    @cached_property
+    def run(self) -> RunClient:
+        """
+        run() caches a RunClient for use the duration of the process
+
+        :return: a RunClient
+        """
+        return RunClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
+        # end run()
+
     def create_table(self):
         """
         create_table() creates the day table, only needs to run once
@@ -28,13 +44,36 @@ class DayClient:
             "miles INTEGER, "
             "training_block_id VARCHAR(36), "
             "week_id VARCHAR(36), "
+            "athlete_id VARCHAR(36), "
             "PRIMARY KEY (day_id), "
             "FOREIGN KEY (training_block_id) REFERENCES training_block(training_block_id), "
-            "FOREIGN KEY (week_id) REFERENCES week(week_id));"
+            "FOREIGN KEY (week_id) REFERENCES week(week_id), "
+            "FOREIGN KEY (athlete_id) REFERENCES athlete(athlete_id));"
         )
         self.con.commit()
         # end create_table()
 
+    def upgrade_table(self, default_athlete_id: str = None):
+        """
+        upgrade_table() brings an existing day table up to date, safe to run
+        on every start
+
+        :param default_athlete_id: athlete_id given to the days that predate athletes
+        :return: none
+        """
+        columns = [row[1] for row in self.cur.execute("PRAGMA table_info(day)").fetchall()]
+        if "athlete_id" not in columns:
+            self.cur.execute("ALTER TABLE day ADD COLUMN athlete_id VARCHAR(36) REFERENCES athlete(athlete_id)")
+        # end if
+        self.cur.execute("UPDATE day SET athlete_id = ? WHERE athlete_id IS NULL", (default_athlete_id,))
+
+        self.cur.execute("DROP INDEX IF EXISTS day_date_idx")
+        self.cur.execute("CREATE INDEX IF NOT EXISTS day_athlete_id_date_idx ON day (athlete_id, date)")
+        self.cur.execute("CREATE INDEX IF NOT EXISTS day_week_id_idx ON day (week_id, day_number)")
+        self.cur.execute("CREATE INDEX IF NOT EXISTS day_training_block_id_idx ON day (training_block_id, date)")
+        self.con.commit()
+        # end upgrade_table()
+
     def add_day(
             self,
             date: datetime = None,
@@ -56,14 +95,55 @@ class DayClient:
         """
         day_id = str(uuid.uuid4())
         self.cur.execute(
-            "INSERT INTO day (day_id, date, day_number, miles, training_block_id, week_id) "
-            "VALUES(?, ?, ?, ?, ?, ?)",
-            (day_id, date.strftime(date_format), day_number, miles, training_block_id, week_id)
+            "INSERT INTO day (day_id, date, day_number, miles, training_block_id, week_id, athlete_id) "
+            "VALUES(?, ?, ?, ?, ?, ?, ?)",
+            (day_id, date.strftime(date_format), day_number, miles, training_block_id, week_id, self.athlete_id)
         )
         self.con.commit()
         return day_id
         # end add_day()
 
+    def get_or_add_standalone_day(self, date: datetime = None) -> str:
+        """
+        get_or_add_standalone_day() retrieves the standalone day (no training
+        block, the day of a race run outside the blocks) of a date, adding it if
+        there's none yet, so the races of a date share one day
+
+        :param date: date
+        :return: a str day_id
+        """
+        res = self.cur.execute(
+            "SELECT day_id FROM day "
+            "WHERE training_block_id IS NULL AND week_id IS NULL AND date = ? AND athlete_id = ?",
+            (date.strftime(date_format), self.athlete_id)
+        )
+        day = res.fetchone()
+        if day is not None:
+            self.con.commit()
+            return day[0]
+        # end if
+        return self.add_day(date=date, miles=0)
+        # end get_or_add_standalone_day()
+
+    def delete_standalone_day_if_unused(self, day_id: str = None) -> bool:
+        """
+        delete_standalone_day_if_unused() removes a standalone day left without
+        a race or miles (ex. its race moved to another date), the same rows fsck
+        reports as unused days
+
+        :param day_id: day_id
+        :return: True if the day was removed
+        """
+        res = self.cur.execute(
+            "DELETE FROM day WHERE athlete_id = ? AND day_id = ? "
+            "AND training_block_id IS NULL AND week_id IS NULL AND NOT coalesce(miles, 0) > 0 "
+            "AND NOT EXISTS (SELECT 1 FROM race WHERE race.day_id = day.day_id)",
+            (self.athlete_id, day_id)
+        )
+        self.con.commit()
+        return res.rowcount > 0
+        # end delete_standalone_day_if_unused()
+
     def delete_day_by_id(self, day_id: str = None):
         """
         delete_day_by_id() removes a day given a day_id
@@ -71,7 +151,7 @@ class DayClient:
         :param day_id: day_id
         :return: none
         """
-        self.cur.execute("DELETE FROM day WHERE day_id = ?", (day_id,))
+        self.cur.execute("DELETE FROM day WHERE athlete_id = ? AND day_id = ?", (self.athlete_id, day_id))
         self.con.commit()
         # end delete_day_by_id()
 
@@ -82,7 +162,7 @@ class DayClient:
         :param week_id: week_id
         :return: none
         """
-        self.cur.execute("DELETE FROM day WHERE week_id = ?", (week_id,))
+        self.cur.execute("DELETE FROM day WHERE athlete_id = ? AND week_id = ?", (self.athlete_id, week_id))
         self.con.commit()
         # end delete_days_by_week_id()
 
@@ -93,7 +173,7 @@ class DayClient:
         :param day_id: day_id
         :return:
         """
-        res = self.cur.execute("SELECT * FROM day WHERE day_id = ?", (day_id,))
+        res = self.cur.execute("SELECT * FROM day WHERE athlete_id = ? AND day_id = ?", (self.athlete_id, day_id))
         self.con.commit()
         return res.fetchone()
     # end get_day_by_id()
@@ -105,11 +185,26 @@ class DayClient:
         :param week_id: week_id
         :return: an [] of days
         """
-        res = self.cur.execute("SELECT * FROM day WHERE week_id = ?", (week_id,))
-        self.con.commit()
-        return res.fetchall()
+        return list(self.stream_days_by_week_id(week_id=week_id))
         # get_days_by_week_id()
 
+    def stream_days_by_week_id(self, week_id: str = None, size: int = 500):
+        """
+        stream_days_by_week_id() streams the days associated with a week_id, see
+        stream()
+
+        :param week_id: week_id
+        :param size: # of rows per fetch
+        :return: a generator of days
+        """
+        return stream(
+            self.con,
+            "SELECT * FROM day WHERE athlete_id = ? AND week_id = ?",
+            (self.athlete_id, week_id),
+            size=size
+        )
+        # end stream_days_by_week_id()
+
     def get_day_by_week_id_and_day_number(self, week_id: str = None, day_number: int = 0):
         """
         get_day_by_week_id_and_day_number() retrieves a specific day (defined by day_number)
@@ -120,8 +215,8 @@ class DayClient:
         :return: a day
         """
         res = self.cur.execute(
-                "SELECT * FROM day WHERE week_id = ? AND day_number = ?",
-                (week_id, day_number)
+                "SELECT * FROM day WHERE athlete_id = ? AND week_id = ? AND day_number = ?",
+                (self.athlete_id, week_id, day_number)
             )
         self.con.commit()
         return res.fetchone()
@@ -141,34 +236,175 @@ class DayClient:
         """
         res = self.cur.execute(
             "SELECT * FROM day "
-            "WHERE date = ? "
+            "WHERE athlete_id = ? "
+            "AND date = ? "
             "AND training_block_id = ?",
-            (date.strftime(date_format), training_block_id)
+            (self.athlete_id, date.strftime(date_format), training_block_id)
         )
         self.con.commit()
         return res.fetchone()
         # end get_day_by_date()
 
+    def get_days_by_date(self, date: datetime = None):
+        """
+        get_days_by_date() retrieves the days on a date across the training
+        blocks (more than one if the blocks overlap), latest block first
+
+        :param date: date
+        :return: an [] of (day_id, training_block name)
+        """
+        res = self.cur.execute(
+            "SELECT day.day_id, training_block.name FROM day "
+            "LEFT JOIN training_block ON training_block.training_block_id = day.training_block_id "
+            "WHERE day.athlete_id = ? AND day.date = ? "
+            "ORDER BY training_block.start_date DESC",
+            (self.athlete_id, date.strftime(date_format))
+        )
+        self.con.commit()
+        return res.fetchall()
+        # end get_days_by_date()
+
+    def get_day_context_by_date(self, date: datetime = None, training_block_id: str = None):
+        """
+        get_day_context_by_date() resolves a date to its training block, week,
+        goal, the race on the date and the next race of the block (on or after
+        the date) in a single query. Blocks that overlap the date are returned
+        most recent first
+
+        :param date: date
+        :param training_block_id: optional training_block_id to limit the search to
+        :return: an [] of (date, day_number, week_number, goal, training block name,
+                 race name, race miles, race date, the date's race name, the date's race miles)
+        """
+        res = self.cur.execute(
+            "SELECT day.date, day.day_number, week.week_number, week.goal, training_block.name, "
+            "race.name, race.miles, race_day.date, today_race.name, today_race.miles "
+            "FROM day "
+            "JOIN week ON week.week_id = day.week_id "
+            "JOIN training_block ON training_block.training_block_id = day.training_block_id "
+            "LEFT JOIN race ON race.race_id = ("
+            "    SELECT next_race.race_id FROM race AS next_race "
+            "    JOIN day AS next_day ON next_day.day_id = next_race.day_id "
+            "    WHERE next_race.training_block_id = day.training_block_id "
+            "    AND next_day.date >= day.date "
+            "    ORDER BY next_day.date LIMIT 1) "
+            "LEFT JOIN day AS race_day ON race_day.day_id = race.day_id "
+            f"LEFT JOIN race AS today_race ON today_race.race_id = {day_race_sql} "
+            "WHERE day.athlete_id = ? "
+            "AND day.date = ? "
+            "AND (? IS NULL OR day.training_block_id = ?) "
+            "ORDER BY training_block.start_date DESC",
+            (self.athlete_id, date.strftime(date_format), training_block_id, training_block_id)
+        )
+        self.con.commit()
+        return res.fetchall()
+        # end get_day_context_by_date()
+
+    def get_days_by_date_range(self, start_date: datetime = None, end_date: datetime = None):
+        """
+        get_days_by_date_range() retrieves every day between start_date and
+        end_date (inclusive) across all the training blocks, served by the
+        day_athlete_id_date_idx index
+
+        :param start_date: first date of the range
+        :param end_date: last date of the range
+        :return: an [] of (date, day_number, miles, training_block name, week_number)
+        """
+        return list(self.stream_days_by_date_range(start_date=start_date, end_date=end_date))
+        # end get_days_by_date_range()
+
+    def stream_days_by_date_range(self, start_date: datetime = None, end_date: datetime = None, size: int = 500):
+        """
+        stream_days_by_date_range() streams the days of get_days_by_date_range(),
+        see stream()
+
+        :param start_date: first date of the range
+        :param end_date: last date of the range
+        :param size: # of rows per fetch
+        :return: a generator of (date, day_number, miles, training_block name, week_number)
+        """
+        return stream(
+            self.con,
+            "SELECT day.date, day.day_number, day.miles, training_block.name, week.week_number "
+            "FROM day "
+            "LEFT JOIN week ON week.week_id = day.week_id "
+            "LEFT JOIN training_block ON training_block.training_block_id = day.training_block_id "
+            "WHERE day.athlete_id = ? "
+            "AND day.date BETWEEN ? AND ? "
+            "ORDER BY day.date, training_block.name",
+            (self.athlete_id, start_date.strftime(date_format), end_date.strftime(date_format)),
+            size=size
+        )
+        # end stream_days_by_date_range()
+
+    def get_calendar_by_year(self, year: int = None):
+        """
+        get_calendar_by_year() retrieves the miles and # of races of every date
+        of a year across the training blocks in one range query, served by the
+        day_athlete_id_date_idx index. A date in overlapping blocks counts its
+        biggest day
+
+        :param year: year
+        :return: an [] of (date, miles, # of races)
+        """
+        res = self.cur.execute(
+            "SELECT day.date, max(day.miles), count(race.race_id) "
+            "FROM day "
+            "LEFT JOIN race ON race.day_id = day.day_id AND race.athlete_id = day.athlete_id "
+            "WHERE day.athlete_id = ? "
+            "AND day.date BETWEEN ? AND ? "
+            "GROUP BY day.date",
+            (self.athlete_id, f"{year:04d}-01-01", f"{year:04d}-12-31")
+        )
+        self.con.commit()
+        return res.fetchall()
+        # end get_calendar_by_year()
+
+    def stream_days_by_year(self, year: int = None, size: int = 500):
+        """
+        stream_days_by_year() streams every day of a year in date order with its
+        week goal and races, served by the day_athlete_id_date_idx index. A day
+        with several races comes back once per race, in consecutive rows (the
+        days of a date are ordered by day_id), see stream()
+
+        :param year: year
+        :param size: # of rows per fetch
+        :return: a generator of (day_id, date, miles, week_id, goal, race name, race miles)
+        """
+        return stream(
+            self.con,
+            "SELECT day.day_id, day.date, day.miles, day.week_id, week.goal, race.name, race.miles "
+            "FROM day "
+            "LEFT JOIN week ON week.week_id = day.week_id "
+            "LEFT JOIN race ON race.day_id = day.day_id AND race.athlete_id = day.athlete_id "
+            "WHERE day.athlete_id = ? "
+            "AND day.date BETWEEN ? AND ? "
+            "ORDER BY day.date, day.day_id",
+            (self.athlete_id, f"{year:04d}-01-01", f"{year:04d}-12-31"),
+            size=size
+        )
+        # end stream_days_by_year()
+
     def update_day_by_week_id_and_day_number(
             self,
             miles: int = 0,
             week_id: str = None,
             day_number: int = None
-    ):
+    ) -> bool:
         """
         update_day_by_week_id_and_day_number() updates a specific day (defined by day_number)
-        associated with a week_id
+        associated with a week_id, see RunClient.set_miles_by_day_ids()
 
         :param miles: # of miles run
         :param week_id: week_id
         :param day_number: day_number
-        :return: none
+        :return: False if the day doesn't exist or its logged runs are longer
         """
-        self.cur.execute(
-            "UPDATE day SET miles = ? WHERE week_id = ? AND day_number = ? ",
-            (miles, week_id, day_number)
-        )
-        self.con.commit()
+        day = self.get_day_by_week_id_and_day_number(week_id=week_id, day_number=day_number)
+        if day is None:
+            return False
+        # end if
+        return len(self.run.set_miles_by_day_ids(miles=[(day[0], miles)])) == 0
         # end update_day_by_week_id_and_day_number()
 
     # end DayClient
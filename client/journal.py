@@ -0,0 +1,157 @@
+import logging
+
+from client.stream import stream
+
+logger = logging.getLogger(name=__name__)
+
+# journaled tables and their keys
+entities = {
+    "training_block": "training_block_id",
+    "week": "week_id",
+    "day": "day_id",
+    "race": "race_id",
+    "run": "run_id",
+}
+
+# sync stamps (see client/replica.py), restamping a row isn't a change of its own
+unjournaled = ("modified_at", "modified_by")
+
+
+class JournalClient:
+    """
+    JournalClient reads the journal, an append-only log of every change to the
+    training_block, week, day, race and run tables. The records are written
+    by triggers, in the same transaction as the change itself, so every client
+    mutation is journaled without the clients knowing about it:
+    - insert: old is NULL, new is the row
+    - update: old and new hold only the columns that changed
+    - delete: old is the row, new is NULL
+
+    seq increases monotonically (AUTOINCREMENT, never reused), so consumers can
+    pick up the changes since the last seq they've seen
+    """
+
+    def __init__(self, con, cur, athlete_id: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self.con = con
+        self.cur = cur
+        self.athlete_id = athlete_id
+    # end __init__()
+
+    def create_table(self):
+        """
+        create_table() creates the journal table, only needs to run once
+
+        :return: none
+        """
+        self.cur.execute(
+            "CREATE TABLE journal "
+            "(seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "entity VARCHAR(16), "
+            "key VARCHAR(36), "
+            "old TEXT, "
+            "new TEXT, "
+            "ts TEXT, "
+            "athlete_id VARCHAR(36));"
+        )
+        self.con.commit()
+    # end create_table()
+
+    def upgrade_table(self):
+        """
+        upgrade_table() (re)creates the journal triggers from the current columns
+        of the journaled tables, safe to run on every start. Must run after the
+        journaled tables are upgraded
+
+        :return: none
+        """
+        self.cur.execute("CREATE INDEX IF NOT EXISTS journal_athlete_id_seq_idx ON journal (athlete_id, seq)")
+        ts = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+        for entity, key in entities.items():
+            columns = [
+                row[1] for row in self.cur.execute(f"PRAGMA table_info({entity})").fetchall()
+                if row[1] not in unjournaled
+            ]
+            old = "json_object(" + ", ".join(f"'{column}', old.{column}" for column in columns) + ")"
+            new = "json_object(" + ", ".join(f"'{column}', new.{column}" for column in columns) + ")"
+            # drop the columns that didn't change from the update records ('$._' is a no-op)
+            unchanged = ", ".join(
+                f"CASE WHEN old.{column} IS new.{column} THEN '$.{column}' ELSE '$._' END" for column in columns
+            )
+            changed = " OR ".join(f"old.{column} IS NOT new.{column}" for column in columns)
+
+            self.cur.execute(f"DROP TRIGGER IF EXISTS journal_{entity}_insert")
+            self.cur.execute(
+                f"CREATE TRIGGER journal_{entity}_insert AFTER INSERT ON {entity} BEGIN "
+                f"INSERT INTO journal (entity, key, old, new, ts, athlete_id) "
+                f"VALUES ('{entity}', new.{key}, NULL, {new}, {ts}, new.athlete_id); "
+                f"END"
+            )
+            self.cur.execute(f"DROP TRIGGER IF EXISTS journal_{entity}_update")
+            self.cur.execute(
+                f"CREATE TRIGGER journal_{entity}_update AFTER UPDATE ON {entity} WHEN {changed} BEGIN "
+                f"INSERT INTO journal (entity, key, old, new, ts, athlete_id) "
+                f"VALUES ('{entity}', new.{key}, json_remove({old}, {unchanged}), "
+                f"json_remove({new}, {unchanged}), {ts}, new.athlete_id); "
+                f"END"
+            )
+            self.cur.execute(f"DROP TRIGGER IF EXISTS journal_{entity}_delete")
+            self.cur.execute(
+                f"CREATE TRIGGER journal_{entity}_delete AFTER DELETE ON {entity} BEGIN "
+                f"INSERT INTO journal (entity, key, old, new, ts, athlete_id) "
+                f"VALUES ('{entity}', old.{key}, {old}, NULL, {ts}, old.athlete_id); "
+                f"END"
+            )
+        # end for
+        self.con.commit()
+    # end upgrade_table()
+
+    def get_last_seq(self) -> int:
+        """
+        get_last_seq() retrieves the seq of the athlete's latest change
+
+        :return: seq, 0 if nothing is journaled yet
+        """
+        res = self.cur.execute(
+            "SELECT max(seq) FROM journal WHERE athlete_id = ?",
+            (self.athlete_id,)
+        )
+        self.con.commit()
+        seq = res.fetchone()[0]
+        return seq if seq is not None else 0
+    # end get_last_seq()
+
+    def get_changes_since(self, seq: int = 0, limit: int = -1):
+        """
+        get_changes_since() retrieves the athlete's changes after a seq, oldest
+        first
+
+        :param seq: last seq already seen
+        :param limit: max # of changes, -1 for all of them
+        :return: an [] of (seq, entity, key, old, new, ts)
+        """
+        return list(self.stream_changes_since(seq=seq, limit=limit))
+    # end get_changes_since()
+
+    def stream_changes_since(self, seq: int = 0, limit: int = -1, size: int = 500):
+        """
+        stream_changes_since() streams the changes of get_changes_since(), see
+        stream()
+
+        :param seq: last seq already seen
+        :param limit: max # of changes, -1 for all of them
+        :param size: # of rows per fetch
+        :return: a generator of (seq, entity, key, old, new, ts)
+        """
+        return stream(
+            self.con,
+            "SELECT seq, entity, key, old, new, ts FROM journal "
+            "WHERE athlete_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+            (self.athlete_id, seq, limit),
+            size=size
+        )
+    # end stream_changes_since()
+
+    # end JournalClient
+
+# end of file
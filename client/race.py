@@ -1,15 +1,31 @@
 import logging
 import uuid
 
+from client.stream import stream
+
 date_format = "%Y-%m-%d"
 logger = logging.getLogger(name=__name__)
 
+# the race on a day (the longest, if more than one): raced on the day itself, or on a standalone day (no
+# training block) of the same date. LEFT JOIN race ON race.race_id = {day_race_sql} annotates the rows of
+# a query over `day` in the same pass, served by the race_day_id_idx and day_training_block_id_idx indexes
+# (the + keeps day_athlete_id_date_idx out, it would scan every block's day of the date)
+day_race_sql = (
+    "(SELECT day_race.race_id FROM race AS day_race "
+    "WHERE day_race.day_id = day.day_id "
+    "OR day_race.day_id IN (SELECT loose_day.day_id FROM day AS loose_day "
+    "WHERE loose_day.training_block_id IS NULL AND loose_day.date = day.date "
+    "AND +loose_day.athlete_id = day.athlete_id) "
+    "ORDER BY day_race.miles DESC LIMIT 1)"
+)
+
 
 class RaceClient:
-    def __init__(self, con, cur, **kwargs):
+    def __init__(self, con, cur, athlete_id: str = None, **kwargs):
         super().__init__(**kwargs)
         self.con = con
         self.cur = cur
+        self.athlete_id = athlete_id
 
     def create_table(self):
         """
@@ -18,20 +34,79 @@ class RaceClient:
         :return: none
         """
         self.cur.execute(
-            "CREATE TABLE races "
+            "CREATE TABLE race "
             "(race_id VARCHAR(36), "
             "day_id VARCHAR(36), "
             "miles FLOAT, "
             "name VARCHAR(64), "
             "url VARCHAR(1024), "
             "training_block_id VARCHAR(1024), "
+            "athlete_id VARCHAR(36), "
             "PRIMARY KEY (race_id), "
             "FOREIGN KEY (day_id) REFERENCES day(day_id), "
-            "FOREIGN KEY (training_block_id) REFERENCES training_block(training_block_id));"
+            "FOREIGN KEY (training_block_id) REFERENCES training_block(training_block_id), "
+            "FOREIGN KEY (athlete_id) REFERENCES athlete(athlete_id));"
         )
         self.con.commit()
         # end create_table()
 
+    def upgrade_table(self, default_athlete_id: str = None):
+        """
+        upgrade_table() brings an existing race table up to date, safe to run
+        on every start
+
+        :param default_athlete_id: athlete_id given to the races that predate athletes
+        :return: none
+        """
+        columns = [row[1] for row in self.cur.execute("PRAGMA table_info(race)").fetchall()]
+        if "athlete_id" not in columns:
+            self.cur.execute("ALTER TABLE race ADD COLUMN athlete_id VARCHAR(36) REFERENCES athlete(athlete_id)")
+        # end if
+        self.cur.execute("UPDATE race SET athlete_id = ? WHERE athlete_id IS NULL", (default_athlete_id,))
+
+        self.cur.execute("CREATE INDEX IF NOT EXISTS race_athlete_id_name_idx ON race (athlete_id, name)")
+        self.cur.execute("CREATE INDEX IF NOT EXISTS race_day_id_idx ON race (day_id)")
+        self.cur.execute("CREATE INDEX IF NOT EXISTS race_training_block_id_idx ON race (training_block_id)")
+
+        # race_fts mirrors race.name and race.url for full-text search, kept in sync by triggers
+        res = self.cur.execute("SELECT name FROM sqlite_master WHERE name = 'race_fts'")
+        rebuild = res.fetchone() is None
+        self.cur.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS race_fts "
+            "USING fts5(name, url, content='race', content_rowid='rowid', prefix='2 3')"
+        )
+        self.cur.execute(
+            "CREATE TRIGGER IF NOT EXISTS race_fts_insert AFTER INSERT ON race BEGIN "
+            "INSERT INTO race_fts (rowid, name, url) VALUES (new.rowid, new.name, new.url); "
+            "END"
+        )
+        self.cur.execute(
+            "CREATE TRIGGER IF NOT EXISTS race_fts_delete AFTER DELETE ON race BEGIN "
+            "INSERT INTO race_fts (race_fts, rowid, name, url) VALUES ('delete', old.rowid, old.name, old.url); "
+            "END"
+        )
+        self.cur.execute(
+            "CREATE TRIGGER IF NOT EXISTS race_fts_update AFTER UPDATE OF name, url ON race BEGIN "
+            "INSERT INTO race_fts (race_fts, rowid, name, url) VALUES ('delete', old.rowid, old.name, old.url); "
+            "INSERT INTO race_fts (rowid, name, url) VALUES (new.rowid, new.name, new.url); "
+            "END"
+        )
+        self.con.commit()
+        if rebuild:
+            self.rebuild_search_index()
+        # end if
+        # end upgrade_table()
+
+    def rebuild_search_index(self):
+        """
+        rebuild_search_index() repopulates race_fts from the race table
+
+        :return: none
+        """
+        self.cur.execute("INSERT INTO race_fts (race_fts) VALUES ('rebuild')")
+        self.con.commit()
+        # end rebuild_search_index()
+
     def add_race(
             self,
             day_id: str = None,
@@ -52,9 +127,9 @@ class RaceClient:
         """
         race_id = str(uuid.uuid4())
         self.cur.execute(
-            "INSERT INTO race (race_id, day_id, miles, name, training_block_id, url) "
-            "VALUES(?, ?, ?, ?, ?, ?)",
-            (race_id, day_id, miles, name, training_block_id, url)
+            "INSERT INTO race (race_id, day_id, miles, name, training_block_id, url, athlete_id) "
+            "VALUES(?, ?, ?, ?, ?, ?, ?)",
+            (race_id, day_id, miles, name, training_block_id, url, self.athlete_id)
         )
         self.con.commit()
         return race_id
@@ -67,7 +142,7 @@ class RaceClient:
         :param race_id: race ID to remove
         :return:
         """
-        self.cur.execute("DELETE FROM race WHERE race_id = ?", (race_id,))
+        self.cur.execute("DELETE FROM race WHERE athlete_id = ? AND race_id = ?", (self.athlete_id, race_id))
         self.con.commit()
         # end delete_race_by_id()
 
@@ -78,17 +153,38 @@ class RaceClient:
         :param name: race name to remove
         :return:
         """
-        self.cur.execute("DELETE FROM race WHERE name = ?", (name,))
+        self.cur.execute("DELETE FROM race WHERE athlete_id = ? AND name = ?", (self.athlete_id, name))
         self.con.commit()
         # end delete_race_by_name()
 
+    def get_all_race_names(self) -> [str]:
+        """
+        get_all_race_names() retrieves a list of the race names in the DB
+
+        :return: an [] of race names
+        """
+        return list(self.stream_race_names())
+        # end get_all_race_names()
+
+    def stream_race_names(self, size: int = 500):
+        """
+        stream_race_names() streams the race names, see stream()
+
+        :param size: # of rows per fetch
+        :return: a generator of race names
+        """
+        for row in stream(self.con, "SELECT name FROM race WHERE athlete_id = ?", (self.athlete_id,), size=size):
+            yield row[0]
+        # end for
+        # end stream_race_names()
+
     def get_race_by_name(self, name: str = None):
         """
         get_race_by_name() retrieves a race give the race's name
 
         :return: race
         """
-        res = self.cur.execute("SELECT * FROM race WHERE name = ?", (name,))
+        res = self.cur.execute("SELECT * FROM race WHERE athlete_id = ? AND name = ?", (self.athlete_id, name))
         self.con.commit()
         return res.fetchone()
         # end get_race_by_name()
@@ -100,7 +196,7 @@ class RaceClient:
 
         :return: day_id
         """
-        res = self.cur.execute("SELECT day_id FROM race WHERE name = ?", (name,))
+        res = self.cur.execute("SELECT day_id FROM race WHERE athlete_id = ? AND name = ?", (self.athlete_id, name))
         self.con.commit()
         return res.fetchone()[0]
         # end get_day_id_by_name()
@@ -111,7 +207,7 @@ class RaceClient:
 
         :return: miles
         """
-        res = self.cur.execute("SELECT miles FROM race WHERE name = ?", (name,))
+        res = self.cur.execute("SELECT miles FROM race WHERE athlete_id = ? AND name = ?", (self.athlete_id, name))
         self.con.commit()
         return res.fetchone()[0]
         # end get_miles_by_name()
@@ -122,7 +218,7 @@ class RaceClient:
 
         :return: url
         """
-        res = self.cur.execute("SELECT url FROM race WHERE name = ?", (name,))
+        res = self.cur.execute("SELECT url FROM race WHERE athlete_id = ? AND name = ?", (self.athlete_id, name))
         self.con.commit()
         return res.fetchone()[0]
         # end get_url_by_name()
@@ -131,13 +227,81 @@ class RaceClient:
         """
         get_races() retrieves all the races in the race table
 
-        :return:
+        :return: an [] of races
         """
-        res = self.cur.execute("SELECT * FROM race")
+        res = self.cur.execute("SELECT * FROM race WHERE athlete_id = ?", (self.athlete_id,))
         self.con.commit()
         return res.fetchall()
         # end get_races()
 
+    def stream_races(self, training_block_id: str = None, size: int = 500):
+        """
+        stream_races() streams every race ordered by date (of the training block
+        if one is given), the rows of get_races_page() without a limit, see
+        stream()
+
+        :param training_block_id: optional training_block_id to limit the races to
+        :param size: # of rows per fetch
+        :return: a generator of (race_id, date, name, miles, url)
+        """
+        return stream(
+            self.con,
+            "SELECT race.race_id, day.date, race.name, race.miles, race.url FROM race "
+            "JOIN day ON day.day_id = race.day_id "
+            "WHERE day.athlete_id = ? "
+            "AND race.athlete_id = ? "
+            "AND (? IS NULL OR race.training_block_id = ?) "
+            "ORDER BY day.date, race.race_id",
+            (self.athlete_id, self.athlete_id, training_block_id, training_block_id),
+            size=size
+        )
+        # end stream_races()
+
+    def get_races_page(
+            self,
+            after: (str, str) = None,
+            before: (str, str) = None,
+            limit: int = 20,
+            training_block_id: str = None
+    ):
+        """
+        get_races_page() retrieves a page of races ordered by date using keyset
+        (seek) pagination, so any page costs the same regardless of how deep it is
+
+        :param after: (date, race_id) of the last race of the previous page
+        :param before: (date, race_id) of the first race of the next page
+        :param limit: page size, -1 for no limit
+        :param training_block_id: optional training_block_id to limit the races to
+        :return: an [] of (race_id, date, name, miles, url)
+        """
+        query = (
+            "SELECT race.race_id, day.date, race.name, race.miles, race.url FROM race "
+            "JOIN day ON day.day_id = race.day_id "
+            "WHERE day.athlete_id = ? "
+            "AND race.athlete_id = ? "
+            "AND (? IS NULL OR race.training_block_id = ?) "
+        )
+        args = [self.athlete_id, self.athlete_id, training_block_id, training_block_id]
+        if after is not None:
+            query += "AND (day.date, race.race_id) > (?, ?) ORDER BY day.date, race.race_id "
+            args += list(after)
+        # end if
+        elif before is not None:
+            query += "AND (day.date, race.race_id) < (?, ?) ORDER BY day.date DESC, race.race_id DESC "
+            args += list(before)
+        # end elif
+        else:
+            query += "ORDER BY day.date, race.race_id "
+        # end else
+        res = self.cur.execute(query + "LIMIT ?", args + [limit])
+        self.con.commit()
+        rows = res.fetchall()
+        if before is not None:
+            rows.reverse()
+        # end if
+        return rows
+        # end get_races_page()
+
     def get_races_by_training_block_id(self, training_block_id: str = None):
         """
         get_races_by_training_block_id() retrieves all the races given a
@@ -147,13 +311,39 @@ class RaceClient:
         :return: an [] of races
         """
         res = self.cur.execute(
-            "SELECT * FROM race WHERE training_block_id = ?",
-            (training_block_id,)
+            "SELECT * FROM race WHERE athlete_id = ? AND training_block_id = ?",
+            (self.athlete_id, training_block_id)
         )
         self.con.commit()
         return res.fetchall()
         # end get_races_by_training_block_id()
 
+    def search_races(self, terms: [str] = None, limit: int = 20):
+        """
+        search_races() retrieves the races whose name or URL match every one of
+        the terms as a prefix, best matches first
+
+        :param terms: an [] of search terms
+        :param limit: max # of races to return
+        :return: an [] of (race_id, date, name, miles, url)
+        """
+        query = " ".join('"' + term.replace('"', '') + '"*' for term in terms if len(term.replace('"', '')) > 0)
+        if len(query) == 0:
+            return []
+        # end if
+        res = self.cur.execute(
+            "SELECT race.race_id, day.date, race.name, race.miles, race.url FROM race_fts "
+            "JOIN race ON race.rowid = race_fts.rowid "
+            "LEFT JOIN day ON day.day_id = race.day_id "
+            "WHERE race_fts MATCH ? "
+            "AND race.athlete_id = ? "
+            "ORDER BY race_fts.rank LIMIT ?",
+            (query, self.athlete_id, limit)
+        )
+        self.con.commit()
+        return res.fetchall()
+        # end search_races()
+
     def update_day_id_by_id(self, race_id: str = None, day_id: str = None):
         """
         update_day_id_by_id() updates the day_id of a given race ID
@@ -163,8 +353,8 @@ class RaceClient:
         :return: none
         """
         self.cur.execute(
-            "UPDATE race SET day_id = ? WHERE race_id = ?",
-            (day_id, race_id)
+            "UPDATE race SET day_id = ? WHERE athlete_id = ? AND race_id = ?",
+            (day_id, self.athlete_id, race_id)
         )
         self.con.commit()
         # end update_day_id_by_id()
@@ -177,8 +367,8 @@ class RaceClient:
         :param name: name
         :return: none
         """
-        self.cur.execute("UPDATE race SET name = ? WHERE race_id = ?",
-                               (name, race_id))
+        self.cur.execute("UPDATE race SET name = ? WHERE athlete_id = ? AND race_id = ?",
+                               (name, self.athlete_id, race_id))
         self.con.commit()
         # end update_name_by_id()
 
@@ -190,8 +380,8 @@ class RaceClient:
         :param miles: miles
         :return: none
         """
-        self.cur.execute("UPDATE race SET miles = ? WHERE race_id = ?",
-                               (miles, race_id))
+        self.cur.execute("UPDATE race SET miles = ? WHERE athlete_id = ? AND race_id = ?",
+                               (miles, self.athlete_id, race_id))
         self.con.commit()
         # end update_miles_by_id()
 
@@ -203,8 +393,8 @@ class RaceClient:
         :param url: url
         :return: none
         """
-        self.cur.execute("UPDATE race SET url = ? WHERE race_id = ?",
-                               (url, race_id))
+        self.cur.execute("UPDATE race SET url = ? WHERE athlete_id = ? AND race_id = ?",
+                               (url, self.athlete_id, race_id))
         self.con.commit()
         # end update_url_by_id()
 
@@ -219,7 +409,7 @@ class RaceClient:
         if name is None:
             return False
         names = []
-        rows = self.cur.execute("SELECT name FROM race").fetchall()
+        rows = self.cur.execute("SELECT name FROM race WHERE athlete_id = ?", (self.athlete_id,)).fetchall()
         self.con.commit()
         for row in rows:
             names.append(row[0])
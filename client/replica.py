@@ -0,0 +1,289 @@
+import logging
+import uuid
+
+from functools import cached_property
+
+from client.athlete import AthleteClient
+from client.journal import entities
+
+logger = logging.getLogger(name=__name__)
+
+# stamp of the rows that predate sync, older than any real change
+epoch = "1970-01-01T00:00:00.000Z"
+
+
+class ReplicaClient:
+    """
+    ReplicaClient keeps the bookkeeping of a database replica for sync:
+    - replica: the random id of this copy of the database
+    - peer: per peer replica, the last journal seq the peer has been sent
+    - modified_at / modified_by on training_block, week, day, race and run: when
+      and by which replica the row was last changed, stamped by triggers unless
+      the write sets them itself (as sync does)
+
+    The changes since a peer's seq are read off the journal, conflicts between
+    replicas go to the latest (modified_at, modified_by), so both sides of a
+    sync always pick the same winner
+    """
+
+    def __init__(self, con, cur, **kwargs):
+        super().__init__(**kwargs)
+        self.con = con
+        self.cur = cur
+    # end __init__()
+
+    @cached_property
+    def athlete(self) -> AthleteClient:
+        """
+        athlete() caches an AthleteClient for use the duration of the process
+
+        :return: an AthleteClient
+        """
+        return AthleteClient(con=self.con, cur=self.cur)
+    # end athlete()
+
+    def create_table(self):
+        """
+        create_table() creates the replica and peer tables, only needs to run once
+
+        :return: none
+        """
+        self.cur.execute("CREATE TABLE replica (replica_id VARCHAR(36));")
+        self.cur.execute(
+            "CREATE TABLE peer "
+            "(replica_id VARCHAR(36), "
+            "seq INTEGER, "
+            "PRIMARY KEY (replica_id));"
+        )
+        self.con.commit()
+    # end create_table()
+
+    def upgrade_table(self):
+        """
+        upgrade_table() stamps the synced tables, safe to run on every start.
+        The rows from before sync are stamped as of the epoch
+
+        :return: none
+        """
+        if self.cur.execute("SELECT replica_id FROM replica").fetchone() is None:
+            self.cur.execute("INSERT INTO replica (replica_id) VALUES(?)", (str(uuid.uuid4()),))
+        # end if
+
+        now = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+        for entity in entities:
+            columns = [row[1] for row in self.cur.execute(f"PRAGMA table_info({entity})").fetchall()]
+            if "modified_at" not in columns:
+                self.cur.execute(f"ALTER TABLE {entity} ADD COLUMN modified_at TEXT")
+                self.cur.execute(f"ALTER TABLE {entity} ADD COLUMN modified_by VARCHAR(36)")
+                self.cur.execute(f"UPDATE {entity} SET modified_at = ?, modified_by = ''", (epoch,))
+            # end if
+
+            stamp = (
+                f"UPDATE {entity} SET modified_at = {now}, modified_by = (SELECT replica_id FROM replica) "
+                f"WHERE rowid = new.rowid; "
+            )
+            self.cur.execute(
+                f"CREATE TRIGGER IF NOT EXISTS replica_{entity}_insert AFTER INSERT ON {entity} "
+                f"WHEN new.modified_at IS NULL BEGIN {stamp}END"
+            )
+            self.cur.execute(
+                f"CREATE TRIGGER IF NOT EXISTS replica_{entity}_update AFTER UPDATE ON {entity} "
+                f"WHEN new.modified_at IS old.modified_at AND new.modified_by IS old.modified_by BEGIN {stamp}END"
+            )
+        # end for
+        self.con.commit()
+    # end upgrade_table()
+
+    def is_replica(self) -> bool:
+        """
+        is_replica() checks if the database has been set up for sync
+
+        :return: bool
+        """
+        res = self.cur.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'replica'")
+        self.con.commit()
+        return res.fetchone() is not None
+    # end is_replica()
+
+    def get_replica_id(self) -> str:
+        """
+        get_replica_id() retrieves the id of this replica
+
+        :return: replica_id
+        """
+        res = self.cur.execute("SELECT replica_id FROM replica")
+        self.con.commit()
+        return res.fetchone()[0]
+    # end get_replica_id()
+
+    def reset_replica_id(self) -> str:
+        """
+        reset_replica_id() gives this replica a new id, for a database that was
+        copied from its peer
+
+        :return: the new replica_id
+        """
+        replica_id = str(uuid.uuid4())
+        self.cur.execute("UPDATE replica SET replica_id = ?", (replica_id,))
+        self.con.commit()
+        return replica_id
+    # end reset_replica_id()
+
+    def get_last_seq(self) -> int:
+        """
+        get_last_seq() retrieves the seq of the latest journaled change
+
+        :return: seq, 0 if nothing is journaled yet
+        """
+        res = self.cur.execute("SELECT max(seq) FROM journal")
+        self.con.commit()
+        seq = res.fetchone()[0]
+        return seq if seq is not None else 0
+    # end get_last_seq()
+
+    def get_peer_seq(self, replica_id: str = None) -> int:
+        """
+        get_peer_seq() retrieves the last journal seq sent to a peer
+
+        :param replica_id: replica_id of the peer
+        :return: seq, None if the peer has never synced
+        """
+        res = self.cur.execute("SELECT seq FROM peer WHERE replica_id = ?", (replica_id,))
+        self.con.commit()
+        peer = res.fetchone()
+        return peer[0] if peer is not None else None
+    # end get_peer_seq()
+
+    def set_peer_seq(self, replica_id: str = None, seq: int = 0):
+        """
+        set_peer_seq() records the last journal seq sent to a peer
+
+        :param replica_id: replica_id of the peer
+        :param seq: seq
+        :return: none
+        """
+        self.cur.execute("INSERT OR REPLACE INTO peer (replica_id, seq) VALUES(?, ?)", (replica_id, seq))
+        self.con.commit()
+    # end set_peer_seq()
+
+    def get_changes(self, seq: int = None, replica_id: str = None) -> ([], []):
+        """
+        get_changes() retrieves the changes to send to a peer: the rows changed
+        after a journal seq (every row on the first sync) and the keys deleted
+        since. The rows the peer stamped itself are left out, the peer already
+        has them (or newer)
+
+        :param seq: last journal seq sent to the peer, None on the first sync
+        :param replica_id: replica_id of the peer
+        :return: an [] of (entity, row as a {}) and an [] of (entity, key, ts)
+        """
+        rows = []
+        deletes = []
+        for entity, key in entities.items():
+            query = (
+                f"SELECT t.*, athlete.name FROM {entity} AS t "
+                f"LEFT JOIN athlete ON athlete.athlete_id = t.athlete_id "
+                f"WHERE t.modified_by IS NOT ?"
+            )
+            params = (replica_id,)
+            if seq is not None:
+                query += f" AND t.{key} IN (SELECT key FROM journal WHERE seq > ? AND entity = ?)"
+                params += (seq, entity)
+            # end if
+            res = self.cur.execute(query, params)
+            columns = [column[0] for column in res.description[:-1]] + ["athlete"]
+            rows.extend((entity, dict(zip(columns, row))) for row in res.fetchall())
+
+            if seq is not None:
+                res = self.cur.execute(
+                    f"SELECT key, max(ts) FROM journal "
+                    f"WHERE seq > ? AND entity = ? AND new IS NULL "
+                    f"AND NOT EXISTS (SELECT 1 FROM {entity} WHERE {key} = journal.key) "
+                    f"GROUP BY key",
+                    (seq, entity)
+                )
+                deletes.extend((entity, row[0], row[1]) for row in res.fetchall())
+            # end if
+        # end for
+        self.con.commit()
+        return rows, deletes
+    # end get_changes()
+
+    def apply_changes(self, rows: [] = None, deletes: [] = None, replica_id: str = None) -> int:
+        """
+        apply_changes() applies a peer's changes in one transaction. A row is
+        written if it's new (and wasn't deleted here since) or stamped later than
+        the local row, a delete wins if it's later than the local row. The
+        athletes are matched by name, their ids differ between the replicas
+
+        :param rows: an [] of (entity, row as a {}) from get_changes()
+        :param deletes: an [] of (entity, key, ts) from get_changes()
+        :param replica_id: replica_id of the peer
+        :return: # of changes applied
+        """
+        athlete_ids = {
+            name: self.athlete.get_athlete_id_by_name(name=name)
+            for name in set(row["athlete"] for entity, row in rows if row["athlete"] is not None)
+        }
+        applied = 0
+        try:
+            for entity, row in rows:
+                key = entities[entity]
+                row = dict(row)
+                athlete = row.pop("athlete")
+                if athlete is not None:
+                    row["athlete_id"] = athlete_ids[athlete]
+                # end if
+                stamp = (row["modified_at"] or epoch, row["modified_by"] or "")
+
+                local = self.cur.execute(
+                    f"SELECT modified_at, modified_by FROM {entity} WHERE {key} = ?",
+                    (row[key],)
+                ).fetchone()
+                if local is None:
+                    deleted = self.cur.execute(
+                        "SELECT max(ts) FROM journal WHERE entity = ? AND key = ? AND new IS NULL",
+                        (entity, row[key])
+                    ).fetchone()[0]
+                    if deleted is not None and deleted >= stamp[0]:
+                        continue
+                    # end if
+                    self.cur.execute(
+                        f"INSERT INTO {entity} ({', '.join(row)}) VALUES({', '.join('?' * len(row))})",
+                        tuple(row.values())
+                    )
+                # end if
+                elif stamp > (local[0] or epoch, local[1] or ""):
+                    self.cur.execute(
+                        f"UPDATE {entity} SET {', '.join(f'{column} = ?' for column in row)} WHERE {key} = ?",
+                        tuple(row.values()) + (row[key],)
+                    )
+                # end elif
+                else:
+                    continue
+                # end else
+                applied += 1
+            # end for
+
+            for entity, key, ts in deletes:
+                local = self.cur.execute(
+                    f"SELECT modified_at, modified_by FROM {entity} WHERE {entities[entity]} = ?",
+                    (key,)
+                ).fetchone()
+                if local is not None and (ts, replica_id) > (local[0] or epoch, local[1] or ""):
+                    self.cur.execute(f"DELETE FROM {entity} WHERE {entities[entity]} = ?", (key,))
+                    applied += 1
+                # end if
+            # end for
+            self.con.commit()
+        # end try
+        except Exception:
+            self.con.rollback()
+            raise
+        # end except
+        return applied
+    # end apply_changes()
+
+    # end ReplicaClient
+
+# end of file
@@ -0,0 +1,205 @@
+import logging
+import uuid
+
+from client.stream import stream
+
+logger = logging.getLogger(name=__name__)
+
+
+class RunClient:
+    """
+    RunClient manages the runs, a day can have many (doubles, workouts...).
+    day.miles is the day's total: triggers keep it equal to the sum of the day's
+    run distances whenever a run is added, changed or removed, so the grid and
+    the summaries keep reading one row per day
+    """
+
+    def __init__(self, con, cur, athlete_id: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self.con = con
+        self.cur = cur
+        self.athlete_id = athlete_id
+        # end __init__()
+
+    def create_table(self):
+        """
+        create_table() creates the run table, only needs to run once
+
+        :return: none
+        """
+        self.cur.execute(
+            "CREATE TABLE run "
+            "(run_id VARCHAR(36), "
+            "day_id VARCHAR(36), "
+            "distance REAL, "
+            "duration INTEGER, "
+            "type VARCHAR(16), "
+            "athlete_id VARCHAR(36), "
+            "PRIMARY KEY (run_id), "
+            "FOREIGN KEY (day_id) REFERENCES day(day_id), "
+            "FOREIGN KEY (athlete_id) REFERENCES athlete(athlete_id));"
+        )
+        self.con.commit()
+        # end create_table()
+
+    def upgrade_table(self, default_athlete_id: str = None):
+        """
+        upgrade_table() brings an existing run table up to date, safe to run on
+        every start. The days with miles but no runs (logged before runs existed,
+        synced or cloned) get a single run of their miles, keyed by the day_id so
+        every replica backfills the same run
+
+        :param default_athlete_id: unused, the runs always had an athlete_id
+        :return: none
+        """
+        self.cur.execute("CREATE INDEX IF NOT EXISTS run_day_id_idx ON run (day_id)")
+
+        total = "UPDATE day SET miles = (SELECT total(distance) FROM run WHERE day_id = {0}.day_id) " \
+                "WHERE day_id = {0}.day_id " \
+                "AND miles IS NOT (SELECT total(distance) FROM run WHERE day_id = {0}.day_id); "
+        self.cur.execute(
+            "CREATE TRIGGER IF NOT EXISTS run_insert AFTER INSERT ON run BEGIN "
+            f"{total.format('new')}"
+            "END"
+        )
+        self.cur.execute(
+            "CREATE TRIGGER IF NOT EXISTS run_update AFTER UPDATE OF day_id, distance ON run BEGIN "
+            f"{total.format('old')}"
+            f"{total.format('new')}"
+            "END"
+        )
+        self.cur.execute(
+            "CREATE TRIGGER IF NOT EXISTS run_delete AFTER DELETE ON run BEGIN "
+            f"{total.format('old')}"
+            "END"
+        )
+        self.cur.execute(
+            "CREATE TRIGGER IF NOT EXISTS run_day_delete AFTER DELETE ON day BEGIN "
+            "DELETE FROM run WHERE day_id = old.day_id; "
+            "END"
+        )
+
+        res = self.cur.execute(
+            "SELECT day_id, miles, athlete_id FROM day "
+            "WHERE miles > 0 AND NOT EXISTS (SELECT 1 FROM run WHERE run.day_id = day.day_id)"
+        )
+        self.cur.executemany(
+            "INSERT INTO run (run_id, day_id, distance, duration, type, athlete_id) VALUES(?, ?, ?, NULL, 'run', ?)",
+            [(day_id, day_id, miles, athlete_id) for day_id, miles, athlete_id in res.fetchall()]
+        )
+        self.con.commit()
+        # end upgrade_table()
+
+    def add_run(self, day_id: str = None, distance: float = 0, duration: int = None, run_type: str = "run") -> str:
+        """
+        add_run() adds a run to a day
+
+        :param day_id: day_id
+        :param distance: # of miles
+        :param duration: time in seconds, None if not timed
+        :param run_type: ex. run, easy, long, workout
+        :return: run_id
+        """
+        run_id = str(uuid.uuid4())
+        self.cur.execute(
+            "INSERT INTO run (run_id, day_id, distance, duration, type, athlete_id) VALUES(?, ?, ?, ?, ?, ?)",
+            (run_id, day_id, distance, duration, run_type, self.athlete_id)
+        )
+        self.con.commit()
+        return run_id
+        # end add_run()
+
+    def set_miles_by_day_ids(self, miles: [(str, float)] = None) -> [str]:
+        """
+        set_miles_by_day_ids() sets the totals of many days, this is how the grid
+        sets a day's miles. The runs logged with add_run() are never touched, the
+        difference goes to the day's adjustment run: keyed by the day_id, like
+        the backfilled runs, so the same day set on two replicas syncs as one
+        run, and removed when the logged runs already make the total. A total
+        below the logged runs can't be set
+
+        :param miles: an [] of (day_id, miles)
+        :return: an [] of the day_ids that weren't set, their logged runs are longer
+        """
+        refused = []
+        try:
+            for day_id, day_miles in miles:
+                res = self.cur.execute(
+                    "SELECT total(distance) FROM run WHERE athlete_id = ? AND day_id = ? AND run_id != day_id",
+                    (self.athlete_id, day_id)
+                )
+                adjustment = round(day_miles - res.fetchone()[0], 6)
+                if adjustment < 0:
+                    refused.append(day_id)
+                    continue
+                # end if
+                if adjustment == 0:
+                    self.cur.execute("DELETE FROM run WHERE athlete_id = ? AND run_id = ?", (self.athlete_id, day_id))
+                    continue
+                # end if
+                res = self.cur.execute(
+                    "UPDATE run SET distance = ? WHERE athlete_id = ? AND run_id = ? AND distance IS NOT ?",
+                    (adjustment, self.athlete_id, day_id, adjustment)
+                )
+                if res.rowcount == 0:
+                    self.cur.execute(
+                        "INSERT OR IGNORE INTO run (run_id, day_id, distance, duration, type, athlete_id) "
+                        "VALUES(?, ?, ?, NULL, 'run', ?)",
+                        (day_id, day_id, adjustment, self.athlete_id)
+                    )
+                # end if
+            # end for
+            self.con.commit()
+        # end try
+        except Exception:
+            self.con.rollback()
+            raise
+        # end except
+        return refused
+        # end set_miles_by_day_ids()
+
+    def get_runs_by_day_id(self, day_id: str = None):
+        """
+        get_runs_by_day_id() retrieves the runs of a day
+
+        :param day_id: day_id
+        :return: an [] of runs
+        """
+        res = self.cur.execute(
+            "SELECT * FROM run WHERE athlete_id = ? AND day_id = ? ORDER BY rowid",
+            (self.athlete_id, day_id)
+        )
+        self.con.commit()
+        return res.fetchall()
+        # end get_runs_by_day_id()
+
+    def get_all_runs(self):
+        """
+        get_all_runs() retrieves every run with its date, the columns needed by
+        the RunStore
+
+        :return: an [] of (run_id, date, distance, duration, type)
+        """
+        return list(self.stream_all_runs())
+        # end get_all_runs()
+
+    def stream_all_runs(self, size: int = 500):
+        """
+        stream_all_runs() streams the runs of get_all_runs(), see stream()
+
+        :param size: # of rows per fetch
+        :return: a generator of (run_id, date, distance, duration, type)
+        """
+        return stream(
+            self.con,
+            "SELECT run.run_id, day.date, run.distance, run.duration, run.type FROM run "
+            "JOIN day ON day.day_id = run.day_id "
+            "WHERE run.athlete_id = ?",
+            (self.athlete_id,),
+            size=size
+        )
+        # end stream_all_runs()
+
+    # end RunClient
+
+# end of file
@@ -0,0 +1,34 @@
+import logging
+
+logger = logging.getLogger(name=__name__)
+
+
+def stream(con, query: str = None, params: () = (), size: int = 500):
+    """
+    stream() runs a query on a cursor of its own and yields its rows, fetched
+    `size` at a time, so only one batch is ever held in memory and the clients'
+    shared cursor stays free while the rows are consumed. The cursor is closed
+    when the rows run out or the generator is dropped
+
+    :param con: sqlite3 connection
+    :param query: query
+    :param params: query parameters
+    :param size: # of rows per fetch
+    :return: a generator of rows
+    """
+    cur = con.cursor()
+    try:
+        cur.execute(query, params)
+        rows = cur.fetchmany(size)
+        while len(rows) > 0:
+            yield from rows
+            rows = cur.fetchmany(size)
+        # end while
+    # end try
+    finally:
+        cur.close()
+    # end finally
+    con.commit()
+    # end stream()
+
+# end of file
@@ -1,17 +1,27 @@
 import logging
 import uuid
 
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from client.stream import stream
 
 date_format = "%Y-%m-%d"
 logger = logging.getLogger(name=__name__)
 
+# a server-side uuid4, so rows can be copied with INSERT ... SELECT
+uuid_sql = (
+    "lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-4' || "
+    "substr(hex(randomblob(2)), 2) || '-' || substr('89ab', 1 + (abs(random()) % 4), 1) || "
+    "substr(hex(randomblob(2)), 2) || '-' || hex(randomblob(6)))"
+)
+
 
 class TrainingBlockClient:
-    def __init__(self, con, cur, **kwargs):
+    def __init__(self, con, cur, athlete_id: str = None, **kwargs):
         super().__init__(**kwargs)
         self.con = con
         self.cur = cur
+        self.athlete_id = athlete_id
         # end __init__()
 
     def create_table(self):
@@ -25,10 +35,36 @@ class TrainingBlockClient:
             "(training_block_id VARCHAR(36),"
             " name VARCHAR(64),"
             " start_date VARCHAR(10),"
-            " PRIMARY KEY (training_block_id));")
+            " athlete_id VARCHAR(36),"
+            " PRIMARY KEY (training_block_id),"
+            " FOREIGN KEY (athlete_id) REFERENCES athlete(athlete_id));")
         self.con.commit()
         # end create_table()
 
+    def upgrade_table(self, default_athlete_id: str = None):
+        """
+        upgrade_table() brings an existing training_block table up to date, safe
+        to run on every start
+
+        :param default_athlete_id: athlete_id given to the training blocks that predate athletes
+        :return: none
+        """
+        columns = [row[1] for row in self.cur.execute("PRAGMA table_info(training_block)").fetchall()]
+        if "athlete_id" not in columns:
+            self.cur.execute(
+                "ALTER TABLE training_block ADD COLUMN athlete_id VARCHAR(36) REFERENCES athlete(athlete_id)"
+            )
+        # end if
+        self.cur.execute("UPDATE training_block SET athlete_id = ? WHERE athlete_id IS NULL", (default_athlete_id,))
+
+        self.cur.execute("DROP INDEX IF EXISTS training_block_name_idx")
+        self.cur.execute(
+            "CREATE INDEX IF NOT EXISTS training_block_athlete_id_name_idx "
+            "ON training_block (athlete_id, name, training_block_id)"
+        )
+        self.con.commit()
+        # end upgrade_table()
+
     def add_training_block(
             self,
             name: str = "new_block",
@@ -44,26 +80,200 @@ class TrainingBlockClient:
         """
         __id = str(uuid.uuid4())
         self.cur.execute(
-            "INSERT INTO training_block (training_block_id, name, start_date) "
-            "VALUES(?, ?, ?)", (__id, name, start_date.strftime(date_format))
+            "INSERT INTO training_block (training_block_id, name, start_date, athlete_id) "
+            "VALUES(?, ?, ?, ?)", (__id, name, start_date.strftime(date_format), self.athlete_id)
         )
         self.con.commit()
         return __id
         # end add_training_block()
 
+    def clone_block(
+            self,
+            source_name: str = None,
+            new_name: str = None,
+            new_start_date: datetime = None,
+            copy_goals: bool = True,
+            copy_miles: bool = False
+    ) -> str:
+        """
+        clone_block() copies a training block (its weeks, days and optionally
+        goals and miles/runs) into a new training block starting on new_start_date.
+        The rows are copied server-side with INSERT ... SELECT in a single
+        transaction, the dates are offset by the difference in start dates
+
+        :param source_name: name of the training block to copy
+        :param new_name: name of the new training block
+        :param new_start_date: starting date of the new training block
+        :param copy_goals: copy the weekly goals, defaults to True
+        :param copy_miles: copy the daily miles, defaults to False
+        :return: training_block_id of the new block, None if source_name wasn't found
+        """
+        source = self.get_training_block_by_name(name=source_name)
+        if source is None:
+            return None
+        # end if
+        source_id = source[0]
+        offset = (new_start_date - datetime.strptime(source[2], date_format)).days
+        __id = str(uuid.uuid4())
+
+        try:
+            self.cur.execute(
+                "INSERT INTO training_block (training_block_id, name, start_date, athlete_id) "
+                "VALUES(?, ?, ?, ?)", (__id, new_name, new_start_date.strftime(date_format), self.athlete_id)
+            )
+            self.cur.execute(
+                "INSERT INTO week (week_id, goal, training_block_id, week_number, athlete_id) "
+                f"SELECT {uuid_sql}, CASE WHEN ? THEN goal ELSE 0 END, ?, week_number, athlete_id "
+                "FROM week WHERE athlete_id = ? AND training_block_id = ?",
+                (copy_goals, __id, self.athlete_id, source_id)
+            )
+            self.cur.execute(
+                "INSERT INTO day (day_id, date, day_number, miles, training_block_id, week_id, athlete_id) "
+                f"SELECT {uuid_sql}, date(day.date, ?), day.day_number, "
+                "CASE WHEN ? THEN day.miles ELSE 0 END, ?, new_week.week_id, day.athlete_id "
+                "FROM day "
+                "JOIN week AS old_week ON old_week.week_id = day.week_id "
+                "JOIN week AS new_week ON new_week.training_block_id = ? "
+                "AND new_week.week_number = old_week.week_number "
+                "WHERE day.athlete_id = ? AND day.training_block_id = ?",
+                (f"{offset:+d} days", copy_miles, __id, __id, self.athlete_id, source_id)
+            )
+            if copy_miles:
+                self.cur.execute(
+                    "INSERT INTO run (run_id, day_id, distance, duration, type, athlete_id) "
+                    f"SELECT {uuid_sql}, new_day.day_id, run.distance, run.duration, run.type, run.athlete_id "
+                    "FROM run "
+                    "JOIN day AS old_day ON old_day.day_id = run.day_id "
+                    "JOIN day AS new_day ON new_day.training_block_id = ? AND new_day.date = date(old_day.date, ?) "
+                    "WHERE run.athlete_id = ? AND old_day.training_block_id = ?",
+                    (__id, f"{offset:+d} days", self.athlete_id, source_id)
+                )
+            # end if
+            self.con.commit()
+        # end try
+        except Exception:
+            self.con.rollback()
+            raise
+        # end except
+        return __id
+        # end clone_block()
+
     def delete_training_block_by_id(self, training_block_id: str = None):
         """
-        delete_training_block_by_id() removes a training block given
-        the training_block_id
+        delete_training_block_by_id() removes a training block, its weeks and
+        its days given the training_block_id, in one transaction. The race days
+        are kept as standalone days (no week or training block), like the races
+        added for later
 
         :param training_block_id: training_block_id
         :return: none
         """
-        self.cur.execute("DELETE FROM training_block WHERE training_block_id = ?",
-                         (training_block_id,))
-        self.con.commit()
+        params = (self.athlete_id, training_block_id)
+        try:
+            self.cur.execute("UPDATE race SET training_block_id = NULL WHERE athlete_id = ? AND training_block_id = ?",
+                             params)
+            self.cur.execute(
+                "UPDATE day SET week_id = NULL, training_block_id = NULL, day_number = NULL "
+                "WHERE athlete_id = ? AND training_block_id = ? AND day_id IN (SELECT day_id FROM race)",
+                params
+            )
+            self.cur.execute("DELETE FROM day WHERE athlete_id = ? AND training_block_id = ?", params)
+            self.cur.execute("DELETE FROM week WHERE athlete_id = ? AND training_block_id = ?", params)
+            self.cur.execute("DELETE FROM training_block WHERE athlete_id = ? AND training_block_id = ?", params)
+            self.con.commit()
+        # end try
+        except Exception:
+            self.con.rollback()
+            raise
+        # end except
         # end delete_training_block_by_id()
 
+    def extend(self, training_block_id: str = None, num_weeks: int = 1) -> int:
+        """
+        extend() appends num_weeks weeks (and their 7 days each) to the end of a
+        training block. The rows are written with executemany in a single
+        transaction
+
+        :param training_block_id: training_block_id
+        :param num_weeks: # of weeks to add, defaults to 1
+        :return: the week_number of the first week added
+        """
+        res = self.cur.execute(
+            "SELECT training_block.start_date, "
+            "(SELECT MAX(week_number) FROM week WHERE week.training_block_id = training_block.training_block_id), "
+            "(SELECT MAX(date) FROM day WHERE day.training_block_id = training_block.training_block_id) "
+            "FROM training_block WHERE athlete_id = ? AND training_block_id = ?",
+            (self.athlete_id, training_block_id)
+        )
+        start_date, last_week_number, last_date = res.fetchone()
+        if last_date is None:
+            date = datetime.strptime(start_date, date_format)
+        # end if
+        else:
+            date = datetime.strptime(last_date, date_format) + timedelta(days=1)
+        # end else
+        first_week_number = (last_week_number or 0) + 1
+
+        weeks = []
+        days = []
+        for x in range(num_weeks):
+            week_id = str(uuid.uuid4())
+            weeks.append((week_id, training_block_id, first_week_number + x, self.athlete_id))
+            for y in range(7):
+                days.append((
+                    str(uuid.uuid4()), date.strftime(date_format), y + 1, training_block_id, week_id, self.athlete_id
+                ))
+                date += timedelta(days=1)
+            # end for
+        # end for
+
+        try:
+            self.cur.executemany(
+                "INSERT INTO week (week_id, training_block_id, week_number, goal, athlete_id) VALUES(?, ?, ?, 0, ?)",
+                weeks
+            )
+            self.cur.executemany(
+                "INSERT INTO day (day_id, date, day_number, miles, training_block_id, week_id, athlete_id) "
+                "VALUES(?, ?, ?, 0, ?, ?, ?)",
+                days
+            )
+            self.con.commit()
+        # end try
+        except Exception:
+            self.con.rollback()
+            raise
+        # end except
+        return first_week_number
+        # end extend()
+
+    def shift_start(self, training_block_id: str = None, days: int = 0):
+        """
+        shift_start() moves a training block (its start date and every one of its
+        days) by the given # of days in a single transaction
+
+        :param training_block_id: training_block_id
+        :param days: # of days to shift by, negative moves the block earlier
+        :return: none
+        """
+        modifier = f"{days:+d} days"
+        try:
+            self.cur.execute(
+                "UPDATE training_block SET start_date = date(start_date, ?) "
+                "WHERE athlete_id = ? AND training_block_id = ?",
+                (modifier, self.athlete_id, training_block_id)
+            )
+            self.cur.execute(
+                "UPDATE day SET date = date(date, ?) WHERE athlete_id = ? AND training_block_id = ?",
+                (modifier, self.athlete_id, training_block_id)
+            )
+            self.con.commit()
+        # end try
+        except Exception:
+            self.con.rollback()
+            raise
+        # end except
+        # end shift_start()
+
     def get_all_training_block_names(self) -> [str]:
         """
         get_all_training_block_names() retrieves a list of the training block
@@ -71,14 +281,78 @@ class TrainingBlockClient:
 
         :return: an [] of training block names
         """
-        res = self.cur.execute("SELECT name FROM training_block")
-        self.con.commit()
-        names = []
-        for row in res.fetchall():
-            names.append(row[0])
-        return names
+        return list(self.stream_training_block_names())
         # end get_all_training_block_names()
 
+    def stream_training_block_names(self, size: int = 500):
+        """
+        stream_training_block_names() streams the training block names, see
+        stream()
+
+        :param size: # of rows per fetch
+        :return: a generator of training block names
+        """
+        for row in stream(self.con, "SELECT name FROM training_block WHERE athlete_id = ?", (self.athlete_id,),
+                          size=size):
+            yield row[0]
+        # end for
+        # end stream_training_block_names()
+
+    def stream_training_blocks(self, size: int = 500):
+        """
+        stream_training_blocks() streams every training block ordered by name,
+        the rows of get_training_blocks_page() without a limit, see stream()
+
+        :param size: # of rows per fetch
+        :return: a generator of training blocks
+        """
+        return stream(
+            self.con,
+            "SELECT * FROM training_block WHERE athlete_id = ? ORDER BY name, training_block_id",
+            (self.athlete_id,),
+            size=size
+        )
+        # end stream_training_blocks()
+
+    def get_training_blocks_page(self, after: (str, str) = None, before: (str, str) = None, limit: int = 20):
+        """
+        get_training_blocks_page() retrieves a page of training blocks ordered by
+        name using keyset (seek) pagination, so any page costs the same regardless
+        of how deep it is
+
+        :param after: (name, training_block_id) of the last block of the previous page
+        :param before: (name, training_block_id) of the first block of the next page
+        :param limit: page size, -1 for no limit
+        :return: an [] of training blocks
+        """
+        if after is not None:
+            res = self.cur.execute(
+                "SELECT * FROM training_block WHERE athlete_id = ? AND (name, training_block_id) > (?, ?) "
+                "ORDER BY name, training_block_id LIMIT ?",
+                (self.athlete_id, after[0], after[1], limit)
+            )
+        # end if
+        elif before is not None:
+            res = self.cur.execute(
+                "SELECT * FROM training_block WHERE athlete_id = ? AND (name, training_block_id) < (?, ?) "
+                "ORDER BY name DESC, training_block_id DESC LIMIT ?",
+                (self.athlete_id, before[0], before[1], limit)
+            )
+        # end elif
+        else:
+            res = self.cur.execute(
+                "SELECT * FROM training_block WHERE athlete_id = ? ORDER BY name, training_block_id LIMIT ?",
+                (self.athlete_id, limit)
+            )
+        # end else
+        self.con.commit()
+        rows = res.fetchall()
+        if before is not None:
+            rows.reverse()
+        # end if
+        return rows
+        # end get_training_blocks_page()
+
     def get_training_block_by_name(self, name: str = None):
         """
         get_training_block_by_name() retrieves a training block given the
@@ -87,8 +361,8 @@ class TrainingBlockClient:
         :param name: name of the desired training block
         :return: a training block
         """
-        res = self.cur.execute("SELECT * FROM training_block WHERE name = ?",
-                               (name,))
+        res = self.cur.execute("SELECT * FROM training_block WHERE athlete_id = ? AND name = ?",
+                               (self.athlete_id, name))
         self.con.commit()
         return res.fetchone()
         # end get_training_block_id()
@@ -104,7 +378,7 @@ class TrainingBlockClient:
         if name is None:
             return False
         names = []
-        rows = self.cur.execute("SELECT name FROM training_block").fetchall()
+        rows = self.cur.execute("SELECT name FROM training_block WHERE athlete_id = ?", (self.athlete_id,)).fetchall()
         self.con.commit()
         for row in rows:
             names.append(row[0])
@@ -4,16 +4,19 @@ import uuid
 from functools import cached_property
 
 from client.day import DayClient
+from client.race import day_race_sql
+from client.stream import stream
 
 date_format = "%Y-%m-%d"
 logger = logging.getLogger(name=__name__)
 
 
 class WeekClient:
-    def __init__(self, con, cur, **kwargs):
+    def __init__(self, con, cur, athlete_id: str = None, **kwargs):
         super().__init__(**kwargs)
         self.con = con
         self.cur = cur
+        self.athlete_id = athlete_id
     # end __init__()
 
     @cached_property
@@ -23,7 +26,7 @@ class WeekClient:
 
         :return: a DayClient
         """
-        return DayClient(con=self.con, cur=self.cur)
+        return DayClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
     # end day()
 
     def create_table(self):
@@ -38,12 +41,35 @@ class WeekClient:
             "goal INTEGER, "
             "training_block_id VARCHAR(36), "
             "week_number INTEGER, "
+            "athlete_id VARCHAR(36), "
             "PRIMARY KEY (week_id), "
-            "FOREIGN KEY (training_block_id) REFERENCES training_block(training_block_id));"
+            "FOREIGN KEY (training_block_id) REFERENCES training_block(training_block_id), "
+            "FOREIGN KEY (athlete_id) REFERENCES athlete(athlete_id));"
         )
         self.con.commit()
     # end create_table()
 
+    def upgrade_table(self, default_athlete_id: str = None):
+        """
+        upgrade_table() brings an existing week table up to date, safe to run
+        on every start
+
+        :param default_athlete_id: athlete_id given to the weeks that predate athletes
+        :return: none
+        """
+        columns = [row[1] for row in self.cur.execute("PRAGMA table_info(week)").fetchall()]
+        if "athlete_id" not in columns:
+            self.cur.execute("ALTER TABLE week ADD COLUMN athlete_id VARCHAR(36) REFERENCES athlete(athlete_id)")
+        # end if
+        self.cur.execute("UPDATE week SET athlete_id = ? WHERE athlete_id IS NULL", (default_athlete_id,))
+
+        self.cur.execute(
+            "CREATE INDEX IF NOT EXISTS week_training_block_id_week_number_idx "
+            "ON week (training_block_id, week_number)"
+        )
+        self.con.commit()
+    # end upgrade_table()
+
     def add_week(self, training_block_id: str = None, week_number: int = 1):
         """
         add_week()
@@ -54,9 +80,9 @@ class WeekClient:
         """
         week_id = str(uuid.uuid4())
         self.cur.execute(
-            "INSERT INTO week (week_id, training_block_id, week_number, goal) "
-            "VALUES(?, ?, ?, 0)",
-            (week_id, training_block_id, week_number)
+            "INSERT INTO week (week_id, training_block_id, week_number, goal, athlete_id) "
+            "VALUES(?, ?, ?, 0, ?)",
+            (week_id, training_block_id, week_number, self.athlete_id)
         )
         self.con.commit()
         return week_id
@@ -64,18 +90,45 @@ class WeekClient:
 
     def delete_week_by_id(self, week_id: str = None):
         """
-        delete_week_by_id() removes a week given a week_id
+        delete_week_by_id() removes a week (and its days) given a week_id
 
         :param week_id: week_id
         :return: none
         """
-        self.cur.execute(
-            "DELETE FROM week WHERE week_id = ?",
-            (week_id,)
-        )
-        self.con.commit()
+        self.delete_weeks_by_ids(week_ids=[week_id])
     # end delete_week_by_id()
 
+    def delete_weeks_by_ids(self, week_ids: [str] = None):
+        """
+        delete_weeks_by_ids() removes many weeks and their days in one
+        transaction. The race days are kept as standalone days (no week or
+        training block), like the races added for later
+
+        :param week_ids: an [] of week_ids
+        :return: none
+        """
+        params = [(self.athlete_id, week_id) for week_id in week_ids]
+        try:
+            self.cur.executemany(
+                "UPDATE race SET training_block_id = NULL "
+                "WHERE athlete_id = ? AND day_id IN (SELECT day_id FROM day WHERE week_id = ?)",
+                params
+            )
+            self.cur.executemany(
+                "UPDATE day SET week_id = NULL, training_block_id = NULL, day_number = NULL "
+                "WHERE athlete_id = ? AND week_id = ? AND day_id IN (SELECT day_id FROM race)",
+                params
+            )
+            self.cur.executemany("DELETE FROM day WHERE athlete_id = ? AND week_id = ?", params)
+            self.cur.executemany("DELETE FROM week WHERE athlete_id = ? AND week_id = ?", params)
+            self.con.commit()
+        # end try
+        except Exception:
+            self.con.rollback()
+            raise
+        # end except
+    # end delete_weeks_by_ids()
+
     def get_week_by_id(self, week_id: str = None):
         """
         get_week_by_id() retrieves a week given a week_id
@@ -83,8 +136,8 @@ class WeekClient:
         :param week_id: week_id
         :return: a week
         """
-        res = self.cur.execute("SELECT * FROM week WHERE week_id = ?",
-                               (week_id,))
+        res = self.cur.execute("SELECT * FROM week WHERE athlete_id = ? AND week_id = ?",
+                               (self.athlete_id, week_id))
         self.con.commit()
         return res.fetchone()
     # end get_week_by_id()
@@ -99,8 +152,8 @@ class WeekClient:
         :return: the last week in a training block
         """
         res = self.cur.execute(
-            "SELECT week_id, MAX(week_number) FROM week WHERE training_block_id = ?",
-            (training_block_id,)
+            "SELECT week_id, MAX(week_number) FROM week WHERE athlete_id = ? AND training_block_id = ?",
+            (self.athlete_id, training_block_id)
         )
         self.con.commit()
         return res.fetchone()
@@ -114,13 +167,53 @@ class WeekClient:
         :param training_block_id: training_block_id
         :return: an [] of weeks
         """
+        return list(self.stream_weeks_by_training_block_id(training_block_id=training_block_id))
+    # end get_weeks_by_training_block_id()
+
+    def stream_weeks_by_training_block_id(self, training_block_id: str = None, size: int = 500):
+        """
+        stream_weeks_by_training_block_id() streams the weeks associated with a
+        training block in week # order, see stream()
+
+        :param training_block_id: training_block_id
+        :param size: # of rows per fetch
+        :return: a generator of weeks
+        """
+        return stream(
+            self.con,
+            "SELECT * FROM week WHERE athlete_id = ? AND training_block_id = ? ORDER BY week_number",
+            (self.athlete_id, training_block_id),
+            size=size
+        )
+    # end stream_weeks_by_training_block_id()
+
+    def get_weeks_and_days_by_training_block_id(self, training_block_id: str = None):
+        """
+        get_weeks_and_days_by_training_block_id() retrieves every week of a
+        training block with its days and their races, in one query
+
+        :param training_block_id: training_block_id
+        :return: an [] of (week_id, week_number, goal, day_id, day_number, date, miles,
+                 race name, race miles, logged miles), ordered by week_number then day_number,
+                 a week without days has a single row of NULL days, a day without a race NULL
+                 races. The logged miles are the day's runs but its adjustment run (run_id =
+                 day_id), the least its miles can be set to
+        """
+        # the + keeps the day join on day_week_id_idx, on day_athlete_id_date_idx it scans every day of the athlete
         res = self.cur.execute(
-            "SELECT * FROM week WHERE training_block_id = ? ",
-            (training_block_id,)
+            "SELECT week.week_id, week.week_number, week.goal, day.day_id, day.day_number, day.date, day.miles, "
+            "race.name, race.miles, "
+            "(SELECT total(run.distance) FROM run WHERE run.day_id = day.day_id AND run.run_id != day.day_id) "
+            "FROM week "
+            "LEFT JOIN day ON day.week_id = week.week_id AND +day.athlete_id = week.athlete_id "
+            f"LEFT JOIN race ON race.race_id = {day_race_sql} "
+            "WHERE week.athlete_id = ? AND week.training_block_id = ? "
+            "ORDER BY week.week_number, day.day_number",
+            (self.athlete_id, training_block_id)
         )
         self.con.commit()
         return res.fetchall()
-    # end get_weeks_by_training_block_id()
+    # end get_weeks_and_days_by_training_block_id()
 
     def get_week_by_training_block_id_and_week_number(
             self,
@@ -136,33 +229,30 @@ class WeekClient:
         :return: a week
         """
         res = self.cur.execute(
-            "SELECT week_id FROM week WHERE training_block_id = ? AND week_number = ?",
-            (training_block_id, week_number)
+            "SELECT week_id FROM week WHERE athlete_id = ? AND training_block_id = ? AND week_number = ?",
+            (self.athlete_id, training_block_id, week_number)
         )
         self.con.commit()
         return res.fetchone()
     # end get_week_id_by_training_block_id_and_week_number()
 
-    def delete_weeks_from_training_block(self, training_block_id: str = None, num_weeks: int = 1):
+    def delete_weeks_from_training_block(self, training_block_id: str = None, num_weeks: int = 1) -> int:
         """
-        remove_week_from_training_block() removes 1+ week from the Week table given
-        a training_block_id
+        delete_weeks_from_training_block() removes the last num_weeks weeks (and
+        their days) of a training block in one transaction
 
         :param training_block_id: training_block_id
         :param num_weeks: # of weeks to delete, defaults to 1
-        :return: none
+        :return: # of weeks deleted, less than num_weeks if the block ran out
         """
-        count = 0
-        while count < num_weeks:
-            last_week = self.get_last_week_by_training_block_id(training_block_id=training_block_id)
-            week_id = last_week[0]
-
-            self.cur.execute("DELETE FROM week WHERE week_id = ?", (week_id,))
-            self.con.commit()
-            self.day.delete_days_by_week_id(week_id=week_id)
-
-            count += 1
-        # end while
+        res = self.cur.execute(
+            "SELECT week_id FROM week WHERE athlete_id = ? AND training_block_id = ? "
+            "ORDER BY week_number DESC LIMIT ?",
+            (self.athlete_id, training_block_id, num_weeks)
+        )
+        week_ids = [row[0] for row in res.fetchall()]
+        self.delete_weeks_by_ids(week_ids=week_ids)
+        return len(week_ids)
     # end delete_weeks_from_training_block()
 
     def update_goal_by_week_id(self, goal: int = 0, week_id: str = None):
@@ -173,10 +263,28 @@ class WeekClient:
         :param week_id: week_id
         :return: nonw
         """
-        self.cur.execute("UPDATE week SET goal = ? WHERE week_id = ?", (goal, week_id))
+        self.cur.execute(
+            "UPDATE week SET goal = ? WHERE athlete_id = ? AND week_id = ?",
+            (goal, self.athlete_id, week_id)
+        )
         self.con.commit()
     # end update_goal_by_week_id()
 
+    def update_goals_by_week_ids(self, goals: [(str, int)] = None):
+        """
+        update_goals_by_week_ids() updates the goals of many weeks with a single
+        executemany
+
+        :param goals: an [] of (week_id, goal)
+        :return: none
+        """
+        self.cur.executemany(
+            "UPDATE week SET goal = ? WHERE athlete_id = ? AND week_id = ?",
+            [(goal, self.athlete_id, week_id) for week_id, goal in goals]
+        )
+        self.con.commit()
+    # end update_goals_by_week_ids()
+
     # end Week
 
 # end of file
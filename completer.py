@@ -0,0 +1,216 @@
+import logging
+
+try:
+    import readline
+except ImportError:  # readline isn't available on every platform (ex. Windows)
+    readline = None
+
+logger = logging.getLogger(name=__name__)
+
+commands = (
+    "training-blocks", "race", "today", "days", "profile on", "profile off", "profile report",
+    "list", "next", "prev", "edit", "add", "add week", "add race", "clone", "remove", "remove week",
+    "remove race", "search", "shift", "plan", "update", "date", "print", "delete", "edit date",
+    "edit name", "edit miles", "edit url", "help", "menu", "exit",
+)
+
+
+class Trie:
+    """
+    Trie is an in-memory prefix tree of words, matched case-insensitively. A
+    word is counted each time it's added (ex. a race and a training block of
+    the same name) and stays until it's been removed as many times
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.root = {}
+        # end __init__()
+
+    def add(self, word: str = None):
+        """
+        add() inserts a word into the trie, or counts it once more
+
+        :param word: word
+        :return: none
+        """
+        node = self.root
+        for char in word.lower():
+            node = node.setdefault(char, {})
+        # end for
+        words = node.setdefault(None, {})
+        words[word] = words.get(word, 0) + 1
+        # end add()
+
+    def remove(self, word: str = None):
+        """
+        remove() counts a word once less, removing it from the trie when it's
+        no longer counted, pruning the emptied branches
+
+        :param word: word
+        :return: none
+        """
+        path = [self.root]
+        for char in word.lower():
+            node = path[-1].get(char)
+            if node is None:
+                return
+            # end if
+            path.append(node)
+        # end for
+
+        words = path[-1].get(None, {})
+        if word not in words:
+            return
+        # end if
+        words[word] -= 1
+        if words[word] > 0:
+            return
+        # end if
+        del words[word]
+        if len(words) == 0:
+            path[-1].pop(None, None)
+        # end if
+        for char, x in zip(reversed(word.lower()), range(len(path) - 1, 0, -1)):
+            if len(path[x]) > 0:
+                break
+            # end if
+            del path[x - 1][char]
+        # end for
+        # end remove()
+
+    def starts_with(self, prefix: str = None) -> [str]:
+        """
+        starts_with() retrieves every word starting with the prefix, sorted
+
+        :param prefix: prefix
+        :return: an [] of words
+        """
+        node = self.root
+        for char in prefix.lower():
+            node = node.get(char)
+            if node is None:
+                return []
+            # end if
+        # end for
+
+        words = []
+        stack = [node]
+        while len(stack) > 0:
+            node = stack.pop()
+            for char, child in node.items():
+                if char is None:
+                    words.extend(child)
+                # end if
+                else:
+                    stack.append(child)
+                # end else
+            # end for
+        # end while
+        return sorted(words)
+        # end starts_with()
+
+    # end Trie
+
+
+class Completer:
+    """
+    Completer tab-completes the commands and the training block / race names
+    at every prompt. The names are loaded once and kept up to date by the menus
+    so completing never hits the database
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.trie = Trie()
+        self.matches = []
+        for command in commands:
+            self.trie.add(word=command)
+        # end for
+        # end __init__()
+
+    def install(self):
+        """
+        install() registers the completer with readline, if available
+
+        :return: none
+        """
+        if readline is None:
+            logger.info("readline isn't available, tab completion is disabled")
+            return
+        # end if
+        readline.set_completer(self.complete)
+        readline.set_completer_delims("")  # names can contain spaces, complete the whole line
+        if "libedit" in (readline.__doc__ or ""):
+            readline.parse_and_bind("bind ^I rl_complete")
+        # end if
+        else:
+            readline.parse_and_bind("tab: complete")
+        # end else
+        # end install()
+
+    def load(self, names: [str] = None):
+        """
+        load() adds the names to the completions
+
+        :param names: an [] of training block / race names
+        :return: none
+        """
+        for name in names:
+            self.trie.add(word=name)
+        # end for
+        # end load()
+
+    def add(self, name: str = None):
+        """
+        add() adds a name to the completions
+
+        :param name: new name
+        :return: none
+        """
+        self.trie.add(word=name)
+        # end add()
+
+    def remove(self, name: str = None):
+        """
+        remove() removes a name from the completions
+
+        :param name: removed name
+        :return: none
+        """
+        self.trie.remove(word=name)
+        # end remove()
+
+    def rename(self, old: str = None, new: str = None):
+        """
+        rename() swaps a name in the completions
+
+        :param old: old name
+        :param new: new name
+        :return: none
+        """
+        self.trie.remove(word=old)
+        self.trie.add(word=new)
+        # end rename()
+
+    def complete(self, text: str = None, state: int = 0) -> str:
+        """
+        complete() is the readline completer function
+
+        :param text: text typed so far
+        :param state: index of the match requested
+        :return: the match, None once there are no more
+        """
+        if state == 0:
+            self.matches = self.trie.starts_with(prefix=text)
+        # end if
+        return self.matches[state] if state < len(self.matches) else None
+        # end complete()
+
+    # end Completer
+
+
+# readline has a single, process-wide completer
+completer = Completer()
+
+# end of file
@@ -0,0 +1,181 @@
+import logging
+
+from client.training_block import uuid_sql
+
+logger = logging.getLogger(name=__name__)
+
+# a day whose week or training block is gone
+gone = (
+    "((day.week_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM week WHERE week.week_id = day.week_id)) "
+    "OR (day.training_block_id IS NOT NULL AND NOT EXISTS "
+    "(SELECT 1 FROM training_block WHERE training_block.training_block_id = day.training_block_id)))"
+)
+raced = "EXISTS (SELECT 1 FROM race WHERE race.day_id = day.day_id)"
+
+# the date a day of a week should have: the training block's start date + its offset
+expected_date = (
+    "date(training_block.start_date, ((week.week_number - 1) * 7 + day.day_number - 1) || ' days')"
+)
+day_numbers = "(SELECT 1 AS day_number UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4 " \
+              "UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7) AS numbers"
+duplicate_week = (
+    "EXISTS (SELECT 1 FROM week AS first WHERE first.training_block_id = week.training_block_id "
+    "AND first.week_number = week.week_number AND first.rowid < week.rowid)"
+)
+missing_day = (
+    "NOT EXISTS (SELECT 1 FROM day WHERE day.week_id = week.week_id AND day.day_number = numbers.day_number) "
+    f"AND NOT {duplicate_week}"
+)
+misplaced = (
+    "SELECT day.day_id FROM day "
+    "JOIN week ON week.week_id = day.week_id "
+    "JOIN training_block ON training_block.training_block_id = week.training_block_id "
+    f"WHERE day.day_number BETWEEN 1 AND 7 AND (day.date IS NOT {expected_date} "
+    "OR day.training_block_id IS NOT week.training_block_id)"
+)
+race_day_block = "(SELECT day.training_block_id FROM day WHERE day.day_id = race.day_id)"
+
+# (check, description, count query, "repair" or "purge", fix statement), in the order they're fixed:
+# the purges come first so the repairs don't work on rows that are about to go
+checks = (
+    (
+        "orphan weeks",
+        "weeks whose training block is gone",
+        "SELECT count(*) FROM week WHERE NOT EXISTS "
+        "(SELECT 1 FROM training_block WHERE training_block.training_block_id = week.training_block_id)",
+        "purge",
+        "DELETE FROM week WHERE NOT EXISTS "
+        "(SELECT 1 FROM training_block WHERE training_block.training_block_id = week.training_block_id)"
+    ),
+    (
+        "duplicate weeks",
+        "weeks that repeat a week # of their training block, all but the first",
+        f"SELECT count(*) FROM week WHERE {duplicate_week}",
+        "purge",
+        f"DELETE FROM week WHERE {duplicate_week}"
+    ),
+    (
+        "orphan race days",
+        "race days whose week or training block is gone, kept as standalone days",
+        f"SELECT count(*) FROM day WHERE {gone} AND {raced}",
+        "repair",
+        f"UPDATE day SET week_id = NULL, training_block_id = NULL, day_number = NULL WHERE {gone} AND {raced}"
+    ),
+    (
+        "orphan days",
+        "days whose week or training block is gone",
+        f"SELECT count(*) FROM day WHERE {gone} AND NOT {raced}",
+        "purge",
+        f"DELETE FROM day WHERE {gone} AND NOT {raced}"
+    ),
+    (
+        "unused days",
+        "standalone days without a race or miles (left by moved or removed races)",
+        f"SELECT count(*) FROM day WHERE week_id IS NULL AND training_block_id IS NULL "
+        f"AND NOT {raced} AND NOT coalesce(miles, 0) > 0",
+        "purge",
+        f"DELETE FROM day WHERE week_id IS NULL AND training_block_id IS NULL "
+        f"AND NOT {raced} AND NOT coalesce(miles, 0) > 0"
+    ),
+    (
+        "orphan races",
+        "races whose day is gone",
+        "SELECT count(*) FROM race WHERE NOT EXISTS (SELECT 1 FROM day WHERE day.day_id = race.day_id)",
+        "purge",
+        "DELETE FROM race WHERE NOT EXISTS (SELECT 1 FROM day WHERE day.day_id = race.day_id)"
+    ),
+    (
+        "race block mismatches",
+        "races attached to another training block than their day",
+        f"SELECT count(*) FROM race WHERE EXISTS (SELECT 1 FROM day WHERE day.day_id = race.day_id) "
+        f"AND race.training_block_id IS NOT {race_day_block}",
+        "repair",
+        f"UPDATE race SET training_block_id = {race_day_block} "
+        f"WHERE EXISTS (SELECT 1 FROM day WHERE day.day_id = race.day_id) "
+        f"AND race.training_block_id IS NOT {race_day_block}"
+    ),
+    (
+        "day gaps",
+        "day #s (1-7) missing from a week (not a duplicate), added with 0 miles",
+        "SELECT coalesce(sum(7 - (SELECT count(DISTINCT day_number) FROM day "
+        "WHERE day.week_id = week.week_id AND day.day_number BETWEEN 1 AND 7)), 0) FROM week "
+        "JOIN training_block ON training_block.training_block_id = week.training_block_id "
+        f"WHERE NOT {duplicate_week}",
+        "repair",
+        "INSERT INTO day (day_id, date, day_number, miles, training_block_id, week_id, athlete_id) "
+        f"SELECT {uuid_sql}, "
+        "date(training_block.start_date, ((week.week_number - 1) * 7 + numbers.day_number - 1) || ' days'), "
+        "numbers.day_number, 0, week.training_block_id, week.week_id, week.athlete_id "
+        f"FROM week CROSS JOIN {day_numbers} "
+        "JOIN training_block ON training_block.training_block_id = week.training_block_id "
+        f"WHERE {missing_day}"
+    ),
+    (
+        "date mismatches",
+        "days whose date (or training block) doesn't match their week # and day #",
+        f"SELECT count(*) FROM ({misplaced})",
+        "repair",
+        f"UPDATE day SET (date, training_block_id) = (SELECT {expected_date}, week.training_block_id FROM week "
+        "JOIN training_block ON training_block.training_block_id = week.training_block_id "
+        f"WHERE week.week_id = day.week_id) WHERE day_id IN ({misplaced})"
+    ),
+)
+
+
+class Fsck:
+    """
+    Fsck checks the integrity of the training blocks, weeks, days and races of
+    every athlete. Each check is a single set-based query (anti-joins on the
+    primary keys and indexes), never a loop over the rows, so it stays fast on
+    large databases. fix() repairs what can be repaired in place and, if asked
+    to, purges the rest, all in one transaction
+    """
+
+    def __init__(self, con, cur, **kwargs):
+        super().__init__(**kwargs)
+        self.con = con
+        self.cur = cur
+        # end __init__()
+
+    def check(self) -> [(str, str, int)]:
+        """
+        check() runs every check
+
+        :return: an [] of (check, description, # of rows found)
+        """
+        found = []
+        for check, description, count, mode, fix in checks:
+            res = self.cur.execute(count)
+            found.append((check, description, res.fetchone()[0]))
+        # end for
+        self.con.commit()
+        return found
+        # end check()
+
+    def fix(self, purge: bool = False) -> {str: int}:
+        """
+        fix() runs the repairs, and the purges if purge is set, in one
+        transaction
+
+        :param purge: also delete the rows that can't be repaired
+        :return: a {} of check: # of rows fixed
+        """
+        fixed = {}
+        try:
+            for check, description, count, mode, fix in checks:
+                if mode == "repair" or purge:
+                    fixed[check] = self.cur.execute(fix).rowcount
+                # end if
+            # end for
+            self.con.commit()
+        # end try
+        except Exception:
+            self.con.rollback()
+            raise
+        # end except
+        return fixed
+        # end fix()
+
+    # end Fsck
+
+# end of file
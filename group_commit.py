@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+
+from contextlib import contextmanager
+
+logger = logging.getLogger(name=__name__)
+
+
+class GroupCommit:
+    """
+    GroupCommit wraps the session's connection to make group commit opt-in.
+    Disabled, every commit() goes straight to the database, as it always has.
+    Enabled, the writes are held in one open transaction and committed together
+    once `ops` writes are pending or the oldest pending write is `seconds` old,
+    or when flush() is called. The age is checked on the next write and, while
+    the session waits at a prompt (idle()), by a timer thread, so a group is
+    never held past `seconds` because no write came after it. The connection
+    must be opened with check_same_thread=False for the timer to commit it.
+
+    Each deferred commit() sets a savepoint, so a client's rollback() after a
+    failed write only undoes that write, the writes before it stay pending.
+    Everything else is passed through to the connection
+    """
+
+    def __init__(self, con, enabled: bool = False, ops: int = 50, seconds: float = 5.0, **kwargs):
+        super().__init__(**kwargs)
+        self.con = con
+        self.enabled = enabled
+        self.ops = ops
+        self.seconds = seconds
+        self.pending = 0
+        self.since = None
+        self.changes = con.total_changes
+        self.lock = threading.Lock()
+        # end __init__()
+
+    def __getattr__(self, name):
+        return getattr(self.con, name)
+        # end __getattr__()
+
+    def commit(self):
+        """
+        commit() commits the writes, or holds them until the group is flushed
+
+        :return: none
+        """
+        if not self.enabled:
+            self.con.commit()
+            return
+        # end if
+        if not self.con.in_transaction or self.con.total_changes == self.changes:
+            return  # nothing written since the last commit (ex. after a SELECT)
+        # end if
+        self.changes = self.con.total_changes
+
+        self.pending += 1
+        if self.since is None:
+            self.since = time.monotonic()
+        # end if
+        if self.pending >= self.ops or time.monotonic() - self.since >= self.seconds:
+            self.flush()
+            return
+        # end if
+        if self.pending > 1:
+            self.con.execute("RELEASE group_commit")
+        # end if
+        self.con.execute("SAVEPOINT group_commit")
+        # end commit()
+
+    def rollback(self):
+        """
+        rollback() undoes the writes since the last commit(), the pending group
+        is kept
+
+        :return: none
+        """
+        if self.enabled and self.pending > 0:
+            self.con.execute("ROLLBACK TO group_commit")
+            self.changes = self.con.total_changes
+            return
+        # end if
+        self.con.rollback()
+        # end rollback()
+
+    def flush(self):
+        """
+        flush() commits the pending writes
+
+        :return: none
+        """
+        if self.pending > 0:
+            logger.info(f"committing {self.pending} writes")
+        # end if
+        self.con.commit()
+        self.pending = 0
+        self.since = None
+        self.changes = self.con.total_changes
+        # end flush()
+
+    def expire(self):
+        """
+        expire() flushes the pending group once it's `seconds` old, run by the
+        timer of idle()
+
+        :return: none
+        """
+        with self.lock:
+            if self.pending > 0:
+                self.flush()
+            # end if
+        # end with
+        # end expire()
+
+    @contextmanager
+    def idle(self):
+        """
+        idle() wraps a wait for input, the session doesn't touch the connection
+        meanwhile: a pending group is flushed by a timer thread when it comes
+        due. The timer is cancelled, or a flush in progress waited on, before
+        the session goes on
+
+        :return: a context manager
+        """
+        timer = None
+        if self.enabled and self.pending > 0:
+            timer = threading.Timer(max(self.since + self.seconds - time.monotonic(), 0), self.expire)
+            timer.daemon = True
+            timer.start()
+        # end if
+        try:
+            yield
+        # end try
+        finally:
+            if timer is not None:
+                timer.cancel()
+                with self.lock:
+                    pass  # a flush that already started finishes first
+                # end with
+            # end if
+        # end finally
+        # end idle()
+
+    # end GroupCommit
+
+# end of file
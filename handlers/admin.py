@@ -0,0 +1,151 @@
+import logging
+import os
+
+from datetime import datetime, timedelta
+
+from fsck import Fsck
+from sync import Sync
+
+date_format = "%Y-%m-%d"
+logger = logging.getLogger(name=__name__)
+
+
+def squad(app, start: datetime = None, end: datetime = None):
+    """
+    squad() prints the weekly totals of every athlete in the shards, this week
+    if no dates are given
+
+    :param app: App
+    :param start: first date
+    :param end: last date, defaults to start
+    :return: none
+    """
+    if app.shards is None:
+        print("squad reports need one database per athlete! ex. --shards <dir>")
+        print()
+        return
+    # end if
+    if start is None:
+        end = datetime.now()
+        start = end - timedelta(days=end.weekday())
+    # end if
+    end = end if end is not None else start
+    app.con.flush()  # the shards are read by another connection
+    totals = app.shards.get_weekly_totals(start_date=start.strftime(date_format), end_date=end.strftime(date_format))
+    app.printer.print_weekly_totals(totals=totals)
+    # end squad()
+
+
+def sync(app, path: str = None):
+    """
+    sync() merges the database with another copy of it both ways
+
+    :param app: App
+    :param path: path to the other database, as typed (paths are case-sensitive)
+    :return: none
+    """
+    if not os.path.isfile(path):
+        print("please provide the path to the other database! ex. sync <path>")
+        print()
+        return
+    # end if
+    try:
+        app.con.flush()
+        sent, received = Sync(con=app.con, cur=app.cur).sync(path=path)
+    # end try
+    except ValueError as e:
+        print(e)
+        print()
+        return
+    # end except
+    print(f"synced! sent {sent} changes, received {received} changes")
+    print()
+    # end sync()
+
+
+def backup(app):
+    """
+    backup() snapshots the database now
+
+    :param app: App
+    :return: none
+    """
+    if app.backup is None:
+        print("backups aren't set up!")
+    # end if
+    else:
+        app.con.flush()  # the backup reads the file with its own connection
+        path = app.backup.snapshot()
+        print(f"backed up to {path}")
+    # end else
+    print()
+    # end backup()
+
+
+def fsck(app, option: str = None):
+    """
+    fsck() checks the database, repairs it or purges it
+
+    :param app: App
+    :param option: None to check only, repair or purge
+    :return: none
+    """
+    checker = Fsck(con=app.con, cur=app.cur)
+    found = checker.check()
+    if option is None:
+        app.printer.print_fsck(found=found)
+        return
+    # end if
+    if option == "purge" and any(count > 0 for check, description, count in found):
+        confirmation = input("purge deletes the rows it can't repair, continue? (y/n): ")
+        if confirmation.strip().lower() != 'y':
+            print("cancelled!")
+            print()
+            return
+        # end if
+    # end if
+    fixed = checker.fix(purge=option == "purge")
+    app.con.flush()
+    app.printer.print_fsck(found=found, fixed=fixed)
+    # end fsck()
+
+
+def metrics(app):
+    """
+    metrics() prints the calls and time spent per command
+
+    :param app: App
+    :return: none
+    """
+    app.printer.print_metrics(metrics=app.registry.metrics())
+    # end metrics()
+
+
+def profile(app, option: str = None):
+    """
+    profile() turns the profiler on or off, or prints its report
+
+    :param app: App
+    :param option: on, off or report
+    :return: none
+    """
+    if option == "on":
+        app.profiler.on()
+        print("profiling on!")
+    # end if
+    elif option == "off":
+        app.profiler.off()
+        print("profiling off!")
+    # end elif
+    else:
+        if app.profiler.has_stats():
+            print(app.profiler.report())
+        # end if
+        else:
+            print("nothing profiled yet!")
+        # end else
+    # end else
+    print()
+    # end profile()
+
+# end of file
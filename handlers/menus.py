@@ -0,0 +1,80 @@
+import logging
+import sys
+
+from functools import cache
+
+from menu.race import Menu as RaceMenu
+from menu.training_block import Menu as TrainingBlockMenu
+
+logger = logging.getLogger(name=__name__)
+
+
+@cache
+def tb_menu(app) -> TrainingBlockMenu:
+    """
+    tb_menu() caches a TrainingBlockMenu client for use the duration of the
+    process
+
+    :param app: App
+    :return: TrainingBlockMenu client
+    """
+    return TrainingBlockMenu(con=app.con, cur=app.cur, output=app.output, athlete_id=app.athlete_id)
+    # end tb_menu()
+
+
+@cache
+def race_menu(app) -> RaceMenu:
+    """
+    race_menu() caches a RaceMenu client for use the duration of the process
+
+    :param app: App
+    :return: RaceMenu client
+    """
+    return RaceMenu(con=app.con, cur=app.cur, output=app.output, athlete_id=app.athlete_id)
+    # end race_menu()
+
+
+def training_blocks(app):
+    """
+    training_blocks() opens the training block menu
+
+    :param app: App
+    :return: none
+    """
+    tb_menu(app).main()
+    # end training_blocks()
+
+
+def races(app):
+    """
+    races() opens the race menu
+
+    :param app: App
+    :return: none
+    """
+    race_menu(app).main()
+    # end races()
+
+
+def main_menu(app):
+    """
+    main_menu() re-prints the commands
+
+    :param app: App
+    :return: none
+    """
+    app.printer.print_main_menu()
+    # end main_menu()
+
+
+def exit_app(app):
+    """
+    exit_app() exits the process
+
+    :param app: App
+    :return: none
+    """
+    sys.exit("bye :)")
+    # end exit_app()
+
+# end of file
@@ -0,0 +1,351 @@
+import logging
+
+from datetime import datetime
+
+from completer import completer
+
+date_format = "%Y-%m-%d"
+logger = logging.getLogger(name=__name__)
+
+
+def list_races(menu):
+    """
+    list_races() lists the first page of races
+
+    :param menu: race Menu
+    :return: none
+    """
+    menu.page = menu.race.get_races_page(limit=menu.page_size)
+    menu.printer.print_races(races=menu.page)
+    # end list_races()
+
+
+def next_page(menu):
+    """
+    next_page() lists the page of races after the one listed
+
+    :param menu: race Menu
+    :return: none
+    """
+    if len(menu.page) == 0:
+        print("please list the races first! (ls)")
+        print()
+        return
+    # end if
+    turn_page(menu=menu, page=menu.race.get_races_page(
+        after=(menu.page[-1][1], menu.page[-1][0]),
+        limit=menu.page_size
+    ))
+    # end next_page()
+
+
+def prev_page(menu):
+    """
+    prev_page() lists the page of races before the one listed
+
+    :param menu: race Menu
+    :return: none
+    """
+    if len(menu.page) == 0:
+        print("please list the races first! (ls)")
+        print()
+        return
+    # end if
+    turn_page(menu=menu, page=menu.race.get_races_page(
+        before=(menu.page[0][1], menu.page[0][0]),
+        limit=menu.page_size
+    ))
+    # end prev_page()
+
+
+def turn_page(menu, page: [] = None):
+    """
+    turn_page() lists a page of races, the listed page is kept if there are no
+    more
+
+    :param menu: race Menu
+    :param page: an [] of races
+    :return: none
+    """
+    if len(page) == 0:
+        print("no more races!")
+        print()
+        return
+    # end if
+    menu.page = page
+    menu.printer.print_races(races=menu.page)
+    # end turn_page()
+
+
+def search(menu, terms: str = None):
+    """
+    search() lists the races matching the search terms
+
+    :param menu: race Menu
+    :param terms: the search terms, as typed
+    :return: none
+    """
+    menu.printer.print_races(races=menu.race.search_races(terms=terms.lower().split(), limit=menu.page_size))
+    # end search()
+
+
+def edit(menu):
+    """
+    edit() opens the edit menu of a race
+
+    :param menu: race Menu
+    :return: none
+    """
+    race_name = input("name: ").strip()
+    if not menu.race.validate_name(name=race_name):
+        print("please select an existing name!")
+        print()
+        return
+    # end if
+    menu.edit_menu(name=race_name)
+    menu.printer.print_race_menu()
+    # end edit()
+
+
+def add(menu):
+    """
+    add() adds a new race
+
+    :param menu: race Menu
+    :return: none
+    """
+    menu.add_race_wizard()
+    # end add()
+
+
+def remove(menu):
+    """
+    remove() removes a race, once confirmed
+
+    :param menu: race Menu
+    :return: none
+    """
+    race_name = input("name: ").strip()
+    if not menu.race.validate_name(name=race_name):
+        print("please select an existing name!")
+        print()
+        return
+    # end if
+    confirmation = input(f"are you sure you want to remove {race_name}? (y/n): ").strip().lower()
+    x = 0
+    while x < 4 and not confirmation == 'y':
+        if confirmation == 'n':
+            break
+        # end if
+        confirmation = input(f"remove {race_name}? (y/n):  ").strip().lower()
+        x += 1
+    # end while
+
+    if confirmation == 'y':
+        menu.race.delete_race_by_name(name=race_name)
+        completer.remove(name=race_name)
+        print(f"{race_name} was deleted!")
+    # end if
+    else:
+        print("cancelled!")
+    # end else
+    print()
+    # end remove()
+
+
+def help_menu(menu):
+    """
+    help_menu() re-prints the race menu
+
+    :param menu: race Menu
+    :return: none
+    """
+    menu.printer.print_race_menu()
+    # end help_menu()
+
+
+def main_menu(menu):
+    """
+    main_menu() closes the race menu, back to the main menu
+
+    :param menu: race Menu
+    :return: none
+    """
+    menu.con.flush()
+    menu.open = False
+    menu.printer.print_main_menu()
+    # end main_menu()
+
+
+def print_race(menu):
+    """
+    print_race() re-prints the details of the race being edited
+
+    :param menu: race Menu
+    :return: none
+    """
+    menu.printer.print_race(race=menu.race.get_race_by_name(name=menu.name))
+    # end print_race()
+
+
+def edit_field(menu, field: str = None):
+    """
+    edit_field() edits a field of the race being edited
+
+    :param menu: race Menu
+    :param field: date, name, miles or url
+    :return: none
+    """
+    name = menu.name
+    race_id = menu.race_id
+    if field == "date":
+        day_id = menu.race.get_day_id_by_name(name=name)
+        day = menu.day.get_day_by_id(day_id=day_id)
+        training_block_id = day[4]
+        print(f"current: {day[1]}")
+        input_date = input("new date (YYYY-MM-DD):").strip()
+        x = 0
+        while x < 4 and not menu.is_date(date=input_date):
+            print("invalid date!")
+            input_date = input("new date (YYYY-MM-DD):").strip()
+            x += 1
+        # end while
+
+        if not menu.is_date(date=input_date):
+            print("invalid date!")
+            return
+        # end if
+        date = datetime.strptime(input_date, date_format)
+
+        old_day_id = day_id
+        if training_block_id is None:
+            day_id = menu.day.get_or_add_standalone_day(date=date)
+        # end if
+        else:
+            day = menu.day.get_day_by_training_block_id_and_date(
+                date=date,
+                training_block_id=training_block_id
+            )
+            if day is None:
+                print("day not found in the training block!")
+                return
+            # end if
+            day_id = day[0]
+        # end else
+
+        menu.race.update_day_id_by_id(race_id=race_id, day_id=day_id)
+        if old_day_id != day_id:
+            menu.day.delete_standalone_day_if_unused(day_id=old_day_id)
+        # end if
+        print(f"{name} date updated to {input_date}!")
+        print()
+    # end if "date"
+
+    elif field == "name":
+        print(f"current name: {name}")
+        input_name = input("new name (64 char. limit): ").strip()
+        x = 0
+        while x < 4 and menu.race.validate_name(name=input_name):
+            input_name = input("name taken! try again: ").strip()
+            x += 1
+        # end while
+
+        if menu.race.validate_name(name=input_name):
+            print("a valid name was not provided!")
+            return
+        # end if
+        menu.race.update_name_by_id(race_id=race_id, name=input_name)
+        completer.rename(old=name, new=input_name)
+        menu.name = input_name
+        print(f"\"{name}\" was updated to \"{input_name}\"!")
+        print()
+    # end elif "name"
+
+    elif field == "miles":
+        print(f"current: {menu.race.get_miles_by_name(name=name)}")
+        miles = menu.input_miles(prompt="new miles: ")
+        if miles is None:
+            return
+        # end if
+        menu.race.update_miles_by_id(race_id=race_id, miles=miles)
+        print(f"{name} miles were updated to {miles}!")
+        print()
+    # end elif "miles"
+
+    else:
+        print(f"current: {menu.race.get_url_by_name(name=name)}")
+        input_url = input("new: ").strip()
+        x = 0
+        while x < 4 and not menu.is_url(url=input_url):
+            print("invalid URL!")
+            input_url = input("new: ").strip()
+            x += 1
+        # end while
+
+        if not menu.is_url(url=input_url):
+            print("invalid URL!")
+            print()
+            return
+        # end if
+
+        menu.race.update_url_by_id(race_id=race_id, url=input_url)
+        print(f"{name} URL was updated to {input_url}!")
+        print()
+    # end else "url"
+    # end edit_field()
+
+
+def delete(menu):
+    """
+    delete() deletes the race being edited, once confirmed, and closes the edit
+    menu
+
+    :param menu: race Menu
+    :return: none
+    """
+    confirmation = input("are you sure? (y/n): ").strip().lower()
+    x = 0
+    while x < 4 and not confirmation == 'y':
+        if confirmation == 'n':
+            break
+        # end if
+        confirmation = input("(y/n): ").strip().lower()
+        x += 1
+    # end while
+
+    if confirmation == 'y':
+        menu.race.delete_race_by_id(race_id=menu.race_id)
+        completer.remove(name=menu.name)
+        print(f"{menu.name} was deleted!")
+        menu.race_id = None
+    # end if
+    else:
+        print("cancelled!")
+    # end else
+    print()
+    # end delete()
+
+
+def help_edit_menu(menu):
+    """
+    help_edit_menu() re-prints the edit race menu
+
+    :param menu: race Menu
+    :return: none
+    """
+    menu.printer.print_race_edit_menu()
+    # end help_edit_menu()
+
+
+def close_race(menu):
+    """
+    close_race() closes the edit race menu, back to the race menu
+
+    :param menu: race Menu
+    :return: none
+    """
+    menu.con.flush()
+    menu.race_id = None
+    # end close_race()
+
+# end of file
@@ -0,0 +1,51 @@
+import logging
+
+from datetime import datetime
+
+from printer import Printer
+
+date_format = "%Y-%m-%d"
+logger = logging.getLogger(name=__name__)
+
+
+def run(app, date: datetime = None, miles: float = 0, duration: int = None, run_type: str = "run"):
+    """
+    run() logs a run on the day of date, in the latest training block if the
+    blocks overlap, on the standalone day (a race outside the blocks) if the
+    date is in no training block
+
+    :param app: App
+    :param date: date
+    :param miles: # of miles
+    :param duration: time in seconds, None if not timed
+    :param run_type: ex. run, easy, long, workout
+    :return: none
+    """
+    days = app.printer.day.get_days_by_date(date=date)
+    if len(days) == 0:
+        print(f"{date.strftime(date_format)} isn't in a training block or on a race day!")
+        print()
+        return
+    # end if
+    day_id, name = days[0]  # the standalone day (no block name) sorts last
+    app.printer.day.run.add_run(day_id=day_id, distance=miles, duration=duration, run_type=run_type)
+    print(f"logged {Printer.format_miles(miles=miles)} miles on {date.strftime(date_format)} "
+          f"({name if name is not None else 'standalone day'})!")
+    print()
+    # end run()
+
+
+def stats(app, start: datetime = None, end: datetime = None):
+    """
+    stats() prints the runs between start and end by type, every run if no
+    dates are given
+
+    :param app: App
+    :param start: first date
+    :param end: last date, defaults to start
+    :return: none
+    """
+    app.printer.print_run_stats(start_date=start, end_date=end if end is not None else start)
+    # end stats()
+
+# end of file
@@ -0,0 +1,588 @@
+import logging
+
+from datetime import datetime
+
+from completer import completer
+from planner import Planner
+from registry import parse_count
+
+date_format = "%Y-%m-%d"
+logger = logging.getLogger(name=__name__)
+
+
+def list_blocks(menu):
+    """
+    list_blocks() lists the first page of training blocks
+
+    :param menu: training block Menu
+    :return: none
+    """
+    menu.page = menu.tb.get_training_blocks_page(limit=menu.page_size)
+    menu.printer.print_training_blocks(training_blocks=menu.page)
+    # end list_blocks()
+
+
+def next_page(menu):
+    """
+    next_page() lists the page of training blocks after the one listed
+
+    :param menu: training block Menu
+    :return: none
+    """
+    if len(menu.page) == 0:
+        print("please list the training blocks first! (ls)")
+        print()
+        return
+    # end if
+    turn_page(menu=menu, page=menu.tb.get_training_blocks_page(
+        after=(menu.page[-1][1], menu.page[-1][0]),
+        limit=menu.page_size
+    ))
+    # end next_page()
+
+
+def prev_page(menu):
+    """
+    prev_page() lists the page of training blocks before the one listed
+
+    :param menu: training block Menu
+    :return: none
+    """
+    if len(menu.page) == 0:
+        print("please list the training blocks first! (ls)")
+        print()
+        return
+    # end if
+    turn_page(menu=menu, page=menu.tb.get_training_blocks_page(
+        before=(menu.page[0][1], menu.page[0][0]),
+        limit=menu.page_size
+    ))
+    # end prev_page()
+
+
+def turn_page(menu, page: [] = None):
+    """
+    turn_page() lists a page of training blocks, the listed page is kept if
+    there are no more
+
+    :param menu: training block Menu
+    :param page: an [] of training blocks
+    :return: none
+    """
+    if len(page) == 0:
+        print("no more training blocks!")
+        print()
+        return
+    # end if
+    menu.page = page
+    menu.printer.print_training_blocks(training_blocks=menu.page)
+    # end turn_page()
+
+
+def input_start_date() -> datetime:
+    """
+    input_start_date() prompts for the start date of a training block, hitting
+    ENTER takes today
+
+    :return: start date, None if max tries were exceeded
+    """
+    input_date = input("start date (YYYY-MM-DD, hit ENTER for today): ").strip()
+    if len(input_date) == 0:
+        return datetime.now()
+    # end if
+    x = 0
+    while x < 5:
+        try:
+            return datetime.strptime(input_date, date_format)
+        # end try
+        except ValueError:
+            print("invalid date!")
+        # end except
+        input_date = input("invalid date! try again: ").strip()
+        x += 1
+    # end while
+    return None
+    # end input_start_date()
+
+
+def edit(menu):
+    """
+    edit() opens the edit menu of a training block
+
+    :param menu: training block Menu
+    :return: none
+    """
+    training_block_name = input("name: ").strip()
+    x = 0
+    while x < 4 and not menu.tb.validate_name(name=training_block_name):
+        training_block_name = input("invalid, try again: ").strip()
+        x += 1
+    # end while
+
+    if not menu.tb.validate_name(name=training_block_name):
+        print("max tries exceeded!")
+        print()
+        return
+    # end if
+    menu.edit_menu(name=training_block_name)
+    menu.printer.print_training_block_menu()
+    # end edit()
+
+
+def add(menu):
+    """
+    add() adds a new training block
+
+    :param menu: training block Menu
+    :return: none
+    """
+    training_block_name = input("name (64 char. limit): ").strip()
+    x = 0
+    while x < 4 and menu.tb.validate_name(name=training_block_name):
+        training_block_name = input("invalid, try again: ").strip()
+        x += 1
+    # end while
+
+    if menu.tb.validate_name(name=training_block_name):
+        print("max tries exceeded!")
+        print()
+        return
+    # end if
+
+    start_date = input_start_date()
+    if start_date is None:
+        return
+    # end if
+
+    weeks = input("# of weeks (min: 1, max: 99): ").strip()
+    x = 0
+    while True:
+        try:
+            weeks = parse_count(value=weeks)
+            break
+        # end try
+        except ValueError:
+            if x == 4:
+                print("max tries exceeded! please provide a #!")
+                print()
+                return
+            # end if
+        # end except
+        weeks = input("invalid #, try again: ").strip()
+        x += 1
+    # end while
+    if weeks > 99:
+        print("training blocks have a minimum (0) and a maximum (99)!")
+        print()
+        return
+    # end if
+
+    training_block_id = menu.tb.add_training_block(
+        name=training_block_name,
+        start_date=start_date
+    )
+    menu.tb.extend(training_block_id=training_block_id, num_weeks=weeks)
+    completer.add(name=training_block_name)
+    print(f"{training_block_name} added!")
+    print()
+    # end add()
+
+
+def clone(menu):
+    """
+    clone() copies a training block as the template of a new one
+
+    :param menu: training block Menu
+    :return: none
+    """
+    source_name = input("training block to copy: ").strip()
+    x = 0
+    while x < 4 and not menu.tb.validate_name(name=source_name):
+        source_name = input("invalid, try again: ").strip()
+        x += 1
+    # end while
+
+    if not menu.tb.validate_name(name=source_name):
+        print("max tries exceeded!")
+        print()
+        return
+    # end if
+
+    training_block_name = input("new name (64 char. limit): ").strip()
+    x = 0
+    while x < 4 and menu.tb.validate_name(name=training_block_name):
+        training_block_name = input("name taken! try again: ").strip()
+        x += 1
+    # end while
+
+    if menu.tb.validate_name(name=training_block_name):
+        print("max tries exceeded!")
+        print()
+        return
+    # end if
+
+    start_date = input_start_date()
+    if start_date is None:
+        return
+    # end if
+
+    copy_goals = input("copy goals? (y/n, hit ENTER for y): ").strip().lower() != 'n'
+    copy_miles = input("copy miles? (y/n, hit ENTER for n): ").strip().lower() == 'y'
+
+    menu.tb.clone_block(
+        source_name=source_name,
+        new_name=training_block_name,
+        new_start_date=start_date,
+        copy_goals=copy_goals,
+        copy_miles=copy_miles
+    )
+    completer.add(name=training_block_name)
+    print(f"{training_block_name} added!")
+    print()
+    # end clone()
+
+
+def remove(menu):
+    """
+    remove() removes a training block, once confirmed
+
+    :param menu: training block Menu
+    :return: none
+    """
+    training_block_name = input("name: ").strip()
+    if not menu.tb.validate_name(name=training_block_name):
+        print("please select an existing training block name!")
+        print()
+        return
+    # end if
+
+    confirmation = input(f"are you sure you want to remove {training_block_name}? (y/n): ").strip().lower()
+    x = 0
+    while x < 4 and confirmation != 'y':
+        if confirmation == 'n':
+            break
+        # end if
+        confirmation = input("(y/n): ").strip().lower()
+        x += 1
+    # end while
+
+    if confirmation == 'y':
+        training_block = menu.tb.get_training_block_by_name(name=training_block_name)
+        menu.tb.delete_training_block_by_id(training_block_id=training_block[0])
+        completer.remove(name=training_block_name)
+        print(f"{training_block_name} was deleted!")
+    # end if
+    else:
+        print("cancelled!")
+    # end else
+    print()
+    # end remove()
+
+
+def help_menu(menu):
+    """
+    help_menu() re-prints the training block menu
+
+    :param menu: training block Menu
+    :return: none
+    """
+    menu.printer.print_training_block_menu()
+    # end help_menu()
+
+
+def main_menu(menu):
+    """
+    main_menu() closes the training block menu, back to the main menu
+
+    :param menu: training block Menu
+    :return: none
+    """
+    menu.con.flush()
+    menu.open = False
+    menu.printer.print_main_menu()
+    # end main_menu()
+
+
+def print_block(menu):
+    """
+    print_block() prints the training block being edited
+
+    :param menu: training block Menu
+    :return: none
+    """
+    menu.printer.pretty_print_training_block(name=menu.name, block=menu.block)
+    # end print_block()
+
+
+def date(menu, week: int = None, day: str = None):
+    """
+    date() prints a date of the training block being edited, or today's
+
+    :param menu: training block Menu
+    :param week: week #, None for today
+    :param day: day # (1-7)
+    :return: none
+    """
+    block = menu.block
+    if week is None:
+        block.flush()  # today's goal is read from the database
+        menu.printer.print_today(training_block_id=block.training_block_id)
+        return
+    # end if
+    if day is None:
+        print("invalid syntax! ex. d <week> <day>")
+        print()
+        return
+    # end if
+    if not block.has_week(week_number=week):
+        print(f"please provide a valid week #! (max: {block.num_weeks()})")
+        print()
+        return
+    # end if
+    menu.printer.print_date(
+        training_block_id=block.training_block_id,
+        week_number=week,
+        day_number=int(day),
+        block=block
+    )
+    # end date()
+
+
+def update(menu, week: int = None, day: str = None, miles: int = None):
+    """
+    update() sets the miles of a day, or the goal of a week, of the training
+    block being edited
+
+    :param menu: training block Menu
+    :param week: week #
+    :param day: day # (1-7), 'g' for the week's goal
+    :param miles: # of miles
+    :return: none
+    """
+    block = menu.block
+    if not block.has_week(week_number=week):
+        print(f"please provide a valid week number! (max: {block.num_weeks()})")
+        print()
+        return
+    # end if
+    if miles >= 999:
+        print("please provide a valid # of miles!")
+        print()
+        return
+    # end if
+
+    if day == 'g':
+        block.set_goal(week_number=week, goal=miles)
+        print("goal updated!")
+    # end if
+    elif block.set_miles(week_number=week, day_number=int(day), miles=miles):
+        print("week/day updated!")
+    # end elif
+    elif block.get_date(week_number=week, day_number=int(day)) is None:
+        print(f"week {week}, day {day} not found!")
+    # end elif
+    else:
+        logged = block.get_logged_miles(week_number=week, day_number=int(day))
+        print(f"week {week}, day {day} has {logged:g} miles of logged runs!")
+    # end else
+    print()
+    # end update()
+
+
+def input_num_weeks() -> int:
+    """
+    input_num_weeks() prompts for a # of weeks, hitting ENTER (or anything
+    but a #) takes 1
+
+    :return: # of weeks
+    """
+    try:
+        return parse_count(value=input("# of weeks (hit ENTER for 1): ").strip())
+    # end try
+    except ValueError:
+        return 1
+    # end except
+    # end input_num_weeks()
+
+
+def add_to_block(menu, option: str = None):
+    """
+    add_to_block() adds week(s) or a new race to the training block being
+    edited
+
+    :param menu: training block Menu
+    :param option: week or race
+    :return: none
+    """
+    block = menu.block
+    if option == "week":
+        num_weeks = input_num_weeks()
+        if block.num_weeks() + num_weeks > 99:
+            print(f"can't add {num_weeks} weeks! (max: 99, current: {block.num_weeks()})")
+            print()
+            return
+        # end if
+
+        block.flush()
+        menu.tb.extend(training_block_id=block.training_block_id, num_weeks=num_weeks)
+        block.load()
+        print(f"{num_weeks} week(s) added!")
+        print()
+    # end if
+    else:
+        block.flush()
+        menu.race_menu.add_race_wizard(training_block_id=block.training_block_id)
+        block.load()  # the grid marks the race days
+    # end else
+    # end add_to_block()
+
+
+def remove_from_block(menu, option: str = None):
+    """
+    remove_from_block() removes week(s) or a race from the training block
+    being edited
+
+    :param menu: training block Menu
+    :param option: week or race
+    :return: none
+    """
+    block = menu.block
+    if option == "week":
+        num_weeks = input_num_weeks()
+        block.flush()
+        deleted = menu.week.delete_weeks_from_training_block(
+            training_block_id=block.training_block_id,
+            num_weeks=num_weeks
+        )
+        if deleted < num_weeks:
+            print("no more weeks!")
+        # end if
+        print("done!")
+        print()
+        block.load()
+    # end if
+    else:
+        race_name = input("name: ").strip()
+        if not menu.race.validate_name(name=race_name):
+            print("please select an existing race name!")
+            return
+        # end if
+        block.flush()
+        menu.race.delete_race_by_name(name=race_name)
+        completer.remove(name=race_name)
+        block.load()
+    # end else
+    # end remove_from_block()
+
+
+def shift(menu, days: int = None):
+    """
+    shift() moves the training block being edited by a # of days
+
+    :param menu: training block Menu
+    :param days: # of days, negative moves it earlier
+    :return: none
+    """
+    block = menu.block
+    block.flush()
+    menu.tb.shift_start(training_block_id=block.training_block_id, days=days)
+    block.load()
+    print(f"{menu.name} shifted by {days} days!")
+    print()
+    # end shift()
+
+
+def plan(menu):
+    """
+    plan() generates the weekly goals of the training block being edited
+    (build, cutback, taper) and writes them once confirmed
+
+    :param menu: training block Menu
+    :return: none
+    """
+    block = menu.block
+    base = menu.input_number(prompt="base miles/week", default=20)
+    peak = menu.input_number(prompt="peak miles/week", default=50) if base is not None else None
+    ramp = menu.input_number(prompt="ramp rate", default=0.1, cast=float) if peak is not None else None
+    cutback = menu.input_number(prompt="cutback every # weeks", default=4) if ramp is not None else None
+    taper = menu.input_number(prompt="taper weeks", default=2) if cutback is not None else None
+    if taper is None:
+        return
+    # end if
+
+    input_date = input("race date (YYYY-MM-DD, hit ENTER for the last week): ").strip()
+    race_week = block.num_weeks()
+    if len(input_date) > 0:
+        if not menu.is_date(date=input_date):
+            print()
+            return
+        # end if
+        days = menu.day.get_day_context_by_date(
+            date=datetime.strptime(input_date, date_format),
+            training_block_id=block.training_block_id
+        )
+        if len(days) == 0:
+            print("day not found in training block!")
+            print()
+            return
+        # end if
+        race_week = days[0][2]
+    # end if
+
+    planner = Planner(base=base, peak=peak, ramp=ramp, cutback=cutback, taper=taper)
+    goals = planner.goals(race_week=race_week)
+    day_targets = input("show day targets? (y/n): ").strip().lower() == 'y'
+    menu.printer.print_plan(goals=goals, day_targets=day_targets)
+
+    confirmation = input(f"write these goals to {menu.name}? (y/n): ").strip().lower()
+    if confirmation == 'y':
+        for week_number, goal in goals:
+            if block.has_week(week_number=week_number):
+                block.set_goal(week_number=week_number, goal=goal)
+            # end if
+        # end for
+        print("goals updated!")
+    # end if
+    else:
+        print("cancelled!")
+    # end else
+    print()
+    # end plan()
+
+
+def races(menu):
+    """
+    races() prints the races within the training block being edited
+
+    :param menu: training block Menu
+    :return: none
+    """
+    menu.printer.print_races(training_block_id=menu.block.training_block_id)
+    # end races()
+
+
+def help_edit_menu(menu):
+    """
+    help_edit_menu() re-prints the edit training block menu
+
+    :param menu: training block Menu
+    :return: none
+    """
+    menu.printer.print_training_block_edit_menu()
+    # end help_edit_menu()
+
+
+def close_block(menu):
+    """
+    close_block() writes the training block being edited and closes the edit
+    menu, back to the training block menu
+
+    :param menu: training block Menu
+    :return: none
+    """
+    menu.block.flush()
+    menu.con.flush()
+    menu.block = None
+    # end close_block()
+
+# end of file
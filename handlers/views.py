@@ -0,0 +1,69 @@
+import logging
+
+from datetime import datetime
+
+logger = logging.getLogger(name=__name__)
+
+
+def today(app):
+    """
+    today() prints where today falls across the training blocks
+
+    :param app: App
+    :return: none
+    """
+    app.printer.print_today()
+    # end today()
+
+
+def days(app, start: datetime = None, end: datetime = None):
+    """
+    days() prints the days between start and end across all the blocks, today
+    if no dates are given
+
+    :param app: App
+    :param start: first date
+    :param end: last date, defaults to start
+    :return: none
+    """
+    start = start if start is not None else datetime.now()
+    app.printer.print_days(start_date=start, end_date=end if end is not None else start)
+    # end days()
+
+
+def report(app, year: int = None):
+    """
+    report() prints the year in review
+
+    :param app: App
+    :param year: year, defaults to this year
+    :return: none
+    """
+    app.printer.print_year_report(year=year if year is not None else datetime.now().year)
+    # end report()
+
+
+def calendar(app, year: int = None):
+    """
+    calendar() prints the heatmap of a year
+
+    :param app: App
+    :param year: year, defaults to this year
+    :return: none
+    """
+    app.printer.print_calendar(year=year if year is not None else datetime.now().year)
+    # end calendar()
+
+
+def changes(app, seq: int = 0):
+    """
+    changes() prints the journaled changes after a seq
+
+    :param app: App
+    :param seq: last seq already seen
+    :return: none
+    """
+    app.printer.print_changes(seq=seq)
+    # end changes()
+
+# end of file
@@ -0,0 +1,111 @@
+import logging
+
+from array import array
+from datetime import date
+
+logger = logging.getLogger(name=__name__)
+
+# day shades, lightest to darkest, by the share of the year's biggest day
+shades = "-=+*#"
+weekdays = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+class Heatmap:
+    """
+    Heatmap lays a year of daily miles out as a week (column, starting Monday)
+    x weekday (row) grid, 53 columns (54 when the year spans one more Monday).
+    The cells are preallocated arrays indexed by column * 7 + weekday, filled
+    by add() and rendered into a single str:
+    - '.' no miles, a shade from shades otherwise, 'R' a race day
+    - ' ' the days of the first and last columns outside the year
+    """
+
+    def __init__(self, year: int = None, **kwargs):
+        super().__init__(**kwargs)
+        self.year = year
+        first = date(year, 1, 1)
+        self.start = first.toordinal() - first.weekday()  # the Monday of the first column
+        self.end = date(year, 12, 31).toordinal()
+        self.num_weeks = (self.end - self.start) // 7 + 1
+        self.miles = array('d', [0]) * (self.num_weeks * 7)
+        self.races = bytearray(self.num_weeks * 7)
+        self.biggest_day = 0
+        # end __init__()
+
+    def add(self, day_date: str = None, miles: float = 0, races: int = 0):
+        """
+        add() fills in a day
+
+        :param day_date: %Y-%m-%d formatted date
+        :param miles: # of miles
+        :param races: # of races on the day
+        :return: none
+        """
+        slot = date.fromisoformat(day_date).toordinal() - self.start
+        self.miles[slot] = miles or 0
+        self.races[slot] = 1 if races > 0 else 0
+        if self.miles[slot] > self.biggest_day:
+            self.biggest_day = self.miles[slot]
+        # end if
+        # end add()
+
+    def shade(self, miles: float = 0) -> str:
+        """
+        shade() picks the cell char of a # of miles
+
+        :param miles: # of miles
+        :return: the cell char
+        """
+        if miles <= 0:
+            return '.'
+        # end if
+        return shades[min(int(miles / self.biggest_day * len(shades)), len(shades) - 1)]
+        # end shade()
+
+    def render(self) -> str:
+        """
+        render() formats the grid, the month labels above it and a legend below
+        into a single str
+
+        :return: the heatmap
+        """
+        labels = [' '] * (self.num_weeks * 2)
+        for month in range(1, 13):
+            column = (date(self.year, month, 1).toordinal() - self.start) // 7
+            name = date(self.year, month, 1).strftime("%b")
+            labels[column * 2:column * 2 + len(name)] = name
+        # end for
+        lines = ["    " + "".join(labels).rstrip()]
+
+        first = date(self.year, 1, 1).toordinal() - self.start
+        last = self.end - self.start
+        for weekday in range(7):
+            cells = []
+            for slot in range(weekday, self.num_weeks * 7, 7):
+                if slot < first or slot > last:
+                    cells.append(' ')
+                # end if
+                elif self.races[slot]:
+                    cells.append('R')
+                # end elif
+                else:
+                    cells.append(self.shade(miles=self.miles[slot]))
+                # end else
+            # end for
+            lines.append(f"{weekdays[weekday]} " + " ".join(cells).rstrip())
+        # end for
+
+        legend = ". 0"
+        step = self.biggest_day / len(shades)
+        for x, shade in enumerate(shades if self.biggest_day > 0 else ""):
+            legend += f"  {shade} {round(step * x, 1):g}+" if x > 0 else f"  {shade} >0"
+        # end for
+        lines.append("")
+        lines.append(f"    {legend}  R race (biggest day {self.biggest_day:g})")
+        lines.append("")
+        return "\n".join(lines) + "\n"
+        # end render()
+
+    # end Heatmap
+
+# end of file
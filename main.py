@@ -1,17 +1,165 @@
+import argparse
 import logging
+import signal
 import sqlite3 as sl
+import sys
 
 from app import App
+from backup import Backup
+from group_commit import GroupCommit
+from profiler import Profiler
+from shard import ShardManager
+from table import outputs
 
 logger = logging.getLogger(name=__name__)
 
 
+def parse_args() -> argparse.Namespace:
+    """
+    parse_args() parses the command line flags
+
+    :return: the parsed flags
+    """
+    parser = argparse.ArgumentParser(description="track training blocks, weeks, days and races")
+    parser.add_argument(
+        "--db",
+        default="/Users/ryanperkins/Desktop/miles/db/miles_database",
+        help="path to the SQLite database"
+    )
+    parser.add_argument(
+        "--shards",
+        default=None,
+        help="directory of per-athlete SQLite databases, used instead of --db"
+    )
+    parser.add_argument(
+        "--backup-dir",
+        default=None,
+        help="directory of the backups, defaults to backups/ next to the database"
+    )
+    parser.add_argument(
+        "--backup-every",
+        type=float,
+        default=None,
+        help="take a backup in the background every this many minutes"
+    )
+    parser.add_argument(
+        "--backup-keep",
+        type=int,
+        default=5,
+        help="number of backups to keep, the oldest are removed"
+    )
+    parser.add_argument(
+        "--group-commit",
+        action="store_true",
+        help="hold the writes in one transaction and commit them in groups, see the README for durability"
+    )
+    parser.add_argument(
+        "--group-commit-ops",
+        type=int,
+        default=50,
+        help="commit the group once this many writes are pending"
+    )
+    parser.add_argument(
+        "--group-commit-secs",
+        type=float,
+        default=5.0,
+        help="commit the group on the first write once the oldest pending write is this many seconds old"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="profile every command and print a ranked report on exit"
+    )
+    parser.add_argument(
+        "--profile-output",
+        default=None,
+        help="write the accumulated pstats to this file on exit instead of printing a report"
+    )
+    parser.add_argument(
+        "--output",
+        choices=outputs,
+        default="table",
+        help="output format of the listings: ASCII tables, JSON lines or TSV"
+    )
+    parser.add_argument(
+        "--athlete",
+        default="default",
+        help="name of the athlete to track, added on first use"
+    )
+    parser.add_argument(
+        "--plugins",
+        default="",
+        help="comma separated plugin modules, each with a register(registry) function adding its commands"
+    )
+    return parser.parse_args()
+    # end parse_args()
+
+
+def exit_on_signal(signum, frame):
+    """
+    exit_on_signal() turns a termination signal into a regular exit, so the
+    pending writes are committed on the way out
+
+    :param signum: signal number
+    :param frame: current stack frame
+    :return: none
+    """
+    sys.exit(f"terminated ({signal.Signals(signum).name})")
+    # end exit_on_signal()
+
+
 if __name__ == "__main__":
-    with sl.connect(f"/Users/ryanperkins/Desktop/miles/db/miles_database") as con:
-        cur = con.cursor()
-        app = App(con=con, cur=cur)
-        app.__exec__()
-    # end with
+    args = parse_args()
+    for name in ("SIGTERM", "SIGHUP"):
+        if hasattr(signal, name):  # SIGHUP isn't available on Windows
+            signal.signal(getattr(signal, name), exit_on_signal)
+        # end if
+    # end for
+    profiler = Profiler(enabled=args.profile, output=args.profile_output)
+    shards = ShardManager(directory=args.shards) if args.shards is not None else None
+    con = shards.connect(athlete=args.athlete) if shards is not None else sl.connect(args.db, check_same_thread=False)
+    backup = Backup(
+        path=shards.path(athlete=args.athlete) if shards is not None else args.db,
+        directory=args.backup_dir,
+        keep=args.backup_keep,
+        interval=args.backup_every
+    )
+    try:
+        with con:
+            cur = con.cursor()
+            session = GroupCommit(
+                con=con,
+                enabled=args.group_commit,
+                ops=args.group_commit_ops,
+                seconds=args.group_commit_secs
+            )
+            app = App(
+                con=session,
+                cur=cur,
+                profiler=profiler,
+                output=args.output,
+                athlete=args.athlete,
+                shards=shards,
+                backup=backup,
+                plugins=[plugin.strip() for plugin in args.plugins.split(',') if len(plugin.strip()) > 0]
+            )
+            app.setup()
+            backup.start()
+            try:
+                app.__exec__()
+            # end try
+            finally:
+                session.flush()
+                profiler.dump()
+            # end finally
+        # end with
+    # end try
+    finally:
+        backup.stop()
+        if shards is not None:
+            shards.close()
+        # end if
+    # end finally
     # end __main__()
 
 # end of file
@@ -1,6 +1,5 @@
 import logging
 import re
-import sys
 
 from datetime import datetime
 from functools import cached_property
@@ -8,16 +7,25 @@ from functools import cached_property
 from client.day import DayClient
 from client.race import RaceClient
 from client.training_block import TrainingBlockClient
+from completer import completer
 from printer import Printer
+from registry import parse_count, race_edit_registry, race_registry
 
 date_format = "%Y-%m-%d"
 logger = logging.getLogger(name=__name__)
 
 
 class Menu:
-    def __init__(self, con, cur):
+    def __init__(self, con, cur, output: str = "table", athlete_id: str = None, page_size: int = 20):
         self.con = con
         self.cur = cur
+        self.output = output
+        self.athlete_id = athlete_id
+        self.page_size = page_size
+        self.page = []
+        self.open = False
+        self.name = None  # the race being edited
+        self.race_id = None
 
     @cached_property
     def day(self) -> DayClient:
@@ -26,7 +34,7 @@ class Menu:
 
         :return: a DayClient
         """
-        return DayClient(con=self.con, cur=self.cur)
+        return DayClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
         # end day()
 
     @cached_property
@@ -36,7 +44,7 @@ class Menu:
 
         :return: a Printer client
         """
-        return Printer(con=self.con, cur=self.cur)
+        return Printer(con=self.con, cur=self.cur, output=self.output, athlete_id=self.athlete_id)
         # end printer()
 
     @cached_property
@@ -46,7 +54,7 @@ class Menu:
 
         :return: a RaceClient
         """
-        return RaceClient(con=self.con, cur=self.cur)
+        return RaceClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
         # end race()
 
     @cached_property
@@ -56,7 +64,7 @@ class Menu:
 
         :return: a TrainingBlockClient
         """
-        return TrainingBlockClient(con=self.con, cur=self.cur)
+        return TrainingBlockClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
         # end tb()
 
     @staticmethod
@@ -101,75 +109,48 @@ class Menu:
         return True
         # end is_url()
 
-    def main(self):
-        self.printer.print_race_menu()
-
-        while True:
-            params = input("~ ").lower().strip().split(' ')
-            cmd = params[0]
-            params.remove(cmd)
-
-            if cmd == "ls" or cmd == "list":
-                self.printer.print_races()
-            # end if "ls"
-
-            elif cmd == 'e' or cmd == "edit":
-                race_name = input("name: ").strip()
-                if not self.race.validate_name(name=race_name):
-                    print("please select an existing name!")
-                    print()
-                    continue
-                # end if
-                else:
-                    self.edit_menu(name=race_name)
-                    self.printer.print_race_menu()
-                # end else
-            # end if 'e'
-
-            elif cmd == 'a' or cmd == "add":
-                self.add_race_wizard()
-            # end elif 'a'
-
-            elif cmd == "rm" or cmd == "remove":
-                race_name = input("name: ").strip()
-                if not self.race.validate_name(race_name):
-                    print("please select an existing name!")
-                    print()
-                    continue
-                # end if
-                confirmation = input(f"are you sure you want to remove {race_name}? (y/n): ").strip().lower()
-                x = 0
-                while x < 4 and not confirmation == 'y':
-                    if confirmation == 'n':
-                        break
-                    confirmation = input(f"remove {race_name}? (y/n):  ").strip().lower()
-                    x += 1
-                # end while
-
-                if confirmation == 'y':
-                    self.race.delete_race_by_name(name=race_name)
-                    print(f"{race_name} was deleted!")
-                    print()
-                # end if
-                else:
-                    print("cancelled!")
-                    print()
-                    continue
-                # end else
-            # end elif "rm"
+    @staticmethod
+    def input_miles(prompt: str = None) -> int:
+        """
+        input_miles() prompts for a race's whole # of miles until a valid one is
+        provided
 
-            elif cmd == 'h' or cmd == "help":
-                self.printer.print_race_menu()
-            # end elif 'h'
+        :param prompt: prompt to print
+        :return: # of miles, None if max tries were exceeded
+        """
+        value = input(prompt).strip()
+        x = 0
+        while x < 5:
+            try:
+                return parse_count(value=value)
+            # end try
+            except ValueError:
+                print("please provide a #!")
+            # end except
+            value = input(prompt).strip()
+            x += 1
+        # end while
+        print("max tries exceeded!")
+        print()
+        return None
+        # end input_miles()
 
-            elif cmd == 'm' or cmd == "menu":
-                self.printer.print_main_menu()
-                return
-            # end elif 'm'
+    def main(self):
+        """
+        main() controls the race menu, the commands are dispatched through the
+        race registry
 
-            elif cmd == 'x' or cmd == "exit":
-                sys.exit("bye :)")
-            # end elif 'x'
+        :return: none
+        """
+        self.printer.print_race_menu()
+        self.open = True
+        while self.open:
+            with self.con.idle():
+                line = input("~ ").strip()
+            # end with
+            if not race_registry.dispatch(app=self, line=line):
+                print("invalid command!")
+            # end if
         # end while
         # end main()
 
@@ -234,34 +215,20 @@ class Menu:
                     training_block_id=training_block_id,
                     date=race_date
                 )
-                if day is not None:
-                    day_id = day[0]
-                else:
-                    day_id = self.day.add_day(date=race_date, miles=0)
+                if day is None:
+                    print("day not found in training block!")
+                    print()
+                    return
+                # end if
+                day_id = day[0]
             # end if
             else:
-                day_id = self.day.add_day(date=race_date, miles=0)
-                # end if
+                day_id = None  # a standalone day, looked up or added once the race is complete
             # end else
         # end else
 
-        miles = input("miles: ").strip()
-        x = 0
-        while x < 4 and (not miles.isdigit() or int(miles) < 0):
-            print("try again!")
-            miles = input("~ ").strip()
-            x += 1
-        # end while
-
-        if not miles.isdigit():
-            print("max tries exceeded! please provide a #!")
-            print()
-            return
-        # end if
-        miles = int(miles)
-        if miles < 0:
-            print("max tries exceeded! # of miles has to be > 0!")
-            print()
+        miles = self.input_miles(prompt="miles: ")
+        if miles is None:
             return
         # end if
 
@@ -278,6 +245,9 @@ class Menu:
             return
         # end if
 
+        if day_id is None:
+            day_id = self.day.get_or_add_standalone_day(date=race_date)
+        # end if
         self.race.add_race(
             day_id=day_id,
             miles=miles,
@@ -286,190 +256,32 @@ class Menu:
             url=url
         )
 
+        completer.add(name=race_name)
         print(f"{race_name} added!")
         print()
         # end add_race_wizard()
 
     def edit_menu(self, name: str = None):
         """
-        edit_race_menu() is responsible for interactions with a specific race
+        edit_menu() controls the edit race menu, the commands are dispatched
+        through the edit race registry
 
         :param name: name of the race to interact with
         :return: none
         """
         self.printer.print_race_edit_menu()
         race = self.race.get_race_by_name(name=name)
-        race_id = race[0]
-
-        while True:
-            params = input("~ ").lower().strip().split(' ')
-            cmd = params[0]
-            params.remove(cmd)
-
-            if cmd == 'p' or cmd == "print":
-                self.printer.print_race(race=race)
-            # end if 'p'
-
-            elif cmd == 'e' or cmd == "edit":
-                if len(params) == 1:
-                    if params[0] == "date":
-                        day_id = self.race.get_day_id_by_name(name=name)
-                        day = self.day.get_day_by_id(day_id=day_id)
-                        date = day[1]
-                        training_block_id = day[4]  # for later...
-                        print(f"current: {date}")
-                        input_date = input("new date (YYYY-MM-DD):").strip()
-                        x = 0
-                        while x < 4 and not self.is_date(date=input_date):
-                            print("invalid date!")
-                            input_date = input("new date (YYYY-MM-DD):").strip()
-                            x += 1
-                        # end while
-
-                        if not self.is_date(date=input_date):
-                            print("invalid date!")
-                            continue
-                        # end if
-                        date = datetime.strptime(input_date, date_format)
-
-                        if training_block_id is None:  # later
-                            day_id = self.day.add_day(date=date)
-                            if day_id is None:
-                                print("day could not be created!")
-                                continue
-                            # end if
-                        # end if
-                        else:
-                            day_id = self.day.get_day_by_training_block_id_and_date(
-                                date=date,
-                                training_block_id=training_block_id
-                            )
-                        # end else
-
-                        if day_id is None:
-                            print("day not found in the training block!")
-                            continue
-                        # end if
-
-                        self.race.update_day_id_by_id(
-                            race_id=race_id,
-                            day_id=day_id
-                        )
-                        print(f"{name} date updated to {date}!")
-                        print()
-                    # end if "date"
-
-                    elif params[0] == "name":
-                        print(f"current name: {name}")
-                        input_name = input("new name (64 char. limit): ").strip()
-                        x = 0
-                        while x < 4 and self.race.validate_name(name=input_name):
-                            input_name = input("name taken! try again: ").strip()
-                            x += 1
-                        # end while
-
-                        if self.race.validate_name(name=input_name):
-                            print("a valid name was not provided!")
-                            continue
-                        # end if
-                        self.race.update_name_by_id(race_id=race_id, name=input_name)
-                        print(f"\"{name}\" was updated to \"{input_name}\"!")
-                        print()
-                    # end elif "name"
-
-                    elif params[0] == "miles":
-                        miles = self.race.get_miles_by_name(name=name)
-                        print(f"current: {miles}")
-                        input_miles = input("new miles: ").strip()
-                        x = 0
-                        while x < 4 and not input_miles.isdigit():
-                            print("invalid character!")
-                            input_miles = input("new miles: ").strip()
-                            x += 1
-                        # end while
-
-                        if not input_miles.isdigit():
-                            print("please provide a #!")
-                            print()
-                            continue
-                        # end if
-
-                        miles = int(input_miles)
-                        if miles < 0:
-                            print("miles must be > 0!")
-                            print()
-                            continue
-                        # end if
-
-                        self.race.update_miles_by_id(race_id=race_id, miles=miles)
-                        print(f"{name} miles were updated to {miles}!")
-                        print()
-                    # end elif "miles"
-
-                    elif params[0] == "url":
-                        url = self.race.get_url_by_name(name=name)
-                        print(f"current: {url}")
-                        input_url = input("new: ").strip()
-                        x = 0
-                        while x < 4 and not self.is_url(url=input_url):
-                            print("invalid URL!")
-                            input_url = input("new: ").strip()
-                            x += 1
-                        # end while
-
-                        if not self.is_url(url=input_url):
-                            print("invalid URL!")
-                            print()
-                            continue
-                        # end if
-
-                        self.race.update_url_by_id(race_id=race_id, url=input_url)
-                        print(f"{name} URL was updated to {input_url}!")
-                        print()
-                    # end elif "url"
-                # end if
-                else:
-                    print("please provide a field to update! (date, name, miles, url)")
-                    print()
-                # end else
-            # end elif 'e'
-
-            elif cmd == 'd' or cmd == "delete":
-                confirmation = input("are you sure? (y/n): ").strip().lower()
-                x = 0
-                while x < 4 and not confirmation == 'y':
-                    if confirmation == 'n':
-                        break
-                    confirmation = input("(y/n): ").strip().lower()
-                    x += 1
-                # end while
-
-                if confirmation == 'y':
-                    self.race.delete_race_by_id(race_id=race_id)
-                    print(f"{name} was deleted!")
-                    print()
-                    return
-                # end if
-                else:
-                    print("cancelled!")
-                    print()
-                    continue
-                # end else
-            # end elif 'd'
-
-            elif cmd == 'h' or cmd == "help":
-                self.printer.print_race_edit_menu()
-            # end elif 'h'
-
-            elif cmd == 'm' or cmd == "menu":
-                return
-            # end elif 'x'
-
-            elif cmd == 'x' or cmd == "exit":
-                sys.exit("bye :)")
-            # end elif 'x'
+        self.name = name
+        self.race_id = race[0]
+        while self.race_id is not None:
+            with self.con.idle():
+                line = input("~ ").strip()
+            # end with
+            if not race_edit_registry.dispatch(app=self, line=line):
+                print("invalid command!")
+            # end if
         # end while
-        # end edit_race_menu()
+        # end edit_menu()
 
     # end Menu
 
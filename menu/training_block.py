@@ -1,26 +1,34 @@
 import logging
-import sys
 
 from functools import cached_property
 
+from aggregate import TrainingBlock
 from client.day import DayClient
 from printer import Printer
 from menu.race import Menu as RaceMenu
 from client.race import RaceClient
 from client.training_block import TrainingBlockClient
 from client.week import WeekClient
+from registry import training_block_edit_registry, training_block_registry
 
-from datetime import datetime, timedelta
+from datetime import datetime
 
 logger = logging.getLogger(name=__name__)
 date_format = "%Y-%m-%d"
 
 
 class Menu:
-    def __init__(self, con, cur, **kwargs):
+    def __init__(self, con, cur, output: str = "table", athlete_id: str = None, page_size: int = 20, **kwargs):
         super().__init__(**kwargs)
         self.con = con
         self.cur = cur
+        self.output = output
+        self.athlete_id = athlete_id
+        self.page_size = page_size
+        self.page = []
+        self.open = False
+        self.name = None  # the training block being edited, and its TrainingBlock
+        self.block = None
         # end __init__()
 
     @cached_property
@@ -30,7 +38,7 @@ class Menu:
 
         :return: a DayClient
         """
-        return DayClient(con=self.con, cur=self.cur)
+        return DayClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
         # end day()
 
     @cached_property
@@ -40,7 +48,7 @@ class Menu:
 
         :return: a Printer client
         """
-        return Printer(con=self.con, cur=self.cur)
+        return Printer(con=self.con, cur=self.cur, output=self.output, athlete_id=self.athlete_id)
         # end printer()
 
     @cached_property
@@ -50,7 +58,7 @@ class Menu:
 
         :return: a RaceClient
         """
-        return RaceClient(con=self.con, cur=self.cur)
+        return RaceClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
         # end race()
 
     @cached_property
@@ -60,7 +68,7 @@ class Menu:
 
         :return: a RaceMenu client
         """
-        return RaceMenu(con=self.con, cur=self.cur)
+        return RaceMenu(con=self.con, cur=self.cur, output=self.output, athlete_id=self.athlete_id)
         # end race_menu()
 
     @cached_property
@@ -70,7 +78,7 @@ class Menu:
 
         :return: a TrainingBlockClient
         """
-        return TrainingBlockClient(con=self.con, cur=self.cur)
+        return TrainingBlockClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
         # end tb()
 
     @cached_property
@@ -80,7 +88,7 @@ class Menu:
 
         :return: a WeekClient
         """
-        return WeekClient(con=self.con, cur=self.cur)
+        return WeekClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
         # end week()
 
     @staticmethod
@@ -101,401 +109,95 @@ class Menu:
         # end except
         # end is_date()
 
+    @staticmethod
+    def input_number(prompt: str = None, default: float = 0, cast: type = int):
+        """
+        input_number() prompts for a # until a valid one is provided, hitting
+        ENTER takes the default
+
+        :param prompt: prompt to print
+        :param default: value used when nothing is entered
+        :param cast: int or float
+        :return: the #, None if max tries were exceeded
+        """
+        value = input(f"{prompt} (hit ENTER for {default}): ").strip()
+        x = 0
+        while x < 5:
+            if len(value) == 0:
+                return default
+            # end if
+            try:
+                number = cast(value)
+                if number >= 0:
+                    return number
+                # end if
+            # end try
+            except ValueError:
+                pass
+            # end except
+            value = input("invalid #, try again: ").strip()
+            x += 1
+        # end while
+        print("max tries exceeded!")
+        print()
+        return None
+        # end input_number()
+
     def main(self):
         """
-        main() controls the main training block menu
+        main() controls the main training block menu, the commands are
+        dispatched through the training block registry
 
         :return: none
         """
         self.printer.print_training_block_menu()
-
-        while True:
-            params = input("~ ").lower().strip().split(' ')
-            cmd = params[0]
-            params.remove(cmd)
-
-            if cmd == "ls" or cmd == "list":
-                self.printer.print_training_blocks()
-                # end if "ls"
-
-            elif cmd == 'e' or cmd == "edit":
-                training_block_name = input("name: ").strip()
-                x = 0
-                while x < 4 and not self.tb.validate_name(name=training_block_name):
-                    training_block_name = input("invalid, try again: ").strip()
-                    x += 1
-                # end while
-
-                if not self.tb.validate_name(name=training_block_name):
-                    print("max tries exceeded!")
-                    print()
-                    continue
-                # end if
-                else:
-                    self.edit_menu(name=training_block_name)
-                    self.printer.print_training_block_menu()
-                # end else
-            # end if 'e'
-
-            elif cmd == 'a' or cmd == "add":
-                training_block_name = input("name (64 char. limit): ").strip()
-                x = 0
-                while x < 4 and self.tb.validate_name(name=training_block_name):
-                    training_block_name = input("invalid, try again: ").strip()
-                    x += 1
-                # end while
-
-                if self.tb.validate_name(name=training_block_name):
-                    print("max tries exceeded!")
-                    print()
-                    continue
-
-                input_date = input("start date (YYYY-MM-DD, hit ENTER for today): ").strip()
-
-                if len(input_date) == 0:
-                    start_date = datetime.now()
-                # end if
-                else:
-                    x = 0
-                    while x < 4 and not self.is_date(date=input_date):
-                        input_date = input("invalid date! try again: ").strip()
-                        x += 1
-                    # end while
-                    if not self.is_date(date=input_date):
-                        continue
-                    # end if
-                    start_date = datetime.strptime(input_date, date_format)
-                # end else
-
-                training_block_id = self.tb.add_training_block(
-                    name=training_block_name,
-                    start_date=start_date
-                )
-
-                weeks = input("# of weeks (min: 1, max: 99): ").strip()
-                x = 0
-                while x < 4 and (not weeks.isdigit() or int(weeks) < 0):
-                    weeks = input("invalid #, try again: ").strip()
-                    x += 1
-                # end while
-
-                if not weeks.isdigit():
-                    print("max tries exceeded! please provide a #!")
-                    print()
-                    self.tb.delete_training_block_by_id(training_block_id=training_block_id)
-                    continue
-                # end if
-                weeks = int(weeks)
-                if weeks < 0 or weeks > 99:
-                    print("max tries exceeded! training blocks have a minimum (0) and a maximum (99)!")
-                    print()
-                    self.tb.delete_training_block_by_id(training_block_id=training_block_id)
-                    continue
-                # end if
-
-                for x in range(weeks):
-                    week_id = self.week.add_week(
-                        training_block_id=training_block_id,
-                        week_number=(x + 1)
-                    )
-
-                    for y in range(7):
-                        self.day.add_day(
-                            date=start_date,
-                            day_number=(y + 1),
-                            week_id=week_id,
-                            training_block_id=training_block_id
-                        )
-                        start_date += timedelta(days=1)
-                    # end for
-                # end for
-                print(f"{training_block_name} added!")
-                print()
-            # end elif 'a'
-
-            elif cmd == "rm" or cmd == "remove":
-                training_block_name = input("name: ").strip()
-                if not self.tb.validate_name(name=training_block_name):
-                    print("please select an existing training block name!")
-                    print()
-                    continue
-                    # end if
-                else:
-                    confirmation = input("are you sure you want to remove "
-                                         f"{training_block_name}? (y/n): ").strip().lower()
-                    x = 0
-                    while x < 4 and confirmation != 'y':
-                        if confirmation == 'n':
-                            break
-                        confirmation = input("(y/n): ").strip().lower()
-                        x += 1
-                    # end while
-
-                    if confirmation == 'y':
-                        training_block = self.tb.get_training_block_by_name(name=training_block_name)
-                        training_block_id = training_block[0]
-                        self.tb.delete_training_block_by_id(training_block_id=training_block_id)
-
-                        weeks = self.week.get_weeks_by_training_block_id(training_block_id=training_block_id)
-                        for week in weeks:
-                            week_id = week[0]
-                            self.week.delete_week_by_id(week_id=week_id)
-                            self.day.delete_days_by_week_id(week_id=week_id)
-                        # end for
-                        print(f"{training_block_name} was deleted!")
-                        print()
-                    # end if
-                    else:
-                        print("cancelled!")
-                        print()
-                        continue
-                    # end else
-                # end else
-            # end elif "rm"
-
-            elif cmd == 'h' or cmd == "help":
-                self.printer.print_training_block_menu()
-            # end elif 'h'
-
-            elif cmd == 'm' or cmd == "menu":
-                self.printer.print_main_menu()
-                return
-            # end elif 'm'
-
-            elif cmd == 'x' or cmd == "exit":
-                sys.exit("bye :)")
-            # end elif 'x'
+        self.open = True
+        while self.open:
+            with self.con.idle():
+                line = input("~ ").strip()
+            # end with
+            if not training_block_registry.dispatch(app=self, line=line):
+                print("invalid command!")
+            # end if
         # end while
         # end main()
 
     def edit_menu(self, name: str = None):
         """
-        edit_menu() controls the edit training block menu
+        edit_menu() controls the edit training block menu. The block is held in
+        memory (TrainingBlock) while the menu is open: print, date and update
+        work off of it, the updates are written in one batch when the menu is
+        left, or before a command that needs them in the database. The commands
+        are dispatched through the edit training block registry
 
         :param name: name
         :return: none
         """
         self.printer.print_training_block_edit_menu()
         training_block = self.tb.get_training_block_by_name(name=name)
-        training_block_id = training_block[0]
-        weeks = self.week.get_weeks_by_training_block_id(training_block_id=training_block_id)
-
-        while True:
-            params = input("~ ").lower().strip().split(' ')
-            cmd = params[0]
-            params.remove(cmd)
-
-            if cmd == 'p' or cmd == "print":
-                self.printer.pretty_print_training_block(name=name)
-            # end if 'p'
-
-            elif cmd == 'd' or cmd == "date":
-                if len(params) == 2:
-                    if not params[0].strip().isdigit():
-                        print(f"please provide a valid week #! (max: {len(weeks)})")
-                        print()
-                        continue
-
-                    if not params[1].strip().isdigit():
-                        print("please provide a valid day #! (1-7)")
-                        print()
-                        continue
-
-                    week_number = int(params[0].strip())
-                    day_number = int(params[1].strip())
-
-                    if week_number < 1 or week_number > len(weeks):
-                        print(f"week # is too big! (max: {len(weeks)})")
-                        print()
-                        continue
-
-                    if day_number < 1 or day_number > 7:
-                        print("day # is too big! (1-7)")
-                        print()
-                        continue
-
-                    self.printer.print_date(
-                        training_block_id=training_block_id,
-                        week_number=week_number,
-                        day_number=day_number
-                    )
-                # end if
-                elif len(params) == 0:
-                    self.printer.print_today(training_block_id=training_block_id)
-                # end elif
-                else:
-                    print("invalid syntax!")
-                    print()
-                # end else
-            # end elif 'd'
-
-            elif cmd == 'u' or cmd == "update":
-                if len(params) == 3:
-                    week_number = params[0].strip()
-                    if not week_number.isdigit() or int(week_number) > len(weeks):
-                        print(f"please provide a valid week number! (max: {len(weeks)})")
-                        print()
-                        continue
-                    # end if
-
-                    day_number = params[1].strip()
-                    if not day_number == 'g' and not (day_number.isdigit() and (0 < int(day_number) < 8)):
-                        print("please provide a valid day number! (1-7 or 'g' for goal)")
-                        print()
-                        continue
-                    # end if
-
-                    miles = params[2].strip()
-                    if not (miles.isdigit() and (0 <= int(miles) < 999)):
-                        print("please provide a valid # of miles!")
-                        print()
-                        continue
-                    # end if
-
-                    week_number = int(week_number)
-                    day_number = 'g' if day_number == 'g' else int(day_number)
-                    miles = int(miles)
-
-                    week = self.week.get_week_by_training_block_id_and_week_number(
-                        training_block_id=training_block_id,
-                        week_number=week_number
-                    )  # could ref. the 'weeks' variable above
-                    week_id = week[0]
-                    if day_number == 'g':
-                        self.week.update_goal_by_week_id(
-                            goal=miles,
-                            week_id=week_id
-                        )
-                        print("goal updated!")
-                    # end if
-                    else:
-                        self.day.update_day_by_week_id_and_day_number(
-                            miles=miles,
-                            week_id=week_id,
-                            day_number=int(day_number)
-                        )
-                        print("week/day updated!")
-                    # end else
-                    print()
-                # end if
-                else:
-                    print("invalid syntax!")
-                    print()
-                # end else
-            # end elif 'u'
-
-            elif cmd == 'a' or cmd == "add":
-                if len(params) == 1:
-                    if params[0].strip() == "week":
-                        num_weeks = input("# of weeks (hit ENTER for 1)").strip()
-                        if num_weeks.isdigit():
-                            num_weeks = int(params[1].strip())
-                        # end if
-                        else:
-                            num_weeks = 1
-
-                        last_week = self.week.get_last_week_by_training_block_id(
-                            training_block_id=training_block_id
-                        )
-                        week_id = last_week[0]
-                        start_week_number = last_week[1] + 1
-                        if start_week_number > 99:
-                            print("can't add anymore weeks! (max: 99)")
-                            continue
-                        # end if
-                        last_day = self.day.get_day_by_week_id_and_day_number(
-                            week_id=week_id,
-                            day_number=7
-                        )
-                        last_day_date = last_day[1]
-                        last_day_date = datetime.strptime(last_day_date, date_format)
-                        date = last_day_date + timedelta(days=1)
-
-                        for x in range(num_weeks):
-                            if (start_week_number + x) > 99:
-                                print("can't add anymore weeks! (max: 99), added {x + 1} weeks")
-                                break
-                            # end if
-                            week_id = self.week.add_week(
-                                training_block_id=training_block_id,
-                                week_number=(start_week_number + x)
-                            )
-
-                            for y in range(7):
-                                self.day.add_day(
-                                    date=date,
-                                    day_number=(y + 1),
-                                    week_id=week_id,
-                                    training_block_id=training_block_id
-                                )
-                                date += timedelta(days=1)
-                            # end for
-                        # end for
-                    # end if
-                    elif params[0].strip() == "race":
-                        self.race_menu.add_race_wizard(training_block_id=training_block_id)
-                    # end elif
-                # end if
-                else:
-                    print("please provide an option! (week, race)")
-                    print()
-                # end else
-            # end elif 'a'
-
-            elif cmd == "rm" or cmd == "remove":
-                if len(params) == 1:
-                    if params[0].strip() == "week":
-                        num_weeks = input("# of weeks (hit ENTER for 1): ").strip()
-                        if num_weeks.isdigit():
-                            num_weeks = int(num_weeks)
-                        # end if
-                        else:
-                            num_weeks = 1
-                        # end else
-
-                        for x in range(num_weeks):
-                            last_week = self.week.get_last_week_by_training_block_id(training_block_id=training_block_id)
-                            if last_week is None:
-                                print("no more weeks!")
-                                break
-                            # end if
-                            week_id = last_week[0]
-                            self.week.delete_week_by_id(week_id=week_id)
-                            self.day.delete_days_by_week_id(week_id=week_id)
-                            print("done!")
-                            print()
-                        # end for
-                    elif params[0].strip() == "race":
-                        race_name = input("name: ").strip()
-                        if not self.race.validate_name(name=race_name):
-                            print("please select an existing race name!")
-                            continue
-                        self.race.delete_race_by_name(name=race_name)
-                    # end elif
+        block = TrainingBlock(
+            con=self.con,
+            cur=self.cur,
+            athlete_id=self.athlete_id,
+            training_block_id=training_block[0]
+        )
+        block.load()
+        self.name = name
+        self.block = block
+        try:
+            while self.block is not None:
+                with self.con.idle():
+                    line = input("~ ").strip()
+                # end with
+                if not training_block_edit_registry.dispatch(app=self, line=line):
+                    print("invalid command!")
                 # end if
-                else:
-                    print("please provide an option! (week, race)")
-                    print()
-                # end else
-            # end elif "rm"
-
-            elif cmd == 'r' or cmd == "race":
-                self.printer.print_races(training_block_id=training_block_id)
-                continue
-            # end elif 'r'
-
-            elif cmd == 'h' or cmd == "help":
-                self.printer.print_training_block_edit_menu()
-            # end elif 'h'
-
-            elif cmd == 'm' or cmd == "menu":
-                return
-            # end elif 'x'
-
-            elif cmd == 'x' or cmd == "exit":
-                sys.exit("bye :)")
-            # end elif 'x'
-        # end while
+            # end while
+        # end try
+        finally:
+            block.flush()
+            self.block = None
+        # end finally
         # end edit_menu()
 
     # end Menu
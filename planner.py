@@ -0,0 +1,77 @@
+import logging
+
+logger = logging.getLogger(name=__name__)
+
+# share of the weekly goal run on each day of the week, day 7 is the long run
+day_split = (0.10, 0.15, 0.10, 0.20, 0.0, 0.15, 0.30)
+
+
+class Planner:
+    """
+    Planner computes the weekly goals of a training block: a build from base
+    to peak at a given ramp rate with a cutback week every few weeks, followed
+    by a taper into race week
+    """
+
+    def __init__(
+            self,
+            base: int = 20,
+            peak: int = 50,
+            ramp: float = 0.1,
+            cutback: int = 4,
+            taper: int = 2,
+            cutback_ratio: float = 0.8,
+            **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.base = base
+        self.peak = peak
+        self.ramp = ramp
+        self.cutback = cutback
+        self.taper = taper
+        self.cutback_ratio = cutback_ratio
+        # end __init__()
+
+    def goals(self, race_week: int = 1) -> [(int, int)]:
+        """
+        goals() computes the goal of every week up to and including race week
+        in a single pass
+
+        :param race_week: week_number of the week the race falls in
+        :return: an [] of (week_number, goal)
+        """
+        taper = min(self.taper, race_week)
+        build = race_week - taper
+        level = float(self.base)
+        goals = []
+        for week_number in range(1, race_week + 1):
+            if week_number > build:
+                step = week_number - build
+                goal = level * (1 - 0.6 * step / taper)
+            # end if
+            elif self.cutback > 0 and week_number % self.cutback == 0:
+                goal = level * self.cutback_ratio
+            # end elif
+            else:
+                goal = level
+                level = min(float(self.peak), level * (1 + self.ramp))
+            # end else
+            goals.append((week_number, int(round(goal))))
+        # end for
+        return goals
+        # end goals()
+
+    @staticmethod
+    def day_targets(goal: int = 0) -> [int]:
+        """
+        day_targets() splits a weekly goal into per-day targets
+
+        :param goal: weekly goal
+        :return: an [] of 7 daily targets
+        """
+        return [int(round(goal * share)) for share in day_split]
+        # end day_targets()
+
+    # end Planner
+
+# end of file
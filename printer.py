@@ -1,15 +1,28 @@
+import json
 import logging
+import re
+import sys
 
 from datetime import datetime
 from functools import cached_property
 
+from aggregate import TrainingBlock
 from client.day import DayClient
+from client.journal import JournalClient
 from client.race import RaceClient
 from client.training_block import TrainingBlockClient
 from client.week import WeekClient
+from heatmap import Heatmap
+from planner import Planner
+from registry import Registry, registry
+from registry import race_edit_registry, race_registry, training_block_edit_registry, training_block_registry
+from report import YearReport
+from store import RunStore
+from table import Table
 
 date_format = "%Y-%m-%d"
 logger = logging.getLogger(name=__name__)
+uuid_pattern = re.compile(r"([0-9a-f]{8})-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
 
 
 class Printer:
@@ -17,10 +30,13 @@ class Printer:
     Printer is a class to house the various print methods
     """
 
-    def __init__(self, con, cur, **kwargs):
+    def __init__(self, con, cur, output: str = "table", athlete_id: str = None, **kwargs):
         super().__init__(**kwargs)
         self.con = con
         self.cur = cur
+        self.output = output
+        self.athlete_id = athlete_id
+        self.today_cache = {}
         # end __init__()
 
     @cached_property
@@ -30,7 +46,7 @@ class Printer:
 
         :return: a TrainingBlockClient
         """
-        return TrainingBlockClient(con=self.con, cur=self.cur)
+        return TrainingBlockClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
         # end tb()
 
     @cached_property
@@ -40,7 +56,7 @@ class Printer:
 
         :return: a WeekClient
         """
-        return WeekClient(con=self.con, cur=self.cur)
+        return WeekClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
         # end week()
 
     @cached_property
@@ -50,7 +66,7 @@ class Printer:
 
         :return: a DayClient
         """
-        return DayClient(con=self.con, cur=self.cur)
+        return DayClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
         # end day()
 
     @cached_property
@@ -60,24 +76,59 @@ class Printer:
 
         :return: a RaceClient
         """
-        return RaceClient(con=self.con, cur=self.cur)
+        return RaceClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
         # end race()
 
+    @cached_property
+    def journal(self) -> JournalClient:
+        """
+        journal() caches a JournalClient for use the duration of the process
+
+        :return: a JournalClient
+        """
+        return JournalClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
+        # end journal()
+
+    @cached_property
+    def runs(self) -> RunStore:
+        """
+        runs() caches a RunStore for use the duration of the process
+
+        :return: a RunStore
+        """
+        return RunStore(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
+        # end runs()
+
     @staticmethod
-    def print_main_menu():
+    def print_commands(commands: Registry = None, width: int = 11):
         """
-        print_main_menu() prints the main menu options
+        print_commands() prints the commands of a menu's registry, each with its
+        alias, description and usage
 
+        :param commands: Registry of the menu
+        :param width: width of the (alias) name column
         :return: none
         """
         print("----------------------")
         print("         cmds:")
         print("----------------------")
-        print("(tb) training-blocks: opens the training block menu")
-        print("(r)             race: opens the race menu")
-        print("(h)             help: re-print the commands")
-        print("(x)             exit: exit the process")
+        for command in commands.commands.values():
+            alias = f"({command.aliases[0]})" if len(command.aliases) > 0 else ""
+            usage = f" ex. {command.usage}" if command.usage is not None else ""
+            print(f"{alias}{command.name:>{width - len(alias)}}: {command.description}{usage}")
+        # end for
         print()
+        # end print_commands()
+
+    @staticmethod
+    def print_main_menu():
+        """
+        print_main_menu() prints the main menu options, the commands of the
+        registry (plugins included)
+
+        :return: none
+        """
+        Printer.print_commands(commands=registry, width=20)
         # end print_main_menu()
 
     @staticmethod
@@ -87,17 +138,7 @@ class Printer:
 
         :return: none
         """
-        print("----------------------")
-        print("         cmds:")
-        print("----------------------")
-        print("(ls)   list: list all the training blocks")
-        print("(e)    edit: edit a training block")
-        print("(a)     add: add a new training block")
-        print("(rm) remove: remove an existing training block")
-        print("(h)    help: print the menu")
-        print("(m)    menu: returns to the main menu")
-        print("(x)    exit: exits the process")
-        print()
+        Printer.print_commands(commands=training_block_registry)
         # end print_training_block_menu()
 
     @staticmethod
@@ -107,19 +148,7 @@ class Printer:
 
         :return: none
         """
-        print("----------------------")
-        print("         cmds:")
-        print("----------------------")
-        print("(p)   print: print the block")
-        print("(d)    date: print the date ex. d <week> <day>")
-        print("(u)  update: add data ex. u <week> <day> <miles>")
-        print("(a)     add: add week(s) or a new race")
-        print("(rm) remove: remove week(s) or an existing race")
-        print("(r)    race: print the races within this training block")
-        print("(h)    help: print the menu")
-        print("(m)    menu: returns to the main menu")
-        print("(x)    exit: exits the process")
-        print()
+        Printer.print_commands(commands=training_block_edit_registry)
         # end print_training_block_edit_menu()
 
     @staticmethod
@@ -129,17 +158,7 @@ class Printer:
 
         :return: none
         """
-        print("----------------------")
-        print("         cmds:")
-        print("----------------------")
-        print("(ls)   list: list all the races")
-        print("(e)    edit: edit a race")
-        print("(a)     add: add a new race")
-        print("(rm) remove: remove an existing race")
-        print("(h)    help: print the menu")
-        print("(m)    menu: returns to the main menu")
-        print("(x)    exit: exits the process")
-        print()
+        Printer.print_commands(commands=race_registry)
         # end print_race_menu()
 
     @staticmethod
@@ -149,33 +168,48 @@ class Printer:
 
         :return: none
         """
-        print("----------------------")
-        print("         cmds:")
-        print("----------------------")
-        print("(p)   print: re-print the race details")
-        print("(e)    edit: edit the race ex. d <date, name, miles, url>")
-        print("(d)  delete: delete the race")
-        print("(h)    help: print the menu")
-        print("(m)    menu: returns to the race menu")
-        print("(x)    exit: exits the process")
-        print()
+        Printer.print_commands(commands=race_edit_registry)
         # end print_race_edit_menu()
 
     @staticmethod
-    def format_week_day_miles(miles: int = None) -> str:
+    def format_miles(miles: float = None) -> str:
         """
-        format_week_day_miles() provides formatting that supports mileage up to 99 miles
-        for the pretty_print_training_block() function
+        format_miles() formats a cell of mileage for the grid views, 0 miles
+        are shown as a '.'
 
         :param miles: # of miles
         :return: formatted str
         """
-        if miles is not None:
-            return f"{'.  ' if miles == 0 else f'{miles} ' if miles > 9 else f'{miles}  '}   "
-        else:
-            logger.warning("please provide an int!")
-            return ""
-        # end format_week_day_miles()
+        if miles is None or miles == 0:
+            return "."
+        # end if
+        return Table.format_cell(value=miles)
+        # end format_miles()
+
+    def table(self, columns: [str] = None, align: str = None, formats: {int: callable} = None,
+              empty: str = None) -> Table:
+        """
+        table() creates a Table in the output format of the Printer
+
+        :param columns: column headers
+        :param align: one alignment char per column
+        :param formats: table output formatters by column index
+        :param empty: message printed in place of an empty table
+        :return: a Table
+        """
+        return Table(columns=columns, align=align, formats=formats, output=self.output, empty=empty)
+        # end table()
+
+    @staticmethod
+    def format_url(url: str = None) -> str:
+        """
+        format_url() formats a race URL for the table views
+
+        :param url: url
+        :return: formatted str
+        """
+        return url if url else "none"
+        # end format_url()
 
     def print_race(self, name: str = None, race: [] = None):
         """
@@ -193,138 +227,423 @@ class Printer:
             return
         # end if
 
-        print("--------------------------------------------")
-        date = race[3]
-        name = race[2]
-        miles = race[4]
-        url = race[5] if len(race[5]) > 0 else "none"
-        print(f" {date} |  {name},  {miles},  {url}")
-        print("--------------------------------------------")
-        print()
+        day = self.day.get_day_by_id(day_id=race[1])
+        table = self.table(columns=["date", "name", "miles", "url"], align="<<><", formats={3: self.format_url})
+        table.add_row([day[1] if day is not None else None, race[3], race[2], race[4]])
+        table.write()
         # end print_race()
 
-    def print_races(self, training_block_id: str = None):
+    def print_races(self, training_block_id: str = None, races: [] = None):
         """
-        print_races() prints a list of the available races
+        print_races() prints a list of races: the given page of races, or every
+        race (of the training block if one is given)
 
+        :param training_block_id: optional training_block_id
+        :param races: optional page of races from RaceClient.get_races_page()
         :return: none
         """
-        if training_block_id is None:
-            races = self.race.get_races()
+        if races is None:
+            races = self.race.stream_races(training_block_id=training_block_id)
         # end if
-        else:
-            races = self.race.get_races_by_training_block_id(training_block_id=training_block_id)
-        # end else
 
-        if races is None or len(races) == 0:
-            print("no races found!")
-            print()
-            return
-
-        print("--------------------------------------------")
-        print("    date    |  name,  miles,  url")
-        print("--------------------------------------------")
+        table = self.table(
+            columns=["date", "name", "miles", "url"],
+            align="<<><",
+            formats={3: self.format_url},
+            empty="no races found!"
+        )
         for race in races:
-            day_id = race[1]
-            miles = race[2]
-            name = race[3]
-            url = race[5] if len(race[5]) > 0 else "none"
-            day = self.day.get_day_by_id(day_id=day_id)
-            date = day[1]
-            print(f" {date} |  {name},  {miles},  {url}")
-        print("--------------------------------------------")
-        print()
+            table.add_row([race[1], race[2], race[3], race[4]])
+        # end for
+        table.write()
         # end print_races()
 
-    def print_training_blocks(self):
+    def print_days(self, start_date: datetime = None, end_date: datetime = None):
         """
-        print_training_blocks() prints a list of the available training blocks
+        print_days() prints every day between start_date and end_date across all
+        the training blocks, with their block/week context
 
+        :param start_date: first date of the range
+        :param end_date: last date of the range
         :return: none
         """
-        print("----------------------")
-        print("   training blocks:")
-        print("----------------------")
-        names = self.tb.get_all_training_block_names()
-        for name in names:
-            print(name)
-        print()
-        # end print_training_blocks()
+        days = self.day.stream_days_by_date_range(start_date=start_date, end_date=end_date)
+        table = self.table(
+            columns=["date", "miles", "week", "day", "training_block"],
+            align="<>>><",
+            formats={4: lambda name: name if name is not None else "none"},
+            empty="no days found!"
+        )
+        for day in days:
+            table.add_row([day[0], day[2], day[4], day[1], day[3]])
+        # end for
+        table.write()
+        # end print_days()
 
-    def pretty_print_training_block(self, name: str = None):
+    def print_year_report(self, year: int = None):
         """
-        pretty_print_training_block() prints a nicely formatted view of a training
-        block
+        print_year_report() prints the year in review: the summary, then the
+        monthly and weekly totals. The year's days are streamed through a
+        YearReport in one pass
 
-        :param name: name of the training block to print
+        :param year: year
         :return: none
         """
-        print("----------------------------------------------------------------")
-        print("| week |  1  |  2  |  3  |  4  |  5  |  6  |  7  | total(goal) |")
-        print("----------------------------------------------------------------")
+        report = YearReport(year=year)
+        for row in self.day.stream_days_by_year(year=year):
+            report.add(row=row)
+        # end for
+        report.finish()
+        if report.last_day_id is None:
+            print(f"no days found in {year}!")
+            print()
+            return
+        # end if
+
+        longest_week = report.longest_week()
+        hit, goals = report.goals_hit()
+        table = self.table(columns=["stat", "value"], align="<>")
+        table.add_row(["miles", report.miles])
+        table.add_row(["days run", report.days])
+        table.add_row(["longest week", f"{longest_week[0]} ({Table.format_cell(value=longest_week[1])})"
+                       if longest_week is not None else None])
+        table.add_row(["biggest day", f"{report.biggest_day[0]} ({Table.format_cell(value=report.biggest_day[1])})"
+                       if report.biggest_day is not None else None])
+        table.add_row(["goals hit", f"{hit}/{goals} ({hit / goals:.0%})" if goals > 0 else None])
+        table.add_row(["races", report.races])
+        table.add_row(["race miles", report.race_miles])
+        table.write()
+
+        table = self.table(columns=["month", "miles"], align="<>", formats={1: self.format_miles})
+        for x, miles in enumerate(report.months):
+            table.add_row([f"{year:04d}-{x + 1:02d}", miles])
+        # end for
+        table.write()
+
+        table = self.table(columns=["week", "miles"], align="<>")
+        for week, miles in report.weeks.items():
+            table.add_row([week, miles])
+        # end for
+        table.write()
+        # end print_year_report()
+
+    @staticmethod
+    def format_duration(seconds: float = None) -> str:
+        """
+        format_duration() formats a # of seconds as h:mm:ss (m:ss under an hour)
+
+        :param seconds: # of seconds
+        :return: formatted str
+        """
+        if seconds is None:
+            return "none"
+        # end if
+        minutes, seconds = divmod(round(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02d}:{seconds:02d}" if hours > 0 else f"{minutes}:{seconds:02d}"
+        # end format_duration()
 
-        training_block_id = self.tb.get_training_block_by_name(name)[0]
-        weeks = self.week.get_weeks_by_training_block_id(training_block_id=training_block_id)
+    def print_run_stats(self, start_date: datetime = None, end_date: datetime = None):
+        """
+        print_run_stats() prints the runs between start_date and end_date by type,
+        from the RunStore
 
-        for week in weeks:
-            week_id = week[0]
-            week_number = week[3]
-            goal = week[1]
+        :param start_date: first date, None for the first run
+        :param end_date: last date, None for the last run
+        :return: none
+        """
+        self.runs.refresh()
+        totals = self.runs.totals(
+            start_date=start_date.date() if start_date is not None else None,
+            end_date=end_date.date() if end_date is not None else None
+        )
+        table = self.table(
+            columns=["type", "runs", "miles", "time", "pace"],
+            align="<>>>>",
+            formats={3: self.format_duration, 4: self.format_duration},
+            empty="no runs found!"
+        )
+        for total in totals:
+            table.add_row([total[0], total[1], round(total[2], 2), total[3] if total[3] > 0 else None, total[4]])
+        # end for
+        table.write()
+        # end print_run_stats()
+
+    def print_calendar(self, year: int = None):
+        """
+        print_calendar() prints the year as a heatmap of the daily miles across
+        the training blocks, race days marked. The json and tsv outputs list the
+        days instead
 
-            week_day_miles = [0, 0, 0, 0, 0, 0, 0]
-            days = self.day.get_days_by_week_id(week_id=week_id)
+        :param year: year
+        :return: none
+        """
+        days = self.day.get_calendar_by_year(year=year)
+        if self.output != "table":
+            table = self.table(columns=["date", "miles", "races"])
             for day in days:
-                day_number = int(day[2])
-                miles = int(day[3])
-                week_day_miles[day_number - 1] = miles
+                table.add_row([day[0], day[1], day[2]])
             # end for
+            table.write()
+            return
+        # end if
+        if len(days) == 0:
+            print(f"no days found in {year}!")
+            print()
+            return
+        # end if
 
-            tot = sum(week_day_miles)
-
-            print("  "
-                  f"{week_number if week_number > 9 else f' {week_number}'}   |  "
-                  f"{self.format_week_day_miles(miles=week_day_miles[0])}"
-                  f"{self.format_week_day_miles(miles=week_day_miles[1])}"
-                  f"{self.format_week_day_miles(miles=week_day_miles[2])}"
-                  f"{self.format_week_day_miles(miles=week_day_miles[3])}"
-                  f"{self.format_week_day_miles(miles=week_day_miles[4])}"
-                  f"{self.format_week_day_miles(miles=week_day_miles[5])}"
-                  f"{self.format_week_day_miles(miles=week_day_miles[6])}"
-                  f"{f'  {tot} ({goal})' if tot < 10 else f'{tot} ({goal})' if tot > 99 else f' {tot} ({goal})'}")
+        heatmap = Heatmap(year=year)
+        for day in days:
+            heatmap.add(day_date=day[0], miles=day[1], races=day[2])
         # end for
-        print("|--------------------------------------------------------------|")
-        print()
+        sys.stdout.write(heatmap.render())
+        sys.stdout.flush()
+        # end print_calendar()
+
+    def print_weekly_totals(self, totals: [] = None):
+        """
+        print_weekly_totals() prints the squad-wide weekly totals, one row per
+        week and athlete
+
+        :param totals: an [] of (week, athlete name, miles) from ShardManager.get_weekly_totals()
+        :return: none
+        """
+        table = self.table(columns=["week", "athlete", "miles"], align="<<>", empty="no miles found!")
+        for total in totals:
+            table.add_row([total[0], total[1], total[2]])
+        # end for
+        table.write()
+        # end print_weekly_totals()
+
+    @staticmethod
+    def format_id(value: str = None) -> str:
+        """
+        format_id() shortens the uuids in a str to their first 8 chars for the
+        table views
+
+        :param value: str
+        :return: formatted str
+        """
+        return uuid_pattern.sub(r"\1", value)
+        # end format_id()
+
+    @staticmethod
+    def format_change(values: str = None, key: str = None, width: int = 40) -> str:
+        """
+        format_change() formats the old or new values of a journaled change for
+        the table view: column=value pairs without the row's key and athlete_id,
+        short ids, cut to width so an inserted or deleted row fits a terminal
+
+        :param values: JSON of the values
+        :param key: key of the changed row
+        :param width: max # of chars
+        :return: formatted str
+        """
+        if values is None:
+            return ""
+        # end if
+        text = Printer.format_id(value=", ".join(
+            f"{column}={Table.format_cell(value=value) if value is not None else 'null'}"
+            for column, value in json.loads(values).items() if column != "athlete_id" and value != key
+        ))
+        return text if len(text) <= width else text[:width - 3] + "..."
+        # end format_change()
+
+    def print_changes(self, seq: int = 0):
+        """
+        print_changes() prints the journaled changes after a seq, the table
+        output shortens the ids and the old and new values, json and tsv have
+        them whole
+
+        :param seq: last seq already seen
+        :return: none
+        """
+        changes = self.journal.stream_changes_since(seq=seq)
+        table = self.table(
+            columns=["seq", "ts", "entity", "key", "old", "new"],
+            align="><<<<<",
+            empty="no changes found!"
+        )
+        for change in changes:
+            key, old, new = change[2], change[3], change[4]
+            if self.output == "table":
+                old = self.format_change(values=old, key=key)
+                new = self.format_change(values=new, key=key)
+                key = self.format_id(value=key)
+            # end if
+            table.add_row([change[0], change[5], change[1], key, old, new])
+        # end for
+        table.write()
+        # end print_changes()
+
+    def print_fsck(self, found: [] = None, fixed: {str: int} = None):
+        """
+        print_fsck() prints the results of the integrity checks
+
+        :param found: an [] of (check, description, # of rows found) from Fsck.check()
+        :param fixed: optional {} of check: # of rows fixed from Fsck.fix()
+        :return: none
+        """
+        columns = ["check", "found", "description"] if fixed is None else ["check", "found", "fixed", "description"]
+        table = self.table(columns=columns, align="<><" if fixed is None else "<>><")
+        for check, description, count in found:
+            if fixed is None:
+                table.add_row([check, count, description])
+            # end if
+            else:
+                table.add_row([check, count, fixed.get(check, 0), description])
+            # end else
+        # end for
+        table.write()
+        # end print_fsck()
+
+    def print_metrics(self, metrics: [] = None):
+        """
+        print_metrics() prints the calls and time spent per command
+
+        :param metrics: an [] of (command, # of calls, # of errors, seconds, max seconds) from Registry.metrics()
+        :return: none
+        """
+        table = self.table(
+            columns=["command", "calls", "errors", "total ms", "avg ms", "max ms"],
+            align="<>>>>>",
+            empty="no commands run yet!"
+        )
+        for command, calls, errors, seconds, longest in metrics:
+            table.add_row([command, calls, errors, round(seconds * 1000, 1), round(seconds * 1000 / calls, 1),
+                           round(longest * 1000, 1)])
+        # end for
+        table.write()
+        # end print_metrics()
+
+    def print_training_blocks(self, training_blocks: [] = None):
+        """
+        print_training_blocks() prints a list of training blocks: the given page
+        of training blocks, or every training block
+
+        :param training_blocks: optional page from TrainingBlockClient.get_training_blocks_page()
+        :return: none
+        """
+        if training_blocks is None:
+            training_blocks = self.tb.stream_training_blocks()
+        # end if
+
+        table = self.table(columns=["name", "start_date"], align="<<", empty="no training blocks found!")
+        for training_block in training_blocks:
+            table.add_row([training_block[1], training_block[2]])
+        # end for
+        table.write()
+        # end print_training_blocks()
+
+    def pretty_print_training_block(self, name: str = None, block: TrainingBlock = None):
+        """
+        pretty_print_training_block() prints a nicely formatted view of a training
+        block, race days marked with an 'R' and the week's races listed after
+        the goal
+
+        :param name: name of the training block to print
+        :param block: optional loaded TrainingBlock, printed without querying
+        :return: none
+        """
+        if block is None:
+            block = TrainingBlock(
+                con=self.con,
+                cur=self.cur,
+                athlete_id=self.athlete_id,
+                training_block_id=self.tb.get_training_block_by_name(name)[0]
+            )
+            block.load()
+        # end if
+
+        table = self.table(
+            columns=["week", "1", "2", "3", "4", "5", "6", "7", "total", "goal", "races"],
+            align=">>>>>>>>>><",
+            formats={x: self.format_miles for x in range(1, 8)}
+        )
+        for week_number, week_day_miles, goal, races in block.get_weeks():
+            cells = list(week_day_miles)
+            labels = []
+            for day_number, race_name, race_miles in races:
+                if self.output == "table":
+                    cells[day_number - 1] = f"{self.format_miles(week_day_miles[day_number - 1])} R"
+                # end if
+                labels.append(f"{day_number}: {race_name} ({race_miles:g})")
+            # end for
+            table.add_row([week_number] + cells + [sum(week_day_miles), goal, ", ".join(labels)])
+        # end for
+        table.write()
         # end pretty_print_training_block()
 
+    def print_plan(self, goals: [(int, int)] = None, day_targets: bool = False):
+        """
+        print_plan() previews the weekly goals computed by a Planner
+
+        :param goals: an [] of (week_number, goal)
+        :param day_targets: also print the per-day targets of each week
+        :return: none
+        """
+        columns = ["week", "1", "2", "3", "4", "5", "6", "7", "goal"] if day_targets else ["week", "goal"]
+        table = self.table(columns=columns, formats={x: self.format_miles for x in range(1, 8)})
+        for week_number, goal in goals:
+            targets = Planner.day_targets(goal=goal) if day_targets else []
+            table.add_row([week_number] + targets + [goal])
+        # end for
+        table.write()
+        # end print_plan()
+
     def print_date(
             self,
             training_block_id: str = None,
             week_number: int = 1,
-            day_number: int = 1
+            day_number: int = 1,
+            block: TrainingBlock = None
     ):
         """
         print_date() finds the date in the provided training block given a week
-        and day #
+        and day #, and whether it's race day
 
         :param training_block_id: training_block_id
         :param week_number: week # of the desired date
         :param day_number: day # of the desired date
+        :param block: optional loaded TrainingBlock, the date is read from it
         :return: none
         """
         if training_block_id is not None:
-            week = self.week.get_week_by_training_block_id_and_week_number(
-                training_block_id=training_block_id,
-                week_number=week_number
-            )
-            week_id = week[0]
-            day = self.day.get_day_by_week_id_and_day_number(
-                week_id=week_id,
-                day_number=day_number
-            )
-            date = day[1]
+            if block is None:
+                block = TrainingBlock(
+                    con=self.con,
+                    cur=self.cur,
+                    athlete_id=self.athlete_id,
+                    training_block_id=training_block_id
+                )
+                block.load()
+            # end if
+            date = None
+            if block.has_week(week_number=week_number):
+                date = block.get_date(week_number=week_number, day_number=day_number)
+            # end if
+            if date is None:
+                print(f"week {week_number}, day {day_number} not found!")
+                print()
+                return
+            # end if
             week_day = datetime.strptime(date, date_format).strftime('%A').lower()
-            print(f"week {week_number}, day {day_number}: {week_day} {date}")
-            print()
+            race = block.get_race(week_number=week_number, day_number=day_number)
+            if self.output == "table":
+                print(f"week {week_number}, day {day_number}: {week_day} {date}")
+                if race is not None:
+                    print(f"race day! {race[0]}, {race[1]:g} miles")
+                # end if
+                print()
+            # end if
+            else:
+                table = self.table(columns=["week", "day", "weekday", "date", "race", "race_miles"])
+                table.add_row(
+                    [week_number, day_number, week_day, date] + (list(race) if race is not None else [None, None])
+                )
+                table.write()
+            # end else
         # end if
         else:
             print("please provide a valid training block!")
@@ -334,37 +653,73 @@ class Printer:
 
     def print_today(self, training_block_id: str = None):
         """
-        print_today() finds today's date in the training block and prints the
-        week #, day #, weekday and %Y-%m-%d formatted date
+        print_today() finds today's date (in the given training block, or in any
+        block if none is given) and prints the training block, week #, day #,
+        weekday, %Y-%m-%d formatted date, weekly goal, whether it's race day and
+        the next race. The lookup is cached for the rest of the day, or until
+        something is written
 
+        :param training_block_id: optional training_block_id
         :return: none
         """
         today = datetime.now()
-        day = self.day.get_day_by_training_block_id_and_date(
-            date=today,
-            training_block_id=training_block_id,
-        )
-        if day is not None:
-            day_number = day[2]
-            date = day[1]
-            week_day = datetime.strptime(date, date_format).strftime('%A').lower()
-            week_id = day[5]
+        key = (today.strftime(date_format), training_block_id)
+        cached = self.today_cache.get(key)
+        if cached is None or cached[0] != self.con.total_changes:
+            days = self.day.get_day_context_by_date(
+                date=today,
+                training_block_id=training_block_id
+            )
+            self.today_cache = {key: (self.con.total_changes, days)}
         # end if
         else:
-            print(f"{today.strftime(date_format)} is not in the training block!")
-            print()
-            return
+            days = cached[1]
         # end else
 
-        week = self.week.get_week_by_id(week_id=week_id)
-        if week is not None:
-            week_number = week[2]
-        else:
-            print("week_id was not found!")
+        if self.output != "table":
+            table = self.table(columns=[
+                "date", "day", "week", "goal", "training_block", "race", "race_miles", "race_date",
+                "todays_race", "todays_race_miles"
+            ])
+            for day in days:
+                table.add_row(day)
+            # end for
+            table.write()
+            return
+        # end if
+
+        if len(days) == 0:
+            print(f"{today.strftime(date_format)} is not in "
+                  f"{'the training block' if training_block_id is not None else 'any training block'}!")
             print()
             return
+        # end if
 
-        print(f"week {week_number}, day {day_number}: {week_day} {date}")
+        for day in days:
+            date = day[0]
+            day_number = day[1]
+            week_number = day[2]
+            goal = day[3]
+            name = day[4]
+            week_day = today.strftime('%A').lower()
+            print(f"{name}: week {week_number}, day {day_number}: {week_day} {date} (goal: {goal})")
+
+            todays_race = day[8]
+            if todays_race is not None:
+                print(f"race day! {todays_race}, {day[9]:g} miles")
+            # end if
+
+            race_name = day[5]
+            if race_name is not None:
+                race_miles = day[6]
+                race_date = day[7]
+                days_out = (datetime.strptime(race_date, date_format) - datetime.strptime(date, date_format)).days
+                if days_out > 0 or race_name != todays_race:
+                    print(f"next race: {race_name}, {race_miles} miles, {race_date} "
+                          f"({'race day!' if days_out == 0 else f'in {days_out} days'})")
+                # end if
+            # end if
+        # end for
         print()
         # end print_today()
 
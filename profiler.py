@@ -0,0 +1,108 @@
+import cProfile
+import io
+import logging
+import pstats
+import time
+
+logger = logging.getLogger(name=__name__)
+
+
+class Profiler:
+    """
+    Profiler wraps cProfile so the interactive commands can be profiled for the
+    duration of the session. Stats are measured in CPU time (time.process_time),
+    so the time spent waiting on input() is (almost) free and does not drown
+    out the commands themselves
+    """
+
+    def __init__(self, enabled: bool = False, output: str = None, limit: int = 25, **kwargs):
+        super().__init__(**kwargs)
+        self.enabled = enabled
+        self.output = output
+        self.limit = limit
+        self.commands = 0
+        self.profile = cProfile.Profile(time.process_time)
+        self.running = False
+        # end __init__()
+
+    def __enter__(self):
+        if self.enabled and not self.running:
+            self.profile.enable()
+            self.running = True
+            self.commands += 1
+        # end if
+        return self
+        # end __enter__()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.running:
+            self.profile.disable()
+            self.running = False
+        # end if
+        return False
+        # end __exit__()
+
+    def on(self):
+        """
+        on() turns profiling on for the commands dispatched from now on
+
+        :return: none
+        """
+        self.enabled = True
+        # end on()
+
+    def off(self):
+        """
+        off() turns profiling off, the stats gathered so far are kept
+
+        :return: none
+        """
+        self.enabled = False
+        # end off()
+
+    def has_stats(self) -> bool:
+        """
+        has_stats() checks if any command has been profiled yet
+
+        :return: bool
+        """
+        return self.commands > 0
+        # end has_stats()
+
+    def report(self, sort: str = "cumulative") -> str:
+        """
+        report() ranks the accumulated stats
+
+        :param sort: pstats sort key, defaults to cumulative time
+        :return: the formatted report
+        """
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(self.limit)
+        return stream.getvalue()
+        # end report()
+
+    def dump(self):
+        """
+        dump() writes the accumulated stats to the pstats output file if one was
+        provided, otherwise it prints a ranked report
+
+        :return: none
+        """
+        if not self.has_stats():
+            return
+        # end if
+
+        if self.output is not None:
+            self.profile.dump_stats(self.output)
+            print(f"profile written to {self.output} ({self.commands} commands)")
+        # end if
+        else:
+            print(f"profile ({self.commands} commands):")
+            print(self.report())
+        # end else
+        # end dump()
+
+    # end Profiler
+
+# end of file
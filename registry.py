@@ -0,0 +1,497 @@
+import importlib
+import logging
+import re
+import time
+
+from datetime import datetime
+
+date_format = "%Y-%m-%d"
+logger = logging.getLogger(name=__name__)
+
+
+def parse_date(value: str = None) -> datetime:
+    """
+    parse_date() converts a %Y-%m-%d str to a datetime
+
+    :param value: date str
+    :return: datetime, raises ValueError if it isn't a date
+    """
+    return datetime.strptime(value, date_format)
+    # end parse_date()
+
+
+def parse_year(value: str = None) -> int:
+    """
+    parse_year() converts a str to a year (1-9999)
+
+    :param value: year str
+    :return: year, raises ValueError if it isn't a year
+    """
+    if not (value.isdigit() and 0 < int(value) < 10000):
+        raise ValueError(f"invalid year: {value}")
+    # end if
+    return int(value)
+    # end parse_year()
+
+
+def parse_count(value: str = None) -> int:
+    """
+    parse_count() converts a str to a whole # (0+)
+
+    :param value: # str
+    :return: #, raises ValueError if it isn't a whole #
+    """
+    if not value.isdigit():
+        raise ValueError(f"invalid #: {value}")
+    # end if
+    return int(value)
+    # end parse_count()
+
+
+def parse_int(value: str = None) -> int:
+    """
+    parse_int() converts a str to a whole #, negative or not (ex. -3, +2)
+
+    :param value: # str
+    :return: #, raises ValueError if it isn't a whole #
+    """
+    if re.fullmatch(r"[+-]?[0-9]+", value) is None:
+        raise ValueError(f"invalid #: {value}")
+    # end if
+    return int(value)
+    # end parse_int()
+
+
+def parse_miles(value: str = None) -> float:
+    """
+    parse_miles() converts a str to a positive # of miles
+
+    :param value: miles str
+    :return: # of miles, raises ValueError if it isn't a positive #
+    """
+    miles = float(value)
+    if not miles > 0:
+        raise ValueError(f"invalid # of miles: {value}")
+    # end if
+    return miles
+    # end parse_miles()
+
+
+def parse_duration(value: str = None) -> int:
+    """
+    parse_duration() converts a h:mm:ss or mm:ss str to seconds
+
+    :param value: duration str
+    :return: # of seconds, raises ValueError if it isn't a duration
+    """
+    parts = value.split(':')
+    if not 2 <= len(parts) <= 3 or not all(part.isdigit() for part in parts):
+        raise ValueError(f"invalid time: {value}")
+    # end if
+    seconds = 0
+    for part in parts:
+        seconds = seconds * 60 + int(part)
+    # end for
+    if seconds == 0:
+        raise ValueError(f"invalid time: {value}")
+    # end if
+    return seconds
+    # end parse_duration()
+
+
+def parse_name(value: str = None) -> str:
+    """
+    parse_name() checks a one word name (ex. a run type)
+
+    :param value: name str
+    :return: name, raises ValueError if it isn't a name
+    """
+    if re.fullmatch(r"[a-z][a-z0-9_-]*", value) is None:
+        raise ValueError(f"invalid name: {value}")
+    # end if
+    return value
+    # end parse_name()
+
+
+# argument kinds: the parser of each, "rest" takes the rest of the line as typed
+kinds = {
+    "date": parse_date,
+    "year": parse_year,
+    "count": parse_count,
+    "int": parse_int,
+    "miles": parse_miles,
+    "duration": parse_duration,
+    "name": parse_name,
+    "choice": None,
+    "rest": None,
+}
+
+
+class Arg:
+    """
+    Arg declares one argument of a command. The arguments are positional, an
+    optional argument that doesn't parse is skipped so the next one can take
+    the word (ex. run <date> <miles> easy has no time)
+    """
+
+    def __init__(self, name: str = None, kind: str = None, required: bool = False, choices: (str,) = None,
+                 **kwargs):
+        super().__init__(**kwargs)
+        self.name = name
+        self.kind = kind
+        self.required = required
+        self.choices = choices
+        # end __init__()
+
+    def parse(self, value: str = None):
+        """
+        parse() converts a word to the argument's value
+
+        :param value: word
+        :return: the value, raises ValueError if the word doesn't fit
+        """
+        if self.kind == "choice":
+            if value not in self.choices:
+                raise ValueError(f"invalid option: {value}")
+            # end if
+            return value
+        # end if
+        return kinds[self.kind](value)
+        # end parse()
+
+    # end Arg
+
+
+class Command:
+    """
+    Command declares a command: its name and aliases, its arguments, the help
+    line and the handler, a "module:function" imported on first use. The
+    handler is called with the App and the parsed arguments as keywords
+    """
+
+    def __init__(self, name: str = None, aliases: (str,) = (), args: (Arg,) = (), handler: str = None,
+                 description: str = None, usage: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self.name = name
+        self.aliases = aliases
+        self.args = args
+        self.handler = handler
+        self.description = description
+        self.usage = usage
+        self.function = None
+        # end __init__()
+
+    def resolve(self) -> callable:
+        """
+        resolve() imports the handler, once
+
+        :return: the handler function
+        """
+        if self.function is None:
+            module, function = self.handler.split(':')
+            self.function = getattr(importlib.import_module(module), function)
+        # end if
+        return self.function
+        # end resolve()
+
+    def parse(self, line: str = None) -> {str: object}:
+        """
+        parse() matches the words after the command against the arguments, the
+        words are lowercased except for a "rest" argument
+
+        :param line: the line typed
+        :return: a {} of argument name: value, raises ValueError if the line doesn't fit
+        """
+        words = line.lower().split()[1:]
+        values = {}
+        x = 0
+        for arg in self.args:
+            if x == len(words):
+                if arg.required:
+                    raise ValueError(f"missing {arg.name}")
+                # end if
+                continue
+            # end if
+            if arg.kind == "rest":
+                values[arg.name] = line.split(None, x + 1)[-1]
+                x = len(words)
+                continue
+            # end if
+            try:
+                values[arg.name] = arg.parse(value=words[x])
+                x += 1
+            # end try
+            except ValueError:
+                if arg.required:
+                    raise
+                # end if
+            # end except
+        # end for
+        if x < len(words):
+            raise ValueError(f"unexpected {words[x]}")
+        # end if
+        return values
+        # end parse()
+
+    # end Command
+
+
+class Registry:
+    """
+    Registry holds a menu's commands, the main menu's and one per sub-menu.
+    Dispatching a line is one dict lookup of its first word (names and
+    aliases), then the arguments are parsed against the command's schema and
+    the handler, imported on first use, is called. Every dispatch is timed into
+    per-command metrics
+
+    Plugins are modules with a register(registry) function that adds their own
+    Commands, loaded with --plugins
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.commands = {}
+        self.lookup = {}
+        self.stats = {}
+        # end __init__()
+
+    def register(self, command: Command = None):
+        """
+        register() adds a command, a command of the same name is replaced
+
+        :param command: Command
+        :return: none
+        """
+        if command.name in self.commands:
+            for alias in (command.name,) + self.commands[command.name].aliases:
+                self.lookup.pop(alias, None)
+            # end for
+        # end if
+        self.commands[command.name] = command
+        for alias in (command.name,) + command.aliases:
+            self.lookup[alias] = command
+        # end for
+        # end register()
+
+    def load_plugins(self, modules: [str] = None):
+        """
+        load_plugins() imports the plugin modules and lets them register their
+        commands
+
+        :param modules: an [] of module names
+        :return: none
+        """
+        for module in modules:
+            importlib.import_module(module).register(self)
+        # end for
+        # end load_plugins()
+
+    def dispatch(self, app=None, line: str = None) -> bool:
+        """
+        dispatch() runs the command typed on a line
+
+        :param app: App the handlers run against (the Menu for a sub-menu)
+        :param line: the line typed
+        :return: False if the line isn't a command
+        """
+        words = line.lower().split()
+        command = self.lookup.get(words[0] if len(words) > 0 else "")
+        if command is None:
+            return False
+        # end if
+        try:
+            args = command.parse(line=line)
+        # end try
+        except ValueError:
+            print(f"invalid syntax! ex. {command.usage or command.name}")
+            print()
+            return True
+        # end except
+
+        failed = False
+        start = time.perf_counter()
+        try:
+            command.resolve()(app, **args)
+        # end try
+        except Exception:
+            failed = True
+            raise
+        # end except
+        finally:
+            elapsed = time.perf_counter() - start
+            stats = self.stats.setdefault(command.name, [0, 0, 0.0, 0.0])  # calls, errors, seconds, max seconds
+            stats[0] += 1
+            stats[1] += 1 if failed else 0
+            stats[2] += elapsed
+            stats[3] = max(stats[3], elapsed)
+        # end finally
+        return True
+        # end dispatch()
+
+    def metrics(self) -> [(str, int, int, float, float)]:
+        """
+        metrics() retrieves the per-command metrics, most time spent first
+
+        :return: an [] of (command, # of calls, # of errors, seconds, max seconds)
+        """
+        return sorted(
+            ((name, stats[0], stats[1], stats[2], stats[3]) for name, stats in self.stats.items()),
+            key=lambda row: row[3],
+            reverse=True
+        )
+        # end metrics()
+
+    # end Registry
+
+
+registry = Registry()
+for builtin in (
+    Command(name="training-blocks", aliases=("tb",), handler="handlers.menus:training_blocks",
+            description="opens the training block menu"),
+    Command(name="race", aliases=("r",), handler="handlers.menus:races",
+            description="opens the race menu"),
+    Command(name="days", args=(Arg("start", "date"), Arg("end", "date")), handler="handlers.views:days",
+            description="list the days across all blocks", usage="days <start> <end>"),
+    Command(name="today", aliases=("t",), handler="handlers.views:today",
+            description="where today falls across the training blocks"),
+    Command(name="report", args=(Arg("year", "year"),), handler="handlers.views:report",
+            description="the year in review", usage="report <year>"),
+    Command(name="calendar", args=(Arg("year", "year"),), handler="handlers.views:calendar",
+            description="heatmap of the daily miles", usage="calendar <year>"),
+    Command(name="run", args=(Arg("date", "date", required=True), Arg("miles", "miles", required=True),
+                              Arg("duration", "duration"), Arg("run_type", "name")),
+            handler="handlers.runs:run", description="log a run", usage="run <date> <miles> <h:mm:ss> <type>"),
+    Command(name="stats", args=(Arg("start", "date"), Arg("end", "date")), handler="handlers.runs:stats",
+            description="the runs by type", usage="stats <start> <end>"),
+    Command(name="squad", args=(Arg("start", "date"), Arg("end", "date")), handler="handlers.admin:squad",
+            description="weekly miles of every athlete (--shards)", usage="squad <start> <end>"),
+    Command(name="changes", args=(Arg("seq", "count"),), handler="handlers.views:changes",
+            description="list the changes after a journal seq", usage="changes <seq>"),
+    Command(name="sync", args=(Arg("path", "rest", required=True),), handler="handlers.admin:sync",
+            description="merge with another copy of the database", usage="sync <path>"),
+    Command(name="backup", handler="handlers.admin:backup",
+            description="snapshot the database now"),
+    Command(name="fsck", args=(Arg("option", "choice", choices=("repair", "purge")),), handler="handlers.admin:fsck",
+            description="check the database for orphans and gaps", usage="fsck <repair, purge>"),
+    Command(name="metrics", handler="handlers.admin:metrics",
+            description="calls and time spent per command"),
+    Command(name="profile", aliases=("p",), args=(Arg("option", "choice", required=True,
+                                                      choices=("on", "off", "report")),),
+            handler="handlers.admin:profile", description="profile the commands", usage="p <on, off, report>"),
+    Command(name="help", aliases=("h",), handler="handlers.menus:main_menu",
+            description="re-print the commands"),
+    Command(name="exit", aliases=("x",), handler="handlers.menus:exit_app",
+            description="exit the process"),
+):
+    registry.register(command=builtin)
+# end for
+
+# the sub-menus, their handlers are called with the Menu
+days = ("1", "2", "3", "4", "5", "6", "7")
+
+training_block_registry = Registry()
+for builtin in (
+    Command(name="list", aliases=("ls",), handler="handlers.training_block:list_blocks",
+            description="list the training blocks, a page at a time"),
+    Command(name="next", aliases=("n",), handler="handlers.training_block:next_page",
+            description="list the next page"),
+    Command(name="prev", aliases=("p",), handler="handlers.training_block:prev_page",
+            description="list the previous page"),
+    Command(name="edit", aliases=("e",), handler="handlers.training_block:edit",
+            description="edit a training block"),
+    Command(name="add", aliases=("a",), handler="handlers.training_block:add",
+            description="add a new training block"),
+    Command(name="clone", aliases=("c",), handler="handlers.training_block:clone",
+            description="copy a training block as a template"),
+    Command(name="remove", aliases=("rm",), handler="handlers.training_block:remove",
+            description="remove an existing training block"),
+    Command(name="help", aliases=("h",), handler="handlers.training_block:help_menu",
+            description="print the menu"),
+    Command(name="menu", aliases=("m",), handler="handlers.training_block:main_menu",
+            description="returns to the main menu"),
+    Command(name="exit", aliases=("x",), handler="handlers.menus:exit_app",
+            description="exits the process"),
+):
+    training_block_registry.register(command=builtin)
+# end for
+
+training_block_edit_registry = Registry()
+for builtin in (
+    Command(name="print", aliases=("p",), handler="handlers.training_block:print_block",
+            description="print the block"),
+    Command(name="date", aliases=("d",), args=(Arg("week", "count"), Arg("day", "choice", choices=days)),
+            handler="handlers.training_block:date", description="print the date", usage="d <week> <day>"),
+    Command(name="update", aliases=("u",), args=(Arg("week", "count", required=True),
+                                                 Arg("day", "choice", required=True, choices=days + ("g",)),
+                                                 Arg("miles", "count", required=True)),
+            handler="handlers.training_block:update", description="add data", usage="u <week> <day> <miles>"),
+    Command(name="add", aliases=("a",), args=(Arg("option", "choice", required=True, choices=("week", "race")),),
+            handler="handlers.training_block:add_to_block", description="add week(s) or a new race",
+            usage="a <week, race>"),
+    Command(name="remove", aliases=("rm",), args=(Arg("option", "choice", required=True,
+                                                      choices=("week", "race")),),
+            handler="handlers.training_block:remove_from_block", description="remove week(s) or an existing race",
+            usage="rm <week, race>"),
+    Command(name="shift", aliases=("s",), args=(Arg("days", "int", required=True),),
+            handler="handlers.training_block:shift", description="move the block by a # of days",
+            usage="s <days>"),
+    Command(name="plan", aliases=("g",), handler="handlers.training_block:plan",
+            description="generate the weekly goals (build, cutback, taper)"),
+    Command(name="race", aliases=("r",), handler="handlers.training_block:races",
+            description="print the races within this training block"),
+    Command(name="help", aliases=("h",), handler="handlers.training_block:help_edit_menu",
+            description="print the menu"),
+    Command(name="menu", aliases=("m",), handler="handlers.training_block:close_block",
+            description="returns to the training block menu"),
+    Command(name="exit", aliases=("x",), handler="handlers.menus:exit_app",
+            description="exits the process"),
+):
+    training_block_edit_registry.register(command=builtin)
+# end for
+
+race_registry = Registry()
+for builtin in (
+    Command(name="list", aliases=("ls",), handler="handlers.race:list_races",
+            description="list the races, a page at a time"),
+    Command(name="next", aliases=("n",), handler="handlers.race:next_page",
+            description="list the next page"),
+    Command(name="prev", aliases=("p",), handler="handlers.race:prev_page",
+            description="list the previous page"),
+    Command(name="search", aliases=("s",), args=(Arg("terms", "rest", required=True),),
+            handler="handlers.race:search", description="search the race names and URLs", usage="s <terms>"),
+    Command(name="edit", aliases=("e",), handler="handlers.race:edit",
+            description="edit a race"),
+    Command(name="add", aliases=("a",), handler="handlers.race:add",
+            description="add a new race"),
+    Command(name="remove", aliases=("rm",), handler="handlers.race:remove",
+            description="remove an existing race"),
+    Command(name="help", aliases=("h",), handler="handlers.race:help_menu",
+            description="print the menu"),
+    Command(name="menu", aliases=("m",), handler="handlers.race:main_menu",
+            description="returns to the main menu"),
+    Command(name="exit", aliases=("x",), handler="handlers.menus:exit_app",
+            description="exits the process"),
+):
+    race_registry.register(command=builtin)
+# end for
+
+race_edit_registry = Registry()
+for builtin in (
+    Command(name="print", aliases=("p",), handler="handlers.race:print_race",
+            description="re-print the race details"),
+    Command(name="edit", aliases=("e",), args=(Arg("field", "choice", required=True,
+                                                   choices=("date", "name", "miles", "url")),),
+            handler="handlers.race:edit_field", description="edit the race", usage="e <date, name, miles, url>"),
+    Command(name="delete", aliases=("d",), handler="handlers.race:delete",
+            description="delete the race"),
+    Command(name="help", aliases=("h",), handler="handlers.race:help_edit_menu",
+            description="print the menu"),
+    Command(name="menu", aliases=("m",), handler="handlers.race:close_race",
+            description="returns to the race menu"),
+    Command(name="exit", aliases=("x",), handler="handlers.menus:exit_app",
+            description="exits the process"),
+):
+    race_edit_registry.register(command=builtin)
+# end for
+
+# end of file
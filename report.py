@@ -0,0 +1,113 @@
+import logging
+
+from datetime import datetime, timedelta
+
+date_format = "%Y-%m-%d"
+logger = logging.getLogger(name=__name__)
+
+
+class YearReport:
+    """
+    YearReport summarizes a year of days in one pass over the rows of
+    DayClient.stream_days_by_year(), nothing is held but the running totals:
+    - monthly and weekly (starting Monday) totals
+    - the longest week and the biggest day
+    - the goal hit rate: the training weeks with a goal that reached it
+    - the race count and distance
+
+    A date in overlapping blocks counts once, its biggest day, the same rule as
+    the calendar (DayClient.get_calendar_by_year()). The goals are still checked
+    against each block's own days. finish() adds the last date once the rows
+    run out
+    """
+
+    def __init__(self, year: int = None, **kwargs):
+        super().__init__(**kwargs)
+        self.year = year
+        self.miles = 0
+        self.days = 0
+        self.months = [0] * 12
+        self.weeks = {}
+        self.goals = {}
+        self.biggest_day = None
+        self.races = 0
+        self.race_miles = 0
+        self.last_day_id = None
+        self.last_date = None
+        self.date_miles = 0
+        # end __init__()
+
+    def add(self, row: () = None):
+        """
+        add() adds a row to the totals
+
+        :param row: (day_id, date, miles, week_id, goal, race name, race miles)
+        :return: none
+        """
+        day_id, date, miles, week_id, goal, race_name, race_miles = row
+        if race_name is not None:
+            self.races += 1
+            self.race_miles += race_miles or 0
+        # end if
+        if day_id == self.last_day_id:
+            return  # the same day again, for its next race
+        # end if
+        self.last_day_id = day_id
+
+        miles = miles or 0
+        if date != self.last_date:
+            self.finish()
+            self.last_date = date
+        # end if
+        self.date_miles = max(self.date_miles, miles)
+        if goal:
+            total = self.goals.get(week_id, (goal, 0))[1]
+            self.goals[week_id] = (goal, total + miles)
+        # end if
+        # end add()
+
+    def finish(self):
+        """
+        finish() adds the miles of the date being read to the totals
+
+        :return: none
+        """
+        date, miles = self.last_date, self.date_miles
+        self.date_miles = 0
+        if miles > 0:
+            self.miles += miles
+            self.days += 1
+            self.months[int(date[5:7]) - 1] += miles
+            day = datetime.strptime(date, date_format)
+            week = (day - timedelta(days=day.weekday())).strftime(date_format)
+            self.weeks[week] = self.weeks.get(week, 0) + miles
+            if self.biggest_day is None or miles > self.biggest_day[1]:
+                self.biggest_day = (date, miles)
+            # end if
+        # end if
+        # end finish()
+
+    def longest_week(self) -> (str, int):
+        """
+        longest_week() retrieves the week with the most miles
+
+        :return: (week, miles), None if no miles were run
+        """
+        if len(self.weeks) == 0:
+            return None
+        # end if
+        return max(self.weeks.items(), key=lambda week: week[1])
+        # end longest_week()
+
+    def goals_hit(self) -> (int, int):
+        """
+        goals_hit() retrieves how many of the training weeks with a goal reached it
+
+        :return: (# of weeks that hit their goal, # of weeks with a goal)
+        """
+        return sum(1 for goal, total in self.goals.values() if total >= goal), len(self.goals)
+        # end goals_hit()
+
+    # end YearReport
+
+# end of file
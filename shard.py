@@ -0,0 +1,160 @@
+import heapq
+import logging
+import os
+import re
+import sqlite3 as sl
+
+from urllib.parse import quote
+
+logger = logging.getLogger(name=__name__)
+
+# SQLite's default cap on attached databases (SQLITE_MAX_ATTACHED)
+attach_limit = 10
+
+
+class ShardManager:
+    """
+    ShardManager maps every athlete to their own SQLite file in a directory, so
+    writers on different athletes never contend on the same database lock.
+    Connections are opened lazily, the first time an athlete is asked for.
+
+    Squad-wide reports fan out over the shards: the shard files are ATTACHed
+    read-only to an in-memory connection (in batches, SQLite caps the number of
+    attached databases) and queried with one UNION ALL per batch, the sorted
+    batches are then merged into one result
+    """
+
+    def __init__(self, directory: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+        self.connections = {}
+        os.makedirs(self.directory, exist_ok=True)
+        # end __init__()
+
+    @staticmethod
+    def shard_name(athlete: str = None) -> str:
+        """
+        shard_name() converts an athlete name to its shard file name
+
+        :param athlete: athlete name
+        :return: file name
+        """
+        return re.sub(r"[^a-z0-9_-]+", "_", athlete.lower()) + ".db"
+        # end shard_name()
+
+    def path(self, athlete: str = None) -> str:
+        """
+        path() retrieves the path of an athlete's shard
+
+        :param athlete: athlete name
+        :return: path to the SQLite file
+        """
+        return os.path.join(self.directory, self.shard_name(athlete=athlete))
+        # end path()
+
+    def paths(self) -> [str]:
+        """
+        paths() retrieves the paths of every shard in the directory
+
+        :return: an [] of paths, sorted
+        """
+        return sorted(
+            os.path.join(self.directory, file)
+            for file in os.listdir(self.directory)
+            if file.endswith(".db")
+        )
+        # end paths()
+
+    def connect(self, athlete: str = None) -> sl.Connection:
+        """
+        connect() retrieves the connection to an athlete's shard, opening it on
+        first use
+
+        :param athlete: athlete name
+        :return: a Connection
+        """
+        path = self.path(athlete=athlete)
+        if path not in self.connections:
+            logger.info(f"opening shard {path}")
+            self.connections[path] = sl.connect(path, check_same_thread=False)  # see GroupCommit.idle()
+        # end if
+        return self.connections[path]
+        # end connect()
+
+    def close(self):
+        """
+        close() closes every open shard connection
+
+        :return: none
+        """
+        for con in self.connections.values():
+            con.close()
+        # end for
+        self.connections = {}
+        # end close()
+
+    def fan_out(self, query: str = None, params: () = (), key=None) -> []:
+        """
+        fan_out() runs a query against every shard and merges the results.
+        The query is formatted with the schema of the shard ({schema}.day) and
+        must return its rows sorted by key
+
+        :param query: SELECT on a single shard
+        :param params: parameters of the query
+        :param key: sort key of the rows
+        :return: an [] of rows across the shards, sorted by key
+        """
+        paths = self.paths()
+        batches = []
+        con = sl.connect("file::memory:", uri=True)
+        try:
+            for start in range(0, len(paths), attach_limit):
+                batch = paths[start:start + attach_limit]
+                schemas = [f"shard{x}" for x in range(len(batch))]
+                for path, schema in zip(batch, schemas):
+                    uri = f"file:{quote(os.path.abspath(path))}?mode=ro"
+                    con.execute(f"ATTACH DATABASE ? AS {schema}", (uri,))
+                # end for
+                try:
+                    res = con.execute(
+                        " UNION ALL ".join(f"SELECT * FROM ({query.format(schema=schema)})" for schema in schemas),
+                        params * len(schemas)
+                    )
+                    batches.append(sorted(res.fetchall(), key=key))
+                # end try
+                finally:
+                    for schema in schemas:
+                        con.execute(f"DETACH DATABASE {schema}")
+                    # end for
+                # end finally
+            # end for
+        # end try
+        finally:
+            con.close()
+        # end finally
+        return list(heapq.merge(*batches, key=key))
+        # end fan_out()
+
+    def get_weekly_totals(self, start_date: str = None, end_date: str = None) -> []:
+        """
+        get_weekly_totals() retrieves the miles of every athlete by week (starting
+        Monday) between two dates, across the shards
+
+        :param start_date: first date of the range
+        :param end_date: last date of the range
+        :return: an [] of (week, athlete name, miles), sorted by week then athlete
+        """
+        return self.fan_out(
+            query="SELECT date(d.date, 'weekday 0', '-6 days') AS week, a.name, total(d.miles) "
+                  "FROM {schema}.athlete AS a "
+                  "JOIN {schema}.day AS d ON d.athlete_id = a.athlete_id "
+                  "WHERE d.date BETWEEN ? AND ? "
+                  "GROUP BY week, a.name",
+            params=(start_date, end_date),
+            key=lambda row: (row[0], row[1])
+        )
+        # end get_weekly_totals()
+
+    # end ShardManager
+
+# end of file
@@ -0,0 +1,189 @@
+import json
+import logging
+
+from array import array
+from datetime import date
+from functools import cached_property
+
+from client.day import DayClient
+from client.journal import JournalClient
+from client.run import RunClient
+
+logger = logging.getLogger(name=__name__)
+
+
+class RunStore:
+    """
+    RunStore caches every run of the athlete in columns for the history-wide
+    analytics, so the number of runs never adds to the cost of the grid and
+    summary views (they keep reading day.miles). One array per column:
+    - dates: the run's day as an ordinal
+    - distances: miles
+    - durations: seconds, 0 if the run wasn't timed
+    - types: a code into the names of the run types
+
+    refresh() catches up with the journal: new runs are appended, any other
+    change to the runs (or a day moving) reloads the columns with one query
+    """
+
+    def __init__(self, con, cur, athlete_id: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self.con = con
+        self.cur = cur
+        self.athlete_id = athlete_id
+        self.seq = None
+        self.run_ids = []
+        self.dates = array('i')
+        self.distances = array('d')
+        self.durations = array('i')
+        self.types = array('H')
+        self.names = []
+        self.codes = {}
+        # end __init__()
+
+    @cached_property
+    def run(self) -> RunClient:
+        """
+        run() caches a RunClient for use the duration of the process
+
+        :return: a RunClient
+        """
+        return RunClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
+        # end run()
+
+    @cached_property
+    def day(self) -> DayClient:
+        """
+        day() caches a DayClient for use the duration of the process
+
+        :return: a DayClient
+        """
+        return DayClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
+        # end day()
+
+    @cached_property
+    def journal(self) -> JournalClient:
+        """
+        journal() caches a JournalClient for use the duration of the process
+
+        :return: a JournalClient
+        """
+        return JournalClient(con=self.con, cur=self.cur, athlete_id=self.athlete_id)
+        # end journal()
+
+    def append(self, run_id: str = None, day_date: str = None, distance: float = 0, duration: int = None,
+               run_type: str = None):
+        """
+        append() adds a run to the columns
+
+        :param run_id: run_id
+        :param day_date: %Y-%m-%d formatted date of the run's day
+        :param distance: # of miles
+        :param duration: time in seconds, None if not timed
+        :param run_type: ex. run, easy, long, workout
+        :return: none
+        """
+        run_type = run_type or "run"
+        if run_type not in self.codes:
+            self.codes[run_type] = len(self.names)
+            self.names.append(run_type)
+        # end if
+        self.run_ids.append(run_id)
+        self.dates.append(date.fromisoformat(day_date).toordinal())
+        self.distances.append(distance or 0)
+        self.durations.append(duration or 0)
+        self.types.append(self.codes[run_type])
+        # end append()
+
+    def load(self):
+        """
+        load() (re)loads every run of the athlete
+
+        :return: none
+        """
+        self.seq = self.journal.get_last_seq()
+        self.run_ids = []
+        self.dates = array('i')
+        self.distances = array('d')
+        self.durations = array('i')
+        self.types = array('H')
+        self.names = []
+        self.codes = {}
+        for run_id, day_date, distance, duration, run_type in self.run.stream_all_runs():
+            self.append(run_id=run_id, day_date=day_date, distance=distance, duration=duration, run_type=run_type)
+        # end for
+        # end load()
+
+    def refresh(self):
+        """
+        refresh() brings the columns up to date with the journal, loading them
+        the first time
+
+        :return: none
+        """
+        if self.seq is None:
+            self.load()
+            return
+        # end if
+
+        last_seq = self.seq
+        inserts = []
+        for seq, entity, key, old, new, ts in self.journal.stream_changes_since(seq=self.seq):
+            last_seq = seq
+            if entity == "run" and old is None:
+                inserts.append(json.loads(new))
+            # end if
+            elif entity == "run" or (entity == "day" and (new is None or "date" in json.loads(new))):
+                self.load()  # a run changed or went away, or a day moved
+                return
+            # end elif
+        # end for
+        for run in inserts:
+            day = self.day.get_day_by_id(day_id=run["day_id"])
+            self.append(
+                run_id=run["run_id"],
+                day_date=day[1],
+                distance=run["distance"],
+                duration=run["duration"],
+                run_type=run["type"]
+            )
+        # end for
+        self.seq = last_seq
+        # end refresh()
+
+    def totals(self, start_date: date = None, end_date: date = None) -> [(str, int, float, int, float)]:
+        """
+        totals() sums the runs between start_date and end_date by type, in one
+        pass over the columns. The pace only counts the timed runs
+
+        :param start_date: first date, None for the first run
+        :param end_date: last date, None for the last run
+        :return: an [] of (type, # of runs, miles, seconds, seconds per mile or None)
+        """
+        start = start_date.toordinal() if start_date is not None else 0
+        end = end_date.toordinal() if end_date is not None else date.max.toordinal()
+        runs = [0] * len(self.names)
+        miles = [0.0] * len(self.names)
+        seconds = [0] * len(self.names)
+        timed = [0.0] * len(self.names)
+        for x, day in enumerate(self.dates):
+            if start <= day <= end:
+                code = self.types[x]
+                runs[code] += 1
+                miles[code] += self.distances[x]
+                if self.durations[x] > 0:
+                    seconds[code] += self.durations[x]
+                    timed[code] += self.distances[x]
+                # end if
+            # end if
+        # end for
+        return [
+            (name, runs[code], miles[code], seconds[code], seconds[code] / timed[code] if timed[code] > 0 else None)
+            for code, name in enumerate(self.names)
+            if runs[code] > 0
+        ]
+        # end totals()
+
+    # end RunStore
+
+# end of file
@@ -0,0 +1,71 @@
+import logging
+import sqlite3 as sl
+
+from client.replica import ReplicaClient
+
+logger = logging.getLogger(name=__name__)
+
+
+class Sync:
+    """
+    Sync merges two replicas of the database both ways (ex. the laptop's and the
+    desktop's copies). Only the rows changed since the replicas last synced are
+    exchanged, read off each side's journal, and the conflicts are settled by
+    the row stamps, so both copies end up identical. The first sync between two
+    replicas exchanges every row. The local side is written through the
+    session's GroupCommit, flushed before the peer's seq is advanced
+    """
+
+    def __init__(self, con, cur, **kwargs):
+        super().__init__(**kwargs)
+        self.con = con
+        self.cur = cur
+        self.local = ReplicaClient(con=con, cur=cur)
+        # end __init__()
+
+    def sync(self, path: str = None) -> (int, int):
+        """
+        sync() syncs with the replica at path, the peer must have been opened by
+        the CLI at least once
+
+        :param path: path to the peer's SQLite file
+        :return: # of changes sent and # of changes received
+        """
+        con = sl.connect(path)
+        try:
+            peer = ReplicaClient(con=con, cur=con.cursor())
+            if not peer.is_replica():
+                raise ValueError(f"{path} isn't set up for sync, open it with the CLI first")
+            # end if
+
+            local_id = self.local.get_replica_id()
+            peer_id = peer.get_replica_id()
+            if local_id == peer_id:
+                # the database was copied from the peer, this copy becomes a replica of its own
+                local_id = self.local.reset_replica_id()
+                logger.info(f"replica id reset to {local_id}")
+            # end if
+
+            sent = self.local.get_changes(seq=self.local.get_peer_seq(replica_id=peer_id), replica_id=peer_id)
+            received = peer.get_changes(seq=peer.get_peer_seq(replica_id=local_id), replica_id=local_id)
+            logger.info(f"sending {len(sent[0]) + len(sent[1])} changes, receiving {len(received[0]) + len(received[1])}")
+
+            sent = peer.apply_changes(rows=sent[0], deletes=sent[1], replica_id=local_id)
+            received = self.local.apply_changes(rows=received[0], deletes=received[1], replica_id=peer_id)
+
+            # the changes just applied came from the other side, they don't need to go back
+            self.local.set_peer_seq(replica_id=peer_id, seq=self.local.get_last_seq())
+            # the received changes must be on disk before the peer marks them delivered, a group commit
+            # holding them back would lose them for good on a crash
+            self.con.flush()
+            peer.set_peer_seq(replica_id=local_id, seq=peer.get_last_seq())
+            return sent, received
+        # end try
+        finally:
+            con.close()
+        # end finally
+        # end sync()
+
+    # end Sync
+
+# end of file
@@ -0,0 +1,152 @@
+import json
+import logging
+import sys
+
+logger = logging.getLogger(name=__name__)
+
+outputs = ("table", "json", "tsv")
+
+
+class Table:
+    """
+    Table renders rows in one of the output formats:
+    - table: a bordered ASCII table, the column widths are computed in one pass
+      over the data, the whole table is formatted into a single buffer and
+      written with one call
+    - json: one JSON object per row (JSON lines), streamed as the rows are added
+    - tsv: a header line then one tab separated line per row, streamed as the
+      rows are added
+
+    align holds one format-spec alignment char per column ('<', '>' or '^') and
+    defaults to right aligned. formats maps a column index to a function that
+    formats its values for the table output only, json and tsv get the raw values
+    """
+
+    def __init__(
+            self,
+            columns: [str] = None,
+            align: str = None,
+            formats: {int: callable} = None,
+            output: str = "table",
+            empty: str = None,
+            stream=None,
+            **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.columns = [str(column) for column in columns]
+        self.align = align if align is not None else '>' * len(self.columns)
+        self.formats = formats if formats is not None else {}
+        self.output = output
+        self.empty = empty
+        self.stream = stream if stream is not None else sys.stdout
+        self.rows = []
+        self.count = 0
+        # end __init__()
+
+    @staticmethod
+    def format_cell(value=None) -> str:
+        """
+        format_cell() converts a value to its cell text, floats drop trailing
+        zeros (26.2, 13.1, 5)
+
+        :param value: cell value
+        :return: formatted str
+        """
+        if value is None:
+            return ""
+        # end if
+        if isinstance(value, float):
+            return f"{value:g}"
+        # end if
+        return str(value)
+        # end format_cell()
+
+    @staticmethod
+    def format_tsv(value=None) -> str:
+        """
+        format_tsv() converts a value to its TSV field, tabs and newlines are
+        replaced by spaces
+
+        :param value: field value
+        :return: formatted str
+        """
+        return Table.format_cell(value=value).replace("\t", " ").replace("\n", " ")
+        # end format_tsv()
+
+    def add_row(self, row: [] = None):
+        """
+        add_row() appends a row to the table, json and tsv rows are written
+        right away
+
+        :param row: one value per column
+        :return: none
+        """
+        if self.output == "json":
+            self.stream.write(json.dumps(dict(zip(self.columns, row))) + "\n")
+        # end if
+        elif self.output == "tsv":
+            if self.count == 0:
+                self.stream.write("\t".join(self.columns) + "\n")
+            # end if
+            self.stream.write("\t".join(self.format_tsv(value=value) for value in row) + "\n")
+        # end elif
+        else:
+            self.rows.append([
+                self.formats[x](value) if x in self.formats else self.format_cell(value=value)
+                for x, value in enumerate(row)
+            ])
+        # end else
+        self.count += 1
+        # end add_row()
+
+    def render(self) -> str:
+        """
+        render() formats the table into a single str
+
+        :return: the table
+        """
+        widths = [len(column) for column in self.columns]
+        for row in self.rows:
+            for x, cell in enumerate(row):
+                if len(cell) > widths[x]:
+                    widths[x] = len(cell)
+                # end if
+            # end for
+        # end for
+
+        rule = "-" * (sum(widths) + 3 * len(widths) + 1)
+        header = "| " + " | ".join(f"{column:^{width}}" for column, width in zip(self.columns, widths)) + " |"
+        lines = [rule, header, rule]
+        for row in self.rows:
+            cells = (f"{cell:{align}{width}}" for cell, align, width in zip(row, self.align, widths))
+            lines.append("| " + " | ".join(cells) + " |")
+        # end for
+        lines.append(rule)
+        lines.append("")
+        return "\n".join(lines) + "\n"
+        # end render()
+
+    def write(self):
+        """
+        write() finishes the output: the table is rendered and written in one
+        call, json and tsv rows have already been streamed
+
+        :return: none
+        """
+        if self.output == "table":
+            if self.count == 0 and self.empty is not None:
+                self.stream.write(f"{self.empty}\n\n")
+            # end if
+            else:
+                self.stream.write(self.render())
+            # end else
+        # end if
+        elif self.output == "tsv" and self.count == 0:
+            self.stream.write("\t".join(self.columns) + "\n")
+        # end elif
+        self.stream.flush()
+        # end write()
+
+    # end Table
+
+# end of file
@@ -0,0 +1,148 @@
+import os
+import sqlite3 as sl
+import sys
+import tempfile
+import time
+import unittest
+
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import App  # noqa: E402
+from client.journal import entities  # noqa: E402
+from group_commit import GroupCommit  # noqa: E402
+from sync import Sync  # noqa: E402
+
+
+class SyncTest(unittest.TestCase):
+    """
+    SyncTest syncs two replicas opened by the App in a temporary directory: an
+    edit on each side, the same day edited on both, synced twice
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.apps = {}
+        for name in ("laptop", "desktop"):
+            con = sl.connect(os.path.join(self.directory.name, f"{name}.db"))
+            app = App(con=GroupCommit(con=con), cur=con.cursor())
+            app.setup()
+            self.apps[name] = app
+        # end for
+        # end setUp()
+
+    def tearDown(self):
+        for app in self.apps.values():
+            app.con.close()
+        # end for
+        self.directory.cleanup()
+        # end tearDown()
+
+    def sync(self, group_commit: bool = False) -> (int, int):
+        """
+        sync() syncs the laptop (the local side) with the desktop
+
+        :param group_commit: hold the laptop's writes in a group commit
+        :return: # of changes sent and # of changes received
+        """
+        laptop = self.apps["laptop"]
+        laptop.con.enabled = group_commit
+        return Sync(con=laptop.con, cur=laptop.cur).sync(path=os.path.join(self.directory.name, "desktop.db"))
+        # end sync()
+
+    def rows(self, app: App = None) -> {str: [()]}:
+        """
+        rows() retrieves every synced row of a replica, the athlete by name
+        (the athlete ids differ between the replicas)
+
+        :param app: App of the replica
+        :return: a {} of entity: sorted rows
+        """
+        rows = {}
+        for entity, key in entities.items():
+            res = app.cur.execute(
+                f"SELECT t.*, athlete.name FROM {entity} AS t JOIN athlete ON athlete.athlete_id = t.athlete_id"
+            )
+            columns = [column[0] for column in res.description]
+            rows[entity] = sorted(
+                tuple(value for column, value in zip(columns, row) if column != "athlete_id")
+                for row in res.fetchall()
+            )
+        # end for
+        return rows
+        # end rows()
+
+    def day_id(self, app: App = None, date: str = None) -> str:
+        """
+        day_id() retrieves the day_id of a date of the training block
+
+        :param app: App of the replica
+        :param date: %Y-%m-%d formatted date
+        :return: day_id
+        """
+        return app.cur.execute("SELECT day_id FROM day WHERE date = ?", (date,)).fetchone()[0]
+        # end day_id()
+
+    def test_round_trip(self):
+        laptop = self.apps["laptop"]
+        desktop = self.apps["desktop"]
+        training_block_id = laptop.printer.tb.add_training_block(name="fall", start_date=datetime(2026, 6, 1))
+        laptop.printer.tb.extend(training_block_id=training_block_id, num_weeks=2)
+        laptop.printer.day.run.add_run(day_id=self.day_id(laptop, "2026-06-01"), distance=5, duration=2400)
+        sent, received = self.sync()
+        self.assertGreater(sent, 0)
+        self.assertEqual(received, 0)
+        self.assertEqual(self.rows(laptop), self.rows(desktop))
+
+        # an edit on each side, and the same day on both: the later edit (the desktop's) wins
+        laptop.printer.day.run.add_run(day_id=self.day_id(laptop, "2026-06-02"), distance=3, run_type="easy")
+        laptop.printer.day.run.set_miles_by_day_ids(miles=[(self.day_id(laptop, "2026-06-03"), 4)])
+        time.sleep(0.01)
+        week_id = desktop.cur.execute("SELECT week_id FROM week WHERE week_number = 1").fetchone()[0]
+        desktop.printer.week.update_goals_by_week_ids(goals=[(week_id, 40)])
+        desktop.printer.day.run.set_miles_by_day_ids(miles=[(self.day_id(desktop, "2026-06-03"), 6)])
+        desktop.printer.race.add_race(
+            day_id=self.day_id(desktop, "2026-06-14"),
+            miles=13,
+            name="half",
+            training_block_id=training_block_id
+        )
+
+        sent, received = self.sync()
+        self.assertGreater(sent, 0)
+        self.assertGreater(received, 0)
+        self.assertEqual(self.rows(laptop), self.rows(desktop))
+        miles = laptop.cur.execute("SELECT miles FROM day WHERE date = '2026-06-03'").fetchone()[0]
+        self.assertEqual(miles, 6)
+
+        # nothing changed since, nothing goes either way
+        self.assertEqual(self.sync(), (0, 0))
+        self.assertEqual(self.rows(laptop), self.rows(desktop))
+        # end test_round_trip()
+
+    def test_group_commit(self):
+        desktop = self.apps["desktop"]
+        training_block_id = desktop.printer.tb.add_training_block(name="spring", start_date=datetime(2026, 1, 5))
+        desktop.printer.tb.extend(training_block_id=training_block_id, num_weeks=1)
+        self.assertGreater(self.sync(group_commit=True)[1], 0)
+
+        # the received changes are on disk once the sync returns, without a flush of the group
+        con = sl.connect(os.path.join(self.directory.name, "laptop.db"))
+        try:
+            self.assertEqual(con.execute("SELECT count(*) FROM day").fetchone()[0], 7)
+        # end try
+        finally:
+            con.close()
+        # end finally
+        self.assertEqual(self.sync(group_commit=True), (0, 0))
+        # end test_group_commit()
+
+    # end SyncTest
+
+
+if __name__ == "__main__":
+    unittest.main()
+# end if
+
+# end of file